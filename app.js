@@ -421,6 +421,9 @@ const I18N = {
 };
 let remoteSaveTimer = null;
 let remoteHydrated = false;
+let remoteSaveChain = Promise.resolve();
+let remoteSync = null;
+const STATE_OPS_MAX_BATCH = 500;
 let apiProbeTimer = null;
 const flashSwipe = {
   pointerId: null,
@@ -995,6 +998,9 @@ async function hydrateStateFromServer() {
     }
     const remote = await response.json();
     const normalizedRemote = normalizeState(remote);
+    remoteSync = Number.isInteger(remote.revision)
+      ? { userId: String(ui.activeUserId), revision: remote.revision, state: cloneState(normalizedRemote) }
+      : null;
     const remoteLists = normalizedRemote.lists;
     const remoteHistory = normalizedRemote.history;
     const hasRemote = remoteLists.length > 0 || remoteHistory.length > 0;
@@ -1020,34 +1026,210 @@ async function hydrateStateFromServer() {
   }
 }
 
+function cloneState(source) {
+  return {
+    lists: JSON.parse(JSON.stringify(source.lists)),
+    history: JSON.parse(JSON.stringify(source.history)),
+  };
+}
+
 function queueRemoteSave(immediate = false) {
   if (!ui.activeUserId) return;
   if (remoteSaveTimer) {
     clearTimeout(remoteSaveTimer);
   }
   const targetUserId = String(ui.activeUserId);
-  const snapshot = {
-    lists: JSON.parse(JSON.stringify(state.lists)),
-    history: JSON.parse(JSON.stringify(state.history)),
-  };
+  const snapshot = cloneState(state);
   const delay = immediate ? 0 : 250;
-  remoteSaveTimer = setTimeout(async () => {
-    try {
-      const response = await fetch(apiUrl(`/api/state?user=${encodeURIComponent(targetUserId)}`), {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify(snapshot),
+  remoteSaveTimer = setTimeout(() => {
+    remoteSaveChain = remoteSaveChain.then(() => pushRemoteState(targetUserId, snapshot));
+  }, delay);
+}
+
+async function pushRemoteState(targetUserId, snapshot) {
+  try {
+    let synced = remoteSync && remoteSync.userId === targetUserId ? remoteSync : null;
+    if (synced && synced.pending) {
+      // The last batch may have landed without us seeing the reply: resend it with the same opIds
+      // so the server answers from its log instead of applying it twice.
+      await pushStateOps(targetUserId, synced, synced.pending.snapshot, synced.pending.ops);
+      synced = remoteSync;
+    }
+    const ops = synced ? diffStateOps(synced.state, snapshot) : null;
+    if (ops && !ops.length) return;
+    if (ops) {
+      ops.forEach((op) => {
+        op.opId = `op_${Date.now()}_${Math.random().toString(36).slice(2, 10)}`;
       });
-      if (!response.ok) {
-        throw new Error(`state save failed: ${response.status}`);
-      }
-      remoteHydrated = true;
-    } catch (error) {
-      if (!remoteHydrated) {
-        return;
-      }
+      await pushStateOps(targetUserId, synced, snapshot, ops);
+      return;
     }
-  }, delay);
+    const response = await fetch(apiUrl(`/api/state?user=${encodeURIComponent(targetUserId)}`), {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(snapshot),
+    });
+    if (!response.ok) {
+      throw new Error(`state save failed: ${response.status}`);
+    }
+    const payload = await response.json();
+    remoteSync = Number.isInteger(payload.revision)
+      ? { userId: targetUserId, revision: payload.revision, state: snapshot }
+      : null;
+    remoteHydrated = true;
+  } catch (error) {
+    if (!remoteHydrated) {
+      return;
+    }
+  }
+}
+
+async function pushStateOps(targetUserId, synced, snapshot, ops) {
+  synced.pending = { snapshot: cloneState(snapshot), ops };
+  const response = await fetch(apiUrl(`/api/state/ops?user=${encodeURIComponent(targetUserId)}`), {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ baseRevision: synced.revision, ops }),
+  });
+  if (!response.ok) {
+    throw new Error(`state ops failed: ${response.status}`);
+  }
+  const payload = await response.json();
+  remoteHydrated = true;
+  const isActive = String(ui.activeUserId) === targetUserId;
+  if (payload.state) {
+    // The server could not replay our base or refused some ops: adopt its state.
+    const serverState = normalizeState(payload.state);
+    remoteSync = { userId: targetUserId, revision: payload.revision, state: cloneState(serverState) };
+    if (isActive) {
+      state.lists = serverState.lists;
+      state.history = serverState.history;
+      localStorage.setItem(userStorageKey(targetUserId), JSON.stringify(state));
+      refreshAll();
+    }
+    return;
+  }
+  const missed = Array.isArray(payload.missed) ? payload.missed : [];
+  missed.forEach((op) => applyStateOp(snapshot, op));
+  remoteSync = { userId: targetUserId, revision: payload.revision, state: snapshot };
+  if (missed.length && isActive) {
+    missed.forEach((op) => applyStateOp(state, op));
+    localStorage.setItem(userStorageKey(targetUserId), JSON.stringify(state));
+    refreshAll();
+  }
+}
+
+function diffStateOps(before, after) {
+  // Row-level ops between two snapshots; null when only a full save can express the change.
+  const beforeIds = before.lists.map((list) => list.id);
+  const afterIds = after.lists.map((list) => list.id);
+  if (new Set(beforeIds).size !== beforeIds.length || new Set(afterIds).size !== afterIds.length) {
+    return null;
+  }
+  const kept = beforeIds.filter((id) => afterIds.includes(id));
+  if (kept.join("\n") !== afterIds.filter((id) => beforeIds.includes(id)).join("\n")) {
+    return null;
+  }
+
+  const ops = [];
+  before.lists.forEach((list) => {
+    if (!afterIds.includes(list.id)) ops.push({ op: "removeList", listId: list.id });
+  });
+  after.lists.forEach((list, index) => {
+    const previous = before.lists.find((row) => row.id === list.id);
+    if (!previous) {
+      ops.push({ op: "addList", listId: list.id, name: list.name, index, words: list.words });
+      return;
+    }
+    if (previous.name !== list.name) {
+      ops.push({ op: "renameList", listId: list.id, name: list.name });
+    }
+    diffRows(previous.words, list.words, (a, b) => JSON.stringify(a) === JSON.stringify(b), {
+      remove: (word, at) => ({ op: "removeWord", listId: list.id, index: at, match: wordMatch(word) }),
+      add: (word, at) => ({ op: "addWord", listId: list.id, index: at, word }),
+      update: (prev, word, at) => ({ op: "updateWord", listId: list.id, index: at, match: wordMatch(prev), word }),
+    }).forEach((op) => ops.push(op));
+  });
+  diffRows(before.history, after.history, (a, b) => JSON.stringify(a) === JSON.stringify(b), {
+    remove: (entry) => ({ op: "removeHistory", id: entry.id }),
+    add: (entry, at) => ({ op: "addHistory", index: at, entry }),
+  }).forEach((op) => ops.push(op));
+  return ops.length > STATE_OPS_MAX_BATCH ? null : ops;
+}
+
+function diffRows(before, after, same, build) {
+  let start = 0;
+  while (start < before.length && start < after.length && same(before[start], after[start])) start += 1;
+  let end = 0;
+  while (
+    end < before.length - start &&
+    end < after.length - start &&
+    same(before[before.length - 1 - end], after[after.length - 1 - end])
+  ) {
+    end += 1;
+  }
+  const removed = before.slice(start, before.length - end);
+  const added = after.slice(start, after.length - end);
+  const ops = [];
+  if (build.update && removed.length === added.length) {
+    added.forEach((row, offset) => {
+      if (!same(removed[offset], row)) ops.push(build.update(removed[offset], row, start + offset));
+    });
+    return ops;
+  }
+  for (let offset = removed.length - 1; offset >= 0; offset -= 1) {
+    ops.push(build.remove(removed[offset], start + offset));
+  }
+  added.forEach((row, offset) => ops.push(build.add(row, start + offset)));
+  return ops;
+}
+
+function wordMatch(word) {
+  return { word: word.word, furigana: word.furigana };
+}
+
+function locateWord(words, index, match) {
+  let found = -1;
+  words.forEach((word, position) => {
+    if (word.word !== match.word || word.furigana !== match.furigana) return;
+    if (found < 0 || Math.abs(position - index) < Math.abs(found - index)) found = position;
+  });
+  return found;
+}
+
+function applyStateOp(target, op) {
+  // Mirrors how the server applies ops, so replayed ops land where they did there.
+  if (!op || typeof op !== "object") return;
+  const clampIndex = (index, length) => (Number.isInteger(index) ? Math.max(0, Math.min(index, length)) : length);
+  const list = op.listId ? target.lists.find((row) => row.id === op.listId) : null;
+  if (op.op === "addList") {
+    if (list) return;
+    const words = Array.isArray(op.words) ? op.words.map((word) => normalizeWord(word)) : [];
+    target.lists.splice(clampIndex(op.index, target.lists.length), 0, { id: op.listId, name: op.name, words });
+  } else if (op.op === "removeList") {
+    if (list) target.lists.splice(target.lists.indexOf(list), 1);
+  } else if (op.op === "renameList") {
+    if (list) list.name = op.name;
+  } else if (op.op === "addWord") {
+    if (list) list.words.splice(clampIndex(op.index, list.words.length), 0, normalizeWord(op.word || {}));
+  } else if (op.op === "removeWord" || op.op === "updateWord") {
+    if (!list || !op.match) return;
+    const position = locateWord(list.words, op.index || 0, op.match);
+    if (position < 0) return;
+    if (op.op === "removeWord") {
+      list.words.splice(position, 1);
+    } else {
+      list.words[position] = normalizeWord(op.word || {});
+    }
+  } else if (op.op === "addHistory") {
+    const entry = normalizeHistoryEntry(op.entry);
+    if (!entry) return;
+    target.history.splice(clampIndex(op.index, target.history.length), 0, entry);
+    target.history.length = Math.min(target.history.length, 1000);
+  } else if (op.op === "removeHistory") {
+    const position = target.history.findIndex((entry) => entry.id === op.id);
+    if (position >= 0) target.history.splice(position, 1);
+  }
 }
 
 function bindUsers() {
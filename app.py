@@ -1,19 +1,38 @@
 #!/usr/bin/env python3
-import html
+import argparse
+import asyncio
+import bisect
+import codecs
+import difflib
+import gzip
 import hashlib
+import heapq
+import http.client
+import io
 import json
+import mimetypes
+import multiprocessing
 import os
 import re
 import sqlite3
 import ssl
+import sys
 import threading
+import time
+import traceback
 import urllib.parse
-import urllib.request
+import zlib
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from http import HTTPStatus
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Any
 
+from metrics import LATENCY_BUCKETS, METRICS_ENABLED, SIZE_BUCKETS, MetricsRegistry
+from textnorm import clean_ruby_text, clean_text, keyify, memo_stats, sanitize_ruby_html
+
 
 BASE_DIR = Path(__file__).parent
 STATIC_DIR = BASE_DIR / "static"
@@ -23,6 +42,55 @@ LEGACY_STATE_FILE = DATA_DIR / "hub_state.json"
 STATE_ROW_KEY = "hub_state_v2"
 DEFAULT_PORT = 8000
 
+SEARCH_CACHE_DB_FILE = DATA_DIR / "search_cache.db"
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL", str(7 * 24 * 3600)))
+SEARCH_CACHE_EMPTY_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_EMPTY_TTL", "3600"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SEARCH_CACHE_MEMORY_ENTRIES = int(os.getenv("SEARCH_CACHE_MEMORY_ENTRIES", "2000"))
+
+DICTIONARY_DB_FILE = DATA_DIR / "dictionary.db"
+OFFLINE_MODE = os.getenv("OFFLINE_MODE", "").strip().lower() in ("1", "true", "yes")
+
+PAYLOAD_ARCHIVE_DB_FILE = DATA_DIR / "payload_archive.db"
+PAYLOAD_ARCHIVE_ENABLED = os.getenv("PAYLOAD_ARCHIVE", "1").strip().lower() not in ("0", "false", "no")
+PAYLOAD_ARCHIVE_MAX_BYTES = int(os.getenv("PAYLOAD_ARCHIVE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+UPSTREAM_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_TIMEOUT", "8"))
+UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "8"))
+UPSTREAM_IDLE_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_IDLE_TIMEOUT", "60"))
+UPSTREAM_WORKERS = int(os.getenv("UPSTREAM_WORKERS", "32"))
+UPSTREAM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("UPSTREAM_HEDGE_MIN_DELAY", "0.25"))
+UPSTREAM_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("UPSTREAM_HEDGE_DEFAULT_DELAY", "1.0"))
+UPSTREAM_CIRCUIT_FAILURES = int(os.getenv("UPSTREAM_CIRCUIT_FAILURES", "3"))
+UPSTREAM_PROBE_INTERVAL_SECONDS = float(os.getenv("UPSTREAM_PROBE_INTERVAL", "30"))
+UPSTREAM_STREAM_PARSE = os.getenv("UPSTREAM_STREAM_PARSE", "").strip().lower() in ("1", "true", "yes")
+UPSTREAM_STREAM_CHUNK_BYTES = int(os.getenv("UPSTREAM_STREAM_CHUNK_BYTES", "16384"))
+SEARCH_RETRY_WORKERS = int(os.getenv("SEARCH_RETRY_WORKERS", "8"))
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "500"))
+SEARCH_BATCH_CONCURRENCY = int(os.getenv("SEARCH_BATCH_CONCURRENCY", "6"))
+ENRICHMENT_CACHE_ENTRIES = int(os.getenv("ENRICHMENT_CACHE_ENTRIES", "5000"))
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", "2"))
+PAYLOAD_SHAPE_CACHE_ENTRIES = int(os.getenv("PAYLOAD_SHAPE_CACHE_ENTRIES", "256"))
+STATE_OPS_RETAINED = int(os.getenv("STATE_OPS_RETAINED", "2000"))
+STATE_OPS_MAX_BATCH = int(os.getenv("STATE_OPS_MAX_BATCH", "500"))
+STATE_DB_POOL_SIZE = int(os.getenv("STATE_DB_POOL_SIZE", "16"))
+STATE_DB_JOURNAL_MODE = os.getenv("STATE_DB_JOURNAL_MODE", "WAL").upper()
+STATE_DB_SYNCHRONOUS = os.getenv("STATE_DB_SYNCHRONOUS", "NORMAL").upper()
+STATE_DB_CACHE_KIB = int(os.getenv("STATE_DB_CACHE_KIB", "8192"))
+STATE_LOCK_STRIPES = int(os.getenv("STATE_LOCK_STRIPES", "64"))
+SERVER_MODE = os.getenv("SERVER_MODE", "threads").strip().lower()
+ASYNC_MAX_IN_FLIGHT = int(os.getenv("ASYNC_MAX_IN_FLIGHT", "4096"))
+ASYNC_ROUTE_WORKERS = int(os.getenv("ASYNC_ROUTE_WORKERS", "8"))
+ASYNC_DB_WORKERS = int(os.getenv("ASYNC_DB_WORKERS", "4"))
+ASYNC_BATCH_WORKERS = int(os.getenv("ASYNC_BATCH_WORKERS", "2"))
+ASYNC_REQUEST_TIMEOUT_SECONDS = float(os.getenv("ASYNC_REQUEST_TIMEOUT", "30"))
+ASYNC_BACKLOG = int(os.getenv("ASYNC_BACKLOG", "1024"))
+HTTP_KEEPALIVE_TIMEOUT_SECONDS = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "15"))
+HTTP_COMPRESS_MIN_BYTES = int(os.getenv("HTTP_COMPRESS_MIN_BYTES", "1024"))
+HTTP_GZIP_LEVEL = int(os.getenv("HTTP_GZIP_LEVEL", "6"))
+HTTP_BROTLI_QUALITY = int(os.getenv("HTTP_BROTLI_QUALITY", "5"))
+STATIC_MAX_AGE_SECONDS = int(os.getenv("STATIC_MAX_AGE", str(365 * 24 * 3600)))
+
 NAVER_ENDPOINTS_BY_LANG = {
     "ja": [
         "https://ja.dict.naver.com/api3/jako/search",
@@ -41,15 +109,17 @@ NAVER_REFERER_BY_LANG = {
     "en": "https://en.dict.naver.com/",
 }
 
-RE_TAGS = re.compile(r"<[^>]+>")
-RE_HTML_TAG = re.compile(r"<\s*(/?)\s*([a-zA-Z0-9]+)(?:\s+[^>]*)?>")
 RE_JAPANESE = re.compile(r"[\u3040-\u30ff\u3400-\u9fff]")
 RE_KANA = re.compile(r"[\u3040-\u30ff]")
 RE_KOREAN = re.compile(r"[\uac00-\ud7a3]")
 RE_ENGLISH = re.compile(r"[A-Za-z]")
-ALLOWED_EXAMPLE_TAGS = {"ruby", "rb", "rt", "rp", "br"}
 STATE_LOCK = threading.Lock()
 
+try:
+    import brotli
+except Exception:
+    brotli = None
+
 try:
     import certifi
 
@@ -57,35 +127,29 @@ try:
 except Exception:
     SSL_CONTEXT = ssl.create_default_context()
 
-
-def clean_text(value: str) -> str:
-    text = html.unescape(value or "")
-    text = RE_TAGS.sub("", text)
-    text = text.replace("\u200b", "")
-    return " ".join(text.split())
-
-
-def clean_ruby_text(value: str) -> str:
-    text = html.unescape(value or "")
-    text = re.sub(r"<rt[^>]*>.*?</rt>", "", text, flags=re.IGNORECASE | re.DOTALL)
-    text = re.sub(r"</?(ruby|rb|rp)[^>]*>", "", text, flags=re.IGNORECASE)
-    return clean_text(text)
-
-
-def sanitize_ruby_html(value: str) -> str:
-    text = html.unescape(value or "").replace("\u200b", "")
-
-    def repl(match: re.Match[str]) -> str:
-        slash = "/" if match.group(1) else ""
-        tag = (match.group(2) or "").lower()
-        if tag not in ALLOWED_EXAMPLE_TAGS:
-            return ""
-        if tag == "br":
-            return "<br>"
-        return f"<{slash}{tag}>"
-
-    sanitized = RE_HTML_TAG.sub(repl, text)
-    return sanitized.strip()
+METRICS = MetricsRegistry(METRICS_ENABLED)
+METRICS.counter("hub_http_requests_total", "HTTP requests by route, method and status.")
+METRICS.histogram("hub_http_request_seconds", "Time from request line to response by route.", LATENCY_BUCKETS)
+METRICS.histogram("hub_http_response_bytes", "Response body size by route.", SIZE_BUCKETS)
+METRICS.histogram("hub_upstream_request_seconds", "Naver fetch latency by endpoint.", LATENCY_BUCKETS)
+METRICS.counter("hub_upstream_errors_total", "Failed Naver fetches by endpoint.")
+METRICS.histogram("hub_upstream_payload_bytes", "Naver response body size by endpoint.", SIZE_BUCKETS)
+METRICS.counter("hub_search_retries_total", "Empty searches retried with suggested queries, by outcome.")
+METRICS.counter("hub_search_retry_fetches_total", "Fetches made for suggested-query retries.")
+METRICS.counter("hub_enrichment_fetches_total", "English enrichment probe fetches by outcome.")
+METRICS.histogram("hub_state_lock_wait_seconds", "Time waiting for a state lock, by lock.", LATENCY_BUCKETS)
+METRICS.histogram("hub_state_lock_hold_seconds", "Time a state lock was held, by lock.", LATENCY_BUCKETS)
+METRICS_ROUTES = {
+    "/api/search",
+    "/api/search/batch",
+    "/api/suggest",
+    "/api/users",
+    "/api/users/delete",
+    "/api/state",
+    "/api/state/ops",
+    "/api/stats",
+    "/metrics",
+}
 
 
 def detect_query_language(query: str) -> str:
@@ -140,10 +204,252 @@ def extract_english_pronunciation(item: dict[str, Any]) -> str:
     return fallback
 
 
-def extract_corrected_query(payload: dict[str, Any], original_query: str) -> str:
+QUERY_HINT_KEYS = ("query", "suggest", "correct", "spell", "revert", "recommend")
+GENERIC_MEANING_HINTS = ("mean", "trans", "target", "desc", "example")
+AUDIO_KEY_HINTS = ("audio", "sound", "voice", "tts", "pronounce", "pronunciation", "mp3")
+AUDIO_TEXT_HINTS = (".mp3", ".m4a", ".wav", ".ogg", "audio", "sound", "tts")
+MAX_NORMALIZED_ROWS = 10
+
+
+class PayloadScan:
+    # One walk over a Naver payload that records everything the parser helpers used to
+    # walk for separately: hint-keyed query values, every string leaf (with its key path)
+    # and the leaf span of each dict that sits in a list. Helpers that accept a scan
+    # read from it instead of re-walking; results are identical either way.
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+        self.query_values: list[Any] = []
+        # (full key path, raw string, lowercased own key, sits directly in a dict)
+        self.leaves: list[tuple[str, str, str, bool]] = []
+        # id(row) -> (length of the row's key-path prefix, first leaf, end leaf)
+        self.row_spans: dict[int, tuple[int, int, int]] = {}
+        # (key path, rows) of non-empty all-dict lists, in the order extract_generic_items
+        # visits them.
+        self.row_lists: list[tuple[str, list[dict[str, Any]]]] = []
+        # Set by PAYLOAD_SHAPES once the payload's shape has been looked up.
+        self.shape_plan: PayloadShapePlan | None = None
+        self._cleaned: dict[str, str] = {}
+        # Payloads repeat the same few dozen keys thousands of times.
+        self._key_info: dict[str, tuple[str, bool]] = {}
+        self._meaning_marks: list[int] | None = None
+        self._wordish: dict[str, list[bool]] = {}
+        self._visit(payload, "", "")
+        self.direct_items = extract_direct_items(payload) if isinstance(payload, dict) else []
+
+    def _visit(self, node: Any, path: str, key_l: str):
+        if isinstance(node, dict):
+            key_info = self._key_info
+            for key, value in node.items():
+                key_s = str(key)
+                info = key_info.get(key_s)
+                if info is None:
+                    lowered = key_s.lower()
+                    info = (lowered, any(h in lowered for h in QUERY_HINT_KEYS))
+                    key_info[key_s] = info
+                child_key_l, is_query_hint = info
+                child_path = f"{path}.{key_s}" if path else key_s
+                if isinstance(value, (dict, list)):
+                    self._visit(value, child_path, child_key_l)
+                    continue
+                if is_query_hint:
+                    self.query_values.append(value)
+                if isinstance(value, str):
+                    self.leaves.append((child_path, value, child_key_l, True))
+            return
+
+        if isinstance(node, list):
+            if node and all(isinstance(x, dict) for x in node):
+                self.row_lists.append((path, node))
+            for value in node:
+                if isinstance(value, dict):
+                    start = len(self.leaves)
+                    self._visit(value, path, key_l)
+                    self.row_spans[id(value)] = (len(path), start, len(self.leaves))
+                elif isinstance(value, list):
+                    self._visit(value, path, key_l)
+                elif isinstance(value, str):
+                    self.leaves.append((path, value, key_l, False))
+
+    def clean(self, raw: str) -> str:
+        cleaned = self._cleaned.get(raw)
+        if cleaned is None:
+            cleaned = clean_text(raw)
+            self._cleaned[raw] = cleaned
+        return cleaned
+
+    def _span(self, item: Any) -> tuple[int, int, int] | None:
+        return self.row_spans.get(id(item))
+
+    def fields(self, item: Any) -> list[tuple[str, str]] | None:
+        span = self._span(item)
+        if span is None:
+            return None
+        prefix_len, start, end = span
+        cut = prefix_len + 1 if prefix_len else 0
+        return [(path[cut:], self.clean(raw)) for path, raw, _, _ in self.leaves[start:end]]
+
+    def audio_url(self, item: Any) -> str | None:
+        span = self._span(item)
+        if span is None:
+            return None
+        _, start, end = span
+        for _, raw, key_l, in_dict in self.leaves[start:end]:
+            if not in_dict:
+                continue
+            text = _normalize_media_url(raw)
+            if not text:
+                continue
+            text_l = text.lower()
+            if any(h in key_l for h in AUDIO_KEY_HINTS) or any(h in text_l for h in AUDIO_TEXT_HINTS):
+                return text
+        return ""
+
+    def fingerprint(self, language: str) -> str:
+        # The shape is the set of key paths that lead to row arrays; leaf values and row
+        # counts don't matter.
+        paths = sorted({path for path, _ in self.row_lists})
+        return hashlib.sha1("\n".join([language, *paths]).encode("utf-8")).hexdigest()[:16]
+
+    def generic_items(self, language: str = "ja") -> list[dict[str, Any]]:
+        word_pattern = RE_ENGLISH if language == "en" else RE_JAPANESE
+        if self._meaning_marks is None:
+            # Start offset of the last meaning hint in each leaf path. Hints contain no
+            # ".", so a row's relative path has a hint iff that offset is past its prefix.
+            self._meaning_marks = [
+                max(path.lower().rfind(h) for h in GENERIC_MEANING_HINTS)
+                for path, _, _, _ in self.leaves
+            ]
+        wordish = self._wordish.get(language)
+        if wordish is None:
+            wordish = [bool(word_pattern.search(self.clean(raw))) for _, raw, _, _ in self.leaves]
+            self._wordish[language] = wordish
+
+        items: list[dict[str, Any]] = []
+        marks = self._meaning_marks
+        for path, rows in self.row_lists:
+            for row in rows:
+                prefix_len, start, end = self.row_spans[id(row)]
+                cut = prefix_len + 1 if prefix_len else 0
+                if any(wordish[start:end]) and any(mark >= cut for mark in marks[start:end]):
+                    items.append(row)
+        return items
+
+
+class PayloadShapePlan:
+    def __init__(self, extractor: str):
+        # "direct" (api3 searchResultListMap) or "generic" (heuristic rows anywhere).
+        self.extractor = extractor
+        # row field keys -> per generic field rule, (key score, field index) best first
+        self.field_rankings: dict[tuple[str, ...], list[list[tuple[int, int]]]] = {}
+
+    def rankings(
+        self, keys: tuple[str, ...], rules: list[tuple[str, list[str], re.Pattern[str] | None]]
+    ) -> list[list[tuple[int, int]]]:
+        ranking = self.field_rankings.get(keys)
+        if ranking is not None:
+            PAYLOAD_SHAPES.field_hits += 1
+            return ranking
+        PAYLOAD_SHAPES.field_misses += 1
+        ranking = [
+            sorted(((score_key(key, hints), index) for index, key in enumerate(keys)), key=lambda x: (-x[0], x[1]))
+            for _, hints, _ in rules
+        ]
+        if len(self.field_rankings) < 64:
+            self.field_rankings[keys] = ranking
+        return ranking
+
+
+class PayloadShapeCache:
+    # Remembers, per payload shape fingerprint, which extractor found the items, so repeat
+    # shapes reuse its generic field rankings. A plan never narrows the search: generic
+    # plans still consider every row array, and shapes where nothing was found aren't
+    # cached, since the same key paths can hold real rows in another payload. A cached plan
+    # that finds nothing falls back to the full search; a rising fallback rate usually
+    # means Naver changed format.
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._plans: OrderedDict[str, PayloadShapePlan] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.field_hits = 0
+        self.field_misses = 0
+        self.extractors = {"direct": 0, "generic": 0, "none": 0}
+
+    def select_items(self, scan: PayloadScan, language: str) -> list[dict[str, Any]]:
+        fingerprint = scan.fingerprint(language)
+        with self._lock:
+            plan = self._plans.get(fingerprint)
+            if plan is not None:
+                self._plans.move_to_end(fingerprint)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if plan is not None:
+            # Direct rows win over generic ones in the full search too, so a generic plan
+            # only holds while there are none.
+            if plan.extractor == "direct":
+                items = scan.direct_items
+            else:
+                items = [] if scan.direct_items else scan.generic_items(language)
+            if items:
+                scan.shape_plan = plan
+                self.extractors[plan.extractor] += 1
+                return items
+            self.fallbacks += 1
+
+        items = scan.direct_items
+        if items:
+            plan = PayloadShapePlan("direct")
+        else:
+            items = scan.generic_items(language)
+            if not items:
+                self.extractors["none"] += 1
+                return items
+            plan = PayloadShapePlan("generic")
+        with self._lock:
+            self._plans[fingerprint] = plan
+            self._plans.move_to_end(fingerprint)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+        scan.shape_plan = plan
+        self.extractors[plan.extractor] += 1
+        return items
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            shapes = len(self._plans)
+            by_extractor: dict[str, int] = {}
+            for plan in self._plans.values():
+                by_extractor[plan.extractor] = by_extractor.get(plan.extractor, 0) + 1
+        lookups = self.hits + self.misses
+        return {
+            "shapes": shapes,
+            "shapesByExtractor": by_extractor,
+            "lookups": lookups,
+            "hits": self.hits,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "fallbacks": self.fallbacks,
+            "payloadsByExtractor": dict(self.extractors),
+            "fieldRankingHits": self.field_hits,
+            "fieldRankingMisses": self.field_misses,
+            "maxEntries": self.max_entries,
+        }
+
+
+PAYLOAD_SHAPES = PayloadShapeCache(PAYLOAD_SHAPE_CACHE_ENTRIES)
+
+
+def extract_corrected_query(
+    payload: dict[str, Any], original_query: str, scan: PayloadScan | None = None
+) -> str:
     original = clean_text(original_query or "")
     original_l = original.casefold()
-    candidates = collect_query_candidates(payload, original_query)
+    candidates = collect_query_candidates(payload, original_query, scan)
 
     for candidate in candidates:
         if candidate.casefold() != original_l:
@@ -151,7 +457,9 @@ def extract_corrected_query(payload: dict[str, Any], original_query: str) -> str
     return ""
 
 
-def collect_query_candidates(payload: Any, original_query: str) -> list[str]:
+def collect_query_candidates(
+    payload: Any, original_query: str, scan: PayloadScan | None = None
+) -> list[str]:
     original = clean_text(original_query or "")
     original_l = original.casefold()
     candidates: list[str] = []
@@ -200,7 +508,10 @@ def collect_query_candidates(payload: Any, original_query: str) -> list[str]:
                 ):
                     maybe_add(section.get(key))
 
-    hint_keys = ("query", "suggest", "correct", "spell", "revert", "recommend")
+    if scan is not None:
+        for value in scan.query_values:
+            maybe_add(value)
+        return candidates[:8]
 
     def walk(node: Any, key_hint: str = ""):
         if isinstance(node, dict):
@@ -208,7 +519,7 @@ def collect_query_candidates(payload: Any, original_query: str) -> list[str]:
                 lower_key = str(key).lower()
                 if isinstance(value, (dict, list)):
                     walk(value, lower_key)
-                elif any(h in lower_key for h in hint_keys):
+                elif any(h in lower_key for h in QUERY_HINT_KEYS):
                     maybe_add(value)
             return
         if isinstance(node, list):
@@ -220,33 +531,44 @@ def collect_query_candidates(payload: Any, original_query: str) -> list[str]:
 
 
 def normalize_items_from_payload(
-    payload: dict[str, Any], language: str, seen: set[tuple[str, str, str, str]]
+    payload: dict[str, Any],
+    language: str,
+    seen: set[tuple[str, str, str, str]],
+    scan: PayloadScan | None = None,
 ) -> tuple[list[dict[str, str]], int]:
-    items = extract_direct_items(payload)
-    if not items:
-        items = extract_generic_items(payload, language)
+    if scan is None:
+        scan = PayloadScan(payload)
+    items = PAYLOAD_SHAPES.select_items(scan, language)
 
     normalized: list[dict[str, str]] = []
     for item in items:
-        row = normalize_entry(item, language)
-        if not row:
-            continue
-        if language == "ja":
-            if not (RE_JAPANESE.search(row["word"]) or RE_JAPANESE.search(row["furigana"])):
-                continue
-        else:
-            if not RE_ENGLISH.search(row["word"]):
-                continue
-        key = (row["word"], row["furigana"], row["meaning"], row["example"])
-        if key in seen:
+        row = normalize_entry(item, language, scan)
+        if not accept_normalized_row(row, language, seen):
             continue
-        seen.add(key)
         normalized.append(row)
-        if len(normalized) >= 10:
+        if len(normalized) >= MAX_NORMALIZED_ROWS:
             break
     return normalized, len(items)
 
 
+def accept_normalized_row(
+    row: dict[str, str] | None, language: str, seen: set[tuple[str, str, str, str]]
+) -> bool:
+    if not row:
+        return False
+    if language == "ja":
+        if not (RE_JAPANESE.search(row["word"]) or RE_JAPANESE.search(row["furigana"])):
+            return False
+    else:
+        if not RE_ENGLISH.search(row["word"]):
+            return False
+    key = (row["word"], row["furigana"], row["meaning"], row["example"])
+    if key in seen:
+        return False
+    seen.add(key)
+    return True
+
+
 def sanitize_word_entry(raw: Any) -> dict[str, Any] | None:
     if not isinstance(raw, dict):
         return None
@@ -355,136 +677,837 @@ def sanitize_state(payload: Any) -> dict[str, Any]:
     return {"lists": cleaned_lists, "history": cleaned_history}
 
 
-def _init_state_db_unlocked():
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(STATE_DB_FILE) as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE COLLATE NOCASE,
-                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )
-            """
+class StateDatabase:
+    # Long-lived connections to STATE_DB_FILE, checked out per use. The HTTP server runs a
+    # thread per connection, so connections are pooled rather than kept per thread; each
+    # keeps its prepared statements cached across requests. In WAL mode readers don't block
+    # writers, so read paths take no lock at all.
+    def __init__(self, pool_size: int, journal_mode: str, synchronous: str, cache_kib: int):
+        self.pool_size = pool_size
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_kib = cache_kib
+        self._lock = threading.Lock()
+        self._idle: list[sqlite3.Connection] = []
+        self._db_file: Path | None = None
+        self.opened = 0
+        self.reused = 0
+        self.closed = 0
+
+    def _open(self, db_file: Path) -> sqlite3.Connection:
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False, cached_statements=256)
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{max(0, self.cache_kib)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        db_file = STATE_DB_FILE
+        with self._lock:
+            if self._db_file != db_file:
+                self._close_idle_unlocked()
+                self._db_file = db_file
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            self.opened += 1
+        return self._open(db_file)
+
+    def _checkin(self, conn: sqlite3.Connection):
+        with self._lock:
+            if self._db_file == STATE_DB_FILE and len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+            self.closed += 1
+        conn.close()
+
+    def _close_idle_unlocked(self):
+        for conn in self._idle:
+            conn.close()
+        self.closed += len(self._idle)
+        self._idle.clear()
+
+    @contextmanager
+    def connection(self):
+        conn = self._checkout()
+        try:
+            with conn:
+                yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._checkin(conn)
+
+    @contextmanager
+    def reading(self):
+        # One read transaction, so multi-table reads see a single snapshot.
+        conn = self._checkout()
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._checkin(conn)
+
+    def close(self):
+        with self._lock:
+            self._close_idle_unlocked()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "journalMode": self.journal_mode,
+                "poolSize": self.pool_size,
+                "idle": len(self._idle),
+                "opened": self.opened,
+                "reused": self.reused,
+                "closed": self.closed,
+            }
+
+
+STATE_DB = StateDatabase(STATE_DB_POOL_SIZE, STATE_DB_JOURNAL_MODE, STATE_DB_SYNCHRONOUS, STATE_DB_CACHE_KIB)
+
+
+class StripedLocks:
+    def __init__(self, stripes: int):
+        self._locks = [threading.Lock() for _ in range(max(1, stripes))]
+        self.acquired = 0
+        self.contended = 0
+
+    @contextmanager
+    def hold(self, key: int):
+        lock = self._locks[key % len(self._locks)]
+        started = time.perf_counter()
+        if not lock.acquire(blocking=False):
+            self.contended += 1
+            lock.acquire()
+        self.acquired += 1
+        acquired = time.perf_counter()
+        METRICS.observe("hub_state_lock_wait_seconds", acquired - started, (("lock", "stripe"),))
+        try:
+            yield
+        finally:
+            lock.release()
+            METRICS.observe("hub_state_lock_hold_seconds", time.perf_counter() - acquired, (("lock", "stripe"),))
+
+    def stats(self) -> dict[str, int]:
+        return {"stripes": len(self._locks), "acquired": self.acquired, "contended": self.contended}
+
+
+STATE_USER_LOCKS = StripedLocks(STATE_LOCK_STRIPES)
+
+
+@contextmanager
+def timed_lock(lock: threading.Lock, name: str):
+    started = time.perf_counter()
+    with lock:
+        acquired = time.perf_counter()
+        METRICS.observe("hub_state_lock_wait_seconds", acquired - started, (("lock", name),))
+        try:
+            yield
+        finally:
+            METRICS.observe("hub_state_lock_hold_seconds", time.perf_counter() - acquired, (("lock", name),))
+
+
+@contextmanager
+def user_state_transaction(user_id: int):
+    # Writes for one profile queue on its stripe and apply in order; other profiles only
+    # share SQLite's write lock for the length of the IMMEDIATE transaction. STATE_LOCK is
+    # left to user create/delete and migrations.
+    with STATE_USER_LOCKS.hold(user_id):
+        with STATE_DB.connection() as conn:
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            acquired = time.perf_counter()
+            METRICS.observe("hub_state_lock_wait_seconds", acquired - started, (("lock", "sqlite"),))
+            try:
+                if conn.execute("SELECT 1 FROM users WHERE id = ?", (user_id,)).fetchone() is None:
+                    raise ValueError("Unknown user.")
+                yield conn
+            finally:
+                METRICS.observe("hub_state_lock_hold_seconds", time.perf_counter() - acquired, (("lock", "sqlite"),))
+
+
+def _migrate_base_tables(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS user_state (
-                user_id INTEGER PRIMARY KEY,
-                value TEXT NOT NULL,
-                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_state (
+            user_id INTEGER PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS app_state (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL,
-                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS app_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
         )
-        conn.commit()
+        """
+    )
 
-    # One-time migration from legacy JSON file / app_state row into user_state.
-    # This keeps existing data intact after introducing usernames.
-    with sqlite3.connect(STATE_DB_FILE) as conn:
-        user_count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
-        if user_count == 0:
-            # Create default user.
-            conn.execute("INSERT INTO users (name) VALUES (?)", ("bill",))
-            conn.commit()
 
-    with sqlite3.connect(STATE_DB_FILE) as conn:
-        default_user_id = conn.execute(
-            "SELECT id FROM users ORDER BY id ASC LIMIT 1"
-        ).fetchone()[0]
-        has_state = conn.execute(
-            "SELECT 1 FROM user_state WHERE user_id = ?",
-            (default_user_id,),
-        ).fetchone()
-        if has_state:
-            return
+def _migrate_relational_state(conn: sqlite3.Connection):
+    # Relational state: one row per list, word and history entry. Rows are ordered by
+    # a REAL position so an insert between two rows doesn't renumber the rest.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_state_meta (
+            user_id INTEGER PRIMARY KEY,
+            revision INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS state_lists (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            position REAL NOT NULL,
+            list_id TEXT NOT NULL,
+            name TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS state_lists_user ON state_lists(user_id, position)")
+    conn.execute("CREATE INDEX IF NOT EXISTS state_lists_list_id ON state_lists(user_id, list_id)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS state_words (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            list_row INTEGER NOT NULL,
+            position REAL NOT NULL,
+            word TEXT NOT NULL,
+            value TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS state_words_list ON state_words(list_row, position)")
+    conn.execute("CREATE INDEX IF NOT EXISTS state_words_user ON state_words(user_id)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS state_history (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            position REAL NOT NULL,
+            entry_id TEXT NOT NULL,
+            query TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS state_history_user ON state_history(user_id, position)")
+
+
+def _migrate_state_ops(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS state_ops (
+            user_id INTEGER NOT NULL,
+            revision INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, revision)
+        )
+        """
+    )
 
-    migrated_payload: dict[str, Any] | None = None
 
-    if not LEGACY_STATE_FILE.exists():
-        with sqlite3.connect(STATE_DB_FILE) as conn:
+def _migrate_legacy_state(conn: sqlite3.Connection):
+    # One-time migration from legacy JSON file / app_state row into user_state.
+    # This keeps existing data intact after introducing usernames.
+    user_count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    if user_count == 0:
+        # Create default user.
+        conn.execute("INSERT INTO users (name) VALUES (?)", ("bill",))
+
+    default_user_id = conn.execute("SELECT id FROM users ORDER BY id ASC LIMIT 1").fetchone()[0]
+    has_state = conn.execute(
+        """
+        SELECT 1 FROM user_state WHERE user_id = ?
+        UNION ALL
+        SELECT 1 FROM user_state_meta WHERE user_id = ?
+        """,
+        (default_user_id, default_user_id),
+    ).fetchone()
+    if not has_state:
+        migrated_payload: dict[str, Any] | None = None
+        if not LEGACY_STATE_FILE.exists():
             row = conn.execute(
                 "SELECT value FROM app_state WHERE key = ?",
                 (STATE_ROW_KEY,),
             ).fetchone()
-        if row:
+            if row:
+                try:
+                    migrated_payload = sanitize_state(json.loads(row[0]))
+                except Exception:
+                    migrated_payload = None
+        else:
             try:
-                migrated_payload = sanitize_state(json.loads(row[0]))
+                parsed = json.loads(LEGACY_STATE_FILE.read_text(encoding="utf-8"))
+                migrated_payload = sanitize_state(parsed)
             except Exception:
                 migrated_payload = None
-    else:
+        if migrated_payload is None:
+            migrated_payload = {"lists": [], "history": []}
+        conn.execute(
+            "INSERT INTO user_state (user_id, value) VALUES (?, ?)",
+            (default_user_id, json.dumps(migrated_payload, ensure_ascii=False, separators=(",", ":"))),
+        )
+
+    # Copy per-user JSON blobs (user_state.value) into the relational tables. The blobs
+    # stay until step 6, after step 5 has backed them up; one that won't parse is never
+    # converted, so it stays in user_state rather than being replaced with an empty state.
+    rows = conn.execute("SELECT user_id, value FROM user_state").fetchall()
+    for user_id, value in rows:
+        has_rows = conn.execute("SELECT 1 FROM user_state_meta WHERE user_id = ?", (user_id,)).fetchone()
+        if has_rows:
+            continue
         try:
-            parsed = json.loads(LEGACY_STATE_FILE.read_text(encoding="utf-8"))
-            migrated_payload = sanitize_state(parsed)
+            migrated = sanitize_state(json.loads(value or "{}"))
         except Exception:
-            migrated_payload = None
+            continue
+        _write_state_unlocked(conn, int(user_id), migrated)
+        # Written by hand rather than through _append_ops_unlocked: this step only knows
+        # the op log as step 3 created it.
+        conn.execute(
+            "INSERT OR REPLACE INTO state_ops (user_id, revision, op) VALUES (?, 1, ?)",
+            (user_id, STATE_ROW_ENCODER.encode({"op": "replace"})),
+        )
+        conn.execute("INSERT INTO user_state_meta (user_id, revision) VALUES (?, 1)", (user_id,))
+
+
+def _migrate_backup_state_blobs(conn: sqlite3.Connection):
+    # Copies every per-user JSON blob aside, in its own committed step, before step 6
+    # deletes the ones step 4 converted.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_state_legacy (
+            user_id INTEGER PRIMARY KEY,
+            value TEXT NOT NULL,
+            copied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    conn.execute("INSERT OR IGNORE INTO user_state_legacy (user_id, value) SELECT user_id, value FROM user_state")
 
-    if migrated_payload is None:
-        migrated_payload = {"lists": [], "history": []}
 
-    with sqlite3.connect(STATE_DB_FILE) as conn:
-        conn.execute(
-            """
-            INSERT INTO user_state (user_id, value, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(user_id) DO UPDATE SET
-                value = excluded.value,
-                updated_at = CURRENT_TIMESTAMP
-            """,
-            (
-                default_user_id,
-                json.dumps(migrated_payload, ensure_ascii=False, separators=(",", ":")),
-            ),
+def _migrate_drop_imported_state_blobs(conn: sqlite3.Connection):
+    conn.execute("DELETE FROM user_state WHERE user_id IN (SELECT user_id FROM user_state_meta)")
+
+
+def _migrate_state_op_ids(conn: sqlite3.Connection):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(state_ops)")}
+    if "op_id" not in columns:
+        conn.execute("ALTER TABLE state_ops ADD COLUMN op_id TEXT")
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS state_ops_op_id ON state_ops(user_id, op_id) WHERE op_id IS NOT NULL"
+    )
+
+
+# Applied in order, once per database, each in its own transaction. Databases created
+# before schema_version existed start at 0; every step is safe to re-run over them.
+# Append only: a step may rely on the schema of earlier steps, never on a later one.
+STATE_MIGRATIONS = [
+    (1, "base tables", _migrate_base_tables),
+    (2, "relational state", _migrate_relational_state),
+    (3, "state op log", _migrate_state_ops),
+    (4, "legacy state import", _migrate_legacy_state),
+    (5, "legacy state backup", _migrate_backup_state_blobs),
+    (6, "drop imported state blobs", _migrate_drop_imported_state_blobs),
+    (7, "state op ids", _migrate_state_op_ids),
+]
+STATE_SCHEMA_VERSION = STATE_MIGRATIONS[-1][0]
+STATE_SCHEMA_READY: set[str] = set()
+
+
+def migrate_state_db() -> list[int]:
+    applied: list[int] = []
+    with timed_lock(STATE_LOCK, "state"):
+        with STATE_DB.connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+            conn.commit()
+            for version, name, migrate in STATE_MIGRATIONS:
+                conn.execute("BEGIN IMMEDIATE")
+                done = conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone()
+                if done:
+                    conn.rollback()
+                    continue
+                migrate(conn)
+                conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+                conn.commit()
+                applied.append(version)
+        STATE_SCHEMA_READY.add(str(STATE_DB_FILE))
+    return applied
+
+
+def unreadable_state_users() -> list[int]:
+    # Once migrated, user_state only holds blobs step 4 could not parse.
+    with STATE_DB.reading() as conn:
+        return [int(row[0]) for row in conn.execute("SELECT user_id FROM user_state ORDER BY user_id")]
+
+
+STATE_STORE_STATS = {"saves": 0, "rowsWritten": 0}
+STATE_OPS_STATS = {"batches": 0, "applied": 0, "rejected": 0, "duplicates": 0, "replayed": 0, "resyncs": 0}
+STATE_ETAG_STATS = {"notModified": 0, "sent": 0}
+
+
+STATE_ROW_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _encode_word(word: dict[str, Any]) -> str:
+    return STATE_ROW_ENCODER.encode(word)
+
+
+def _positions_between(lower: float | None, upper: float | None, count: int) -> list[float]:
+    if lower is None and upper is None:
+        return [float(index) for index in range(count)]
+    if upper is None:
+        return [lower + index + 1 for index in range(count)]
+    if lower is None:
+        return [upper - count + index for index in range(count)]
+    step = (upper - lower) / (count + 1)
+    return [lower + step * (index + 1) for index in range(count)]
+
+
+def _sync_ordered_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    scope: dict[str, Any],
+    columns: tuple[str, ...],
+    wanted: list[tuple[Any, ...]],
+) -> int:
+    # Diff the stored rows of one ordered collection against `wanted` and write only the
+    # rows that changed; untouched rows keep their id and position.
+    where = " AND ".join(f"{name} = ?" for name in scope)
+    select_columns = ", ".join(columns)
+    existing = conn.execute(
+        f"SELECT id, position, {select_columns} FROM {table} WHERE {where} ORDER BY position, id",
+        tuple(scope.values()),
+    ).fetchall()
+    old_values = [tuple(row[2:]) for row in existing]
+    if old_values == wanted:
+        return 0
+
+    positions = [row[1] for row in existing]
+    if len(set(positions)) != len(positions) or any(
+        b - a < 1e-6 for a, b in zip(positions, positions[1:])
+    ):
+        # Fractional positions ran out of room; renumber once.
+        for index, row in enumerate(existing):
+            conn.execute(f"UPDATE {table} SET position = ? WHERE id = ?", (float(index), row[0]))
+        positions = [float(index) for index in range(len(existing))]
+
+    insert_sql = (
+        f"INSERT INTO {table} ({', '.join(scope)}, position, {select_columns}) "
+        f"VALUES ({', '.join('?' for _ in range(len(scope) + 1 + len(columns)))})"
+    )
+    update_sql = f"UPDATE {table} SET {', '.join(f'{name} = ?' for name in columns)} WHERE id = ?"
+    written = 0
+    matcher = difflib.SequenceMatcher(None, old_values, wanted, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        updated = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for offset in range(updated):
+            conn.execute(update_sql, (*wanted[j1 + offset], existing[i1 + offset][0]))
+        for row in existing[i1 + updated:i2]:
+            conn.execute(f"DELETE FROM {table} WHERE id = ?", (row[0],))
+        inserts = wanted[j1 + updated:j2]
+        if inserts:
+            anchor = i1 + updated
+            lower = positions[anchor - 1] if anchor > 0 else None
+            upper = positions[i2] if i2 < len(positions) else None
+            for position, values in zip(_positions_between(lower, upper, len(inserts)), inserts):
+                conn.execute(insert_sql, (*scope.values(), position, *values))
+        written += (i2 - i1) + len(inserts)
+    return written
+
+
+def _write_state_unlocked(conn: sqlite3.Connection, user_id: int, state: dict[str, Any]) -> int:
+    written = 0
+    existing_lists: dict[str, list[tuple[int, float, str]]] = {}
+    for row_id, position, list_id, name in conn.execute(
+        "SELECT id, position, list_id, name FROM state_lists WHERE user_id = ? ORDER BY position, id",
+        (user_id,),
+    ):
+        existing_lists.setdefault(list_id, []).append((row_id, position, name))
+
+    for index, row in enumerate(state["lists"]):
+        matches = existing_lists.get(row["id"])
+        if matches:
+            row_id, position, name = matches.pop(0)
+            if position != index or name != row["name"]:
+                conn.execute(
+                    "UPDATE state_lists SET position = ?, name = ? WHERE id = ?",
+                    (float(index), row["name"], row_id),
+                )
+                written += 1
+        else:
+            row_id = conn.execute(
+                "INSERT INTO state_lists (user_id, position, list_id, name) VALUES (?, ?, ?, ?)",
+                (user_id, float(index), row["id"], row["name"]),
+            ).lastrowid
+            written += 1
+        written += _sync_ordered_rows(
+            conn,
+            "state_words",
+            {"user_id": user_id, "list_row": row_id},
+            ("word", "value"),
+            [(word["word"], _encode_word(word)) for word in row["words"]],
         )
-        conn.commit()
 
+    for leftovers in existing_lists.values():
+        for row_id, _, _ in leftovers:
+            conn.execute("DELETE FROM state_words WHERE list_row = ?", (row_id,))
+            conn.execute("DELETE FROM state_lists WHERE id = ?", (row_id,))
+            written += 1
+
+    written += _sync_ordered_rows(
+        conn,
+        "state_history",
+        {"user_id": user_id},
+        ("entry_id", "query", "created_at"),
+        [(entry["id"], entry["query"], entry["createdAt"]) for entry in state["history"]],
+    )
+    STATE_STORE_STATS["saves"] += 1
+    STATE_STORE_STATS["rowsWritten"] += written
+    return written
 
-def init_state_db():
-    with STATE_LOCK:
-        _init_state_db_unlocked()
 
+def _read_list_unlocked(conn: sqlite3.Connection, row_id: int, list_id: str, name: str) -> dict[str, Any]:
+    words = [
+        json.loads(value)
+        for (value,) in conn.execute(
+            "SELECT value FROM state_words WHERE list_row = ? ORDER BY position, id", (row_id,)
+        )
+    ]
+    return {"id": list_id, "name": name, "words": words}
+
+
+def _read_state_unlocked(conn: sqlite3.Connection, user_id: int) -> dict[str, Any]:
+    lists = [
+        _read_list_unlocked(conn, row_id, list_id, name)
+        for row_id, list_id, name in conn.execute(
+            "SELECT id, list_id, name FROM state_lists WHERE user_id = ? ORDER BY position, id",
+            (user_id,),
+        ).fetchall()
+    ]
+    history = [
+        {"id": entry_id, "query": query, "createdAt": created_at}
+        for entry_id, query, created_at in conn.execute(
+            "SELECT entry_id, query, created_at FROM state_history WHERE user_id = ? ORDER BY position, id",
+            (user_id,),
+        )
+    ]
+    return {"lists": lists, "history": history}
 
-def resolve_user_id_unlocked(user_ref: str | None, default_if_missing: bool = True) -> int | None:
-    with sqlite3.connect(STATE_DB_FILE) as conn:
-        if user_ref:
-            clean_ref = sanitize_user_name(user_ref)
-            if clean_ref.isdigit():
-                row = conn.execute(
-                    "SELECT id FROM users WHERE id = ?",
-                    (int(clean_ref),),
-                ).fetchone()
-            else:
-                row = conn.execute(
-                    "SELECT id FROM users WHERE name = ? COLLATE NOCASE",
-                    (clean_ref,),
-                ).fetchone()
-            if row:
-                return int(row[0])
+
+def _state_revision_unlocked(conn: sqlite3.Connection, user_id: int) -> int:
+    row = conn.execute("SELECT revision FROM user_state_meta WHERE user_id = ?", (user_id,)).fetchone()
+    return int(row[0]) if row else 0
+
+
+def _append_ops_unlocked(conn: sqlite3.Connection, user_id: int, ops: list[dict[str, Any]]) -> int:
+    # Each op gets its own revision; a {"op": "replace"} entry marks a full-state write
+    # that clients can't replay and must resync across.
+    revision = _state_revision_unlocked(conn, user_id)
+    for op in ops:
+        revision += 1
+        conn.execute(
+            "INSERT OR REPLACE INTO state_ops (user_id, revision, op, op_id) VALUES (?, ?, ?, ?)",
+            (user_id, revision, STATE_ROW_ENCODER.encode(op), op.get("opId")),
+        )
+    conn.execute(
+        """
+        INSERT INTO user_state_meta (user_id, revision, updated_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(user_id) DO UPDATE SET
+            revision = excluded.revision,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (user_id, revision),
+    )
+    conn.execute(
+        "DELETE FROM state_ops WHERE user_id = ? AND revision <= ?",
+        (user_id, revision - STATE_OPS_RETAINED),
+    )
+    return revision
+
+
+def _ops_since_unlocked(
+    conn: sqlite3.Connection, user_id: int, since: int, until: int
+) -> list[dict[str, Any]] | None:
+    # Ops with since < revision <= until, or None when the client has to resync: the log
+    # no longer reaches back that far, or a full replace happened in between.
+    if since >= until:
+        return []
+    rows = conn.execute(
+        "SELECT revision, op FROM state_ops WHERE user_id = ? AND revision > ? AND revision <= ? ORDER BY revision",
+        (user_id, since, until),
+    ).fetchall()
+    if since < 0 or len(rows) != until - since:
+        return None
+    ops = []
+    for revision, value in rows:
+        op = json.loads(value)
+        if op.get("op") == "replace":
             return None
+        op["revision"] = revision
+        ops.append(op)
+    return ops
 
-        if default_if_missing:
-            row = conn.execute("SELECT id FROM users ORDER BY id ASC LIMIT 1").fetchone()
-            if row:
-                return int(row[0])
+
+def _op_id(raw: Any) -> str | None:
+    op_id = raw.get("opId") if isinstance(raw, dict) else None
+    if op_id is None:
+        return None
+    if not isinstance(op_id, str) or not 0 < len(op_id) <= 64:
+        raise ValueError("Invalid opId.")
+    return op_id
+
+
+def _logged_op_unlocked(conn: sqlite3.Connection, user_id: int, op_id: str) -> dict[str, Any] | None:
+    row = conn.execute(
+        "SELECT revision, op FROM state_ops WHERE user_id = ? AND op_id = ?", (user_id, op_id)
+    ).fetchone()
+    if row is None:
+        return None
+    return {**json.loads(row[1]), "revision": int(row[0]), "duplicate": True}
+
+
+def _word_key(word: dict[str, Any]) -> tuple[str, str]:
+    return (str(word.get("word") or ""), str(word.get("furigana") or ""))
+
+
+def _find_list_row_unlocked(conn: sqlite3.Connection, user_id: int, list_id: str) -> int:
+    row = conn.execute(
+        "SELECT id FROM state_lists WHERE user_id = ? AND list_id = ? ORDER BY position, id LIMIT 1",
+        (user_id, list_id),
+    ).fetchone()
+    if row is None:
+        raise ValueError("Unknown list.")
+    return int(row[0])
+
+
+def _locate_word_unlocked(
+    rows: list[tuple[int, float, str, str]], index: Any, match: Any
+) -> int:
+    if not isinstance(match, dict):
+        raise ValueError("Missing word match.")
+    key = (clean_text(str(match.get("word") or "")), clean_text(str(match.get("furigana") or "")))
+    candidates = [
+        position
+        for position, row in enumerate(rows)
+        if row[2] == key[0] and _word_key(json.loads(row[3])) == key
+    ]
+    if not candidates:
+        raise ValueError("Word not found.")
+    # Prefer the occurrence closest to where the client saw it.
+    target = index if isinstance(index, int) else 0
+    return min(candidates, key=lambda position: (abs(position - target), position))
+
+
+def _insert_index(index: Any, length: int) -> int:
+    if isinstance(index, int) and not isinstance(index, bool):
+        return max(0, min(index, length))
+    return length
+
+
+def _apply_state_op_unlocked(conn: sqlite3.Connection, user_id: int, raw: Any) -> dict[str, Any]:
+    # Validates and applies one client op against the rows it touches; returns the
+    # normalized op as it is logged and replayed to other clients.
+    if not isinstance(raw, dict):
+        raise ValueError("Invalid op.")
+    kind = str(raw.get("op") or "")
+
+    if kind in ("addWord", "removeWord", "updateWord"):
+        list_id = clean_text(str(raw.get("listId") or ""))
+        list_row = _find_list_row_unlocked(conn, user_id, list_id)
+        rows = conn.execute(
+            "SELECT id, position, word, value FROM state_words WHERE list_row = ? ORDER BY position, id",
+            (list_row,),
+        ).fetchall()
+        if kind == "addWord":
+            word = sanitize_word_entry(raw.get("word"))
+            if word is None:
+                raise ValueError("Invalid word.")
+            index = _insert_index(raw.get("index"), len(rows))
+            lower = rows[index - 1][1] if index > 0 else None
+            upper = rows[index][1] if index < len(rows) else None
+            conn.execute(
+                "INSERT INTO state_words (user_id, list_row, position, word, value) VALUES (?, ?, ?, ?, ?)",
+                (user_id, list_row, _positions_between(lower, upper, 1)[0], word["word"], _encode_word(word)),
+            )
+            return {"op": kind, "listId": list_id, "index": index, "word": word}
+        index = _locate_word_unlocked(rows, raw.get("index"), raw.get("match"))
+        match = dict(zip(("word", "furigana"), _word_key(json.loads(rows[index][3]))))
+        if kind == "removeWord":
+            conn.execute("DELETE FROM state_words WHERE id = ?", (rows[index][0],))
+            return {"op": kind, "listId": list_id, "index": index, "match": match}
+        word = sanitize_word_entry(raw.get("word"))
+        if word is None:
+            raise ValueError("Invalid word.")
+        conn.execute(
+            "UPDATE state_words SET word = ?, value = ? WHERE id = ?",
+            (word["word"], _encode_word(word), rows[index][0]),
+        )
+        return {"op": kind, "listId": list_id, "index": index, "match": match, "word": word}
+
+    if kind == "addList":
+        list_id = clean_text(str(raw.get("listId") or ""))
+        name = clean_text(str(raw.get("name") or ""))
+        if not list_id or not name:
+            raise ValueError("List id and name are required.")
+        lists = conn.execute(
+            "SELECT id, position, list_id FROM state_lists WHERE user_id = ? ORDER BY position, id",
+            (user_id,),
+        ).fetchall()
+        if any(row[2] == list_id for row in lists):
+            raise ValueError("List already exists.")
+        if len(lists) >= 200:
+            raise ValueError("Too many lists.")
+        words = []
+        for maybe_word in raw.get("words") or []:
+            word = sanitize_word_entry(maybe_word)
+            if word:
+                words.append(word)
+        index = _insert_index(raw.get("index"), len(lists))
+        lower = lists[index - 1][1] if index > 0 else None
+        upper = lists[index][1] if index < len(lists) else None
+        list_row = conn.execute(
+            "INSERT INTO state_lists (user_id, position, list_id, name) VALUES (?, ?, ?, ?)",
+            (user_id, _positions_between(lower, upper, 1)[0], list_id, name),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO state_words (user_id, list_row, position, word, value) VALUES (?, ?, ?, ?, ?)",
+            [
+                (user_id, list_row, float(position), word["word"], _encode_word(word))
+                for position, word in enumerate(words)
+            ],
+        )
+        return {"op": kind, "listId": list_id, "name": name, "index": index, "words": words}
+
+    if kind in ("removeList", "renameList"):
+        list_id = clean_text(str(raw.get("listId") or ""))
+        list_row = _find_list_row_unlocked(conn, user_id, list_id)
+        if kind == "removeList":
+            conn.execute("DELETE FROM state_words WHERE list_row = ?", (list_row,))
+            conn.execute("DELETE FROM state_lists WHERE id = ?", (list_row,))
+            return {"op": kind, "listId": list_id}
+        name = clean_text(str(raw.get("name") or ""))
+        if not name:
+            raise ValueError("List name is required.")
+        conn.execute("UPDATE state_lists SET name = ? WHERE id = ?", (name, list_row))
+        return {"op": kind, "listId": list_id, "name": name}
+
+    if kind == "addHistory":
+        entry = sanitize_history_entry(raw.get("entry"))
+        if entry is None:
+            raise ValueError("Invalid history entry.")
+        rows = conn.execute(
+            "SELECT id, position FROM state_history WHERE user_id = ? ORDER BY position, id",
+            (user_id,),
+        ).fetchall()
+        index = _insert_index(raw.get("index"), len(rows))
+        lower = rows[index - 1][1] if index > 0 else None
+        upper = rows[index][1] if index < len(rows) else None
+        conn.execute(
+            "INSERT INTO state_history (user_id, position, entry_id, query, created_at) VALUES (?, ?, ?, ?, ?)",
+            (user_id, _positions_between(lower, upper, 1)[0], entry["id"], entry["query"], entry["createdAt"]),
+        )
+        if len(rows) >= 1000:
+            conn.execute(
+                """
+                DELETE FROM state_history WHERE id IN (
+                    SELECT id FROM state_history WHERE user_id = ?
+                    ORDER BY position, id LIMIT -1 OFFSET 1000
+                )
+                """,
+                (user_id,),
+            )
+        return {"op": kind, "index": index, "entry": entry}
+
+    if kind == "removeHistory":
+        entry_id = clean_text(str(raw.get("id") or ""))
+        row = conn.execute(
+            "SELECT id FROM state_history WHERE user_id = ? AND entry_id = ? ORDER BY position, id LIMIT 1",
+            (user_id, entry_id),
+        ).fetchone()
+        if row is None:
+            raise ValueError("History entry not found.")
+        conn.execute("DELETE FROM state_history WHERE id = ?", (row[0],))
+        return {"op": kind, "id": entry_id}
+
+    raise ValueError(f"Unknown op: {kind or '?'}")
+
+
+def init_state_db():
+    # main() migrates at startup; after that this is a set lookup per request.
+    if str(STATE_DB_FILE) not in STATE_SCHEMA_READY:
+        migrate_state_db()
+
+
+def resolve_user_id_unlocked(
+    user_ref: str | None, default_if_missing: bool = True, conn: sqlite3.Connection | None = None
+) -> int | None:
+    if conn is None:
+        with STATE_DB.reading() as conn:
+            return resolve_user_id_unlocked(user_ref, default_if_missing, conn)
+    if user_ref:
+        clean_ref = sanitize_user_name(user_ref)
+        if clean_ref.isdigit():
+            row = conn.execute(
+                "SELECT id FROM users WHERE id = ?",
+                (int(clean_ref),),
+            ).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT id FROM users WHERE name = ? COLLATE NOCASE",
+                (clean_ref,),
+            ).fetchone()
+        if row:
+            return int(row[0])
         return None
 
+    if default_if_missing:
+        row = conn.execute("SELECT id FROM users ORDER BY id ASC LIMIT 1").fetchone()
+        if row:
+            return int(row[0])
+    return None
+
 
 def list_users() -> list[dict[str, Any]]:
-    with STATE_LOCK:
-        _init_state_db_unlocked()
-        with sqlite3.connect(STATE_DB_FILE) as conn:
-            rows = conn.execute(
-                "SELECT id, name, created_at FROM users ORDER BY id ASC"
-            ).fetchall()
+    init_state_db()
+    with STATE_DB.reading() as conn:
+        rows = conn.execute(
+            "SELECT id, name, created_at FROM users ORDER BY id ASC"
+        ).fetchall()
     return [{"id": str(row[0]), "name": row[1], "createdAt": row[2]} for row in rows]
 
 
@@ -492,10 +1515,10 @@ def create_user(name: str) -> dict[str, Any]:
     clean_name = sanitize_user_name(name)
     if not clean_name:
         raise ValueError("Please enter a username.")
-    with STATE_LOCK:
-        _init_state_db_unlocked()
+    init_state_db()
+    with timed_lock(STATE_LOCK, "state"):
         try:
-            with sqlite3.connect(STATE_DB_FILE) as conn:
+            with STATE_DB.connection() as conn:
                 conn.execute("INSERT INTO users (name) VALUES (?)", (clean_name,))
                 user_row = conn.execute(
                     "SELECT id, name, created_at FROM users WHERE name = ? COLLATE NOCASE",
@@ -503,19 +1526,8 @@ def create_user(name: str) -> dict[str, Any]:
                 ).fetchone()
                 if user_row:
                     conn.execute(
-                        """
-                        INSERT INTO user_state (user_id, value, updated_at)
-                        VALUES (?, ?, CURRENT_TIMESTAMP)
-                        ON CONFLICT(user_id) DO NOTHING
-                        """,
-                        (
-                            int(user_row[0]),
-                            json.dumps(
-                                {"lists": [], "history": []},
-                                ensure_ascii=False,
-                                separators=(",", ":"),
-                            ),
-                        ),
+                        "INSERT INTO user_state_meta (user_id) VALUES (?) ON CONFLICT(user_id) DO NOTHING",
+                        (int(user_row[0]),),
                     )
                 conn.commit()
         except sqlite3.IntegrityError:
@@ -529,9 +1541,10 @@ def delete_user(user_ref: str) -> dict[str, Any]:
     if not clean_ref:
         raise ValueError("Unknown user.")
 
-    with STATE_LOCK:
-        _init_state_db_unlocked()
-        with sqlite3.connect(STATE_DB_FILE) as conn:
+    init_state_db()
+    with timed_lock(STATE_LOCK, "state"):
+        with STATE_DB.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
             row = None
             if clean_ref.isdigit():
                 row = conn.execute(
@@ -550,54 +1563,200 @@ def delete_user(user_ref: str) -> dict[str, Any]:
             if count <= 1:
                 raise ValueError("At least one profile must remain.")
 
-            conn.execute("DELETE FROM users WHERE id = ?", (int(row[0]),))
+            user_id = int(row[0])
+            conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+            for table in ("user_state", "user_state_legacy", "user_state_meta", "state_lists", "state_words", "state_history", "state_ops"):
+                conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
             conn.commit()
             return {"id": str(row[0]), "name": row[1]}
 
 
 def load_saved_state(user_ref: str | None = None) -> dict[str, Any]:
-    with STATE_LOCK:
-        _init_state_db_unlocked()
-        try:
-            user_id = resolve_user_id_unlocked(user_ref, default_if_missing=True)
+    init_state_db()
+    try:
+        with STATE_DB.reading() as conn:
+            user_id = resolve_user_id_unlocked(user_ref, default_if_missing=True, conn=conn)
             if user_id is None:
                 return {"lists": [], "history": []}
-            with sqlite3.connect(STATE_DB_FILE) as conn:
-                row = conn.execute(
-                    "SELECT value FROM user_state WHERE user_id = ?",
-                    (user_id,),
-                ).fetchone()
-                if row is None:
-                    return {"lists": [], "history": []}
-            parsed = json.loads(row[0] or "{}")
-            return sanitize_state(parsed)
-        except Exception:
-            return {"lists": [], "history": []}
+            state = _read_state_unlocked(conn, user_id)
+            state["revision"] = _state_revision_unlocked(conn, user_id)
+            return state
+    except Exception:
+        return {"lists": [], "history": []}
+
+
+def load_state_version(user_ref: str | None = None) -> tuple[int, str, int] | None:
+    # What a state ETag is built from, read without touching the lists: the revision moves
+    # on every write, and created_at keeps a recycled user id from matching an old tag.
+    init_state_db()
+    try:
+        with STATE_DB.reading() as conn:
+            user_id = resolve_user_id_unlocked(user_ref, default_if_missing=True, conn=conn)
+            if user_id is None:
+                return None
+            row = conn.execute(
+                """
+                SELECT users.created_at, COALESCE(user_state_meta.revision, 0)
+                FROM users LEFT JOIN user_state_meta ON user_state_meta.user_id = users.id
+                WHERE users.id = ?
+                """,
+                (user_id,),
+            ).fetchone()
+    except Exception:
+        return None
+    if row is None:
+        return None
+    return user_id, str(row[0]), int(row[1])
+
+
+def state_etag(version: tuple[int, str, int], list_id: str = "") -> str:
+    # Weak, since the same state may go out identity, gzip or br encoded.
+    user_id, created_at, revision = version
+    digest = hashlib.sha1(f"{user_id}:{created_at}:{list_id}".encode("utf-8")).hexdigest()[:12]
+    return f'W/"{revision}-{digest}"'
+
+
+def users_etag(users: list[dict[str, Any]]) -> str:
+    encoded = json.dumps(users, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return f'W/"{hashlib.sha1(encoded).hexdigest()[:16]}"'
+
+
+def load_saved_list(list_id: str, user_ref: str | None = None) -> dict[str, Any] | None:
+    init_state_db()
+    with STATE_DB.reading() as conn:
+        user_id = resolve_user_id_unlocked(user_ref, default_if_missing=True, conn=conn)
+        if user_id is None:
+            return None
+        row = conn.execute(
+            """
+            SELECT id, list_id, name FROM state_lists
+            WHERE user_id = ? AND list_id = ?
+            ORDER BY position, id LIMIT 1
+            """,
+            (user_id, list_id),
+        ).fetchone()
+        if row is None:
+            return None
+        return _read_list_unlocked(conn, *row)
+
+
+def iter_saved_states() -> list[dict[str, Any]]:
+    init_state_db()
+    with STATE_DB.reading() as conn:
+        user_ids = [row[0] for row in conn.execute("SELECT user_id FROM user_state_meta")]
+        return [_read_state_unlocked(conn, user_id) for user_id in user_ids]
 
 
 def save_state(payload: Any, user_ref: str | None = None) -> dict[str, Any]:
     normalized = sanitize_state(payload)
-    with STATE_LOCK:
-        _init_state_db_unlocked()
-        user_id = resolve_user_id_unlocked(user_ref, default_if_missing=True)
+    init_state_db()
+    user_id = resolve_user_id_unlocked(user_ref, default_if_missing=True)
+    if user_id is None:
+        return normalized
+    with user_state_transaction(user_id) as conn:
+        _write_state_unlocked(conn, user_id, normalized)
+        revision = _append_ops_unlocked(conn, user_id, [{"op": "replace"}])
+    SUGGEST_INDEX.add_state(normalized)
+    return {**normalized, "revision": revision}
+
+
+def apply_state_ops(payload: Any, user_ref: str | None = None) -> dict[str, Any]:
+    if not isinstance(payload, dict) or not isinstance(payload.get("ops"), list):
+        raise ValueError("Expected {baseRevision, ops}.")
+    ops = payload["ops"]
+    if len(ops) > STATE_OPS_MAX_BATCH:
+        raise ValueError(f"At most {STATE_OPS_MAX_BATCH} ops per batch.")
+    base = payload.get("baseRevision")
+    base = base if isinstance(base, int) and not isinstance(base, bool) else -1
+
+    applied: list[dict[str, Any]] = []
+    rejected: list[dict[str, Any]] = []
+    init_state_db()
+    user_id = resolve_user_id_unlocked(user_ref, default_if_missing=True)
+    if user_id is None:
+        raise ValueError("Unknown user.")
+    # A client that lost a response resends the same ops with the same opIds: those are
+    # answered from the log with their original revision instead of applied again.
+    results: list[dict[str, Any]] = []
+    own_ids: set[str] = set()
+    with user_state_transaction(user_id) as conn:
+        current = _state_revision_unlocked(conn, user_id)
+        missed = _ops_since_unlocked(conn, user_id, base, current)
+        for index, raw in enumerate(ops):
+            # Each op runs in its own savepoint so a rejected one leaves no partial rows.
+            conn.execute("SAVEPOINT state_op")
+            try:
+                op_id = _op_id(raw)
+                if op_id is not None and op_id in own_ids:
+                    raise ValueError("Duplicate opId in batch.")
+                logged = _logged_op_unlocked(conn, user_id, op_id) if op_id is not None else None
+                if logged is not None:
+                    results.append(logged)
+                else:
+                    op = _apply_state_op_unlocked(conn, user_id, raw)
+                    if op_id is not None:
+                        op["opId"] = op_id
+                    applied.append(op)
+                    results.append(op)
+                if op_id is not None:
+                    own_ids.add(op_id)
+                conn.execute("RELEASE state_op")
+            except Exception as exc:
+                conn.execute("ROLLBACK TO state_op")
+                conn.execute("RELEASE state_op")
+                rejected.append({"index": index, "reason": str(exc)})
+        revision = _append_ops_unlocked(conn, user_id, applied) if applied else current
+        state = _read_state_unlocked(conn, user_id) if missed is None or rejected else None
+    for offset, op in enumerate(applied):
+        op["revision"] = current + offset + 1
+    if missed and own_ids:
+        # The client already has its own ops from an earlier attempt.
+        missed = [op for op in missed if op.get("opId") not in own_ids]
+
+    STATE_OPS_STATS["batches"] += 1
+    STATE_OPS_STATS["applied"] += len(applied)
+    STATE_OPS_STATS["rejected"] += len(rejected)
+    STATE_OPS_STATS["duplicates"] += len(results) - len(applied)
+    if missed is None:
+        STATE_OPS_STATS["resyncs"] += 1
+    else:
+        STATE_OPS_STATS["replayed"] += len(missed)
+
+    touched: dict[str, Any] = {"lists": [{"words": []}], "history": []}
+    for op in applied:
+        if op.get("word"):
+            touched["lists"][0]["words"].append(op["word"])
+        touched["lists"][0]["words"].extend(op.get("words") or [])
+        if op.get("entry"):
+            touched["history"].append(op["entry"])
+    SUGGEST_INDEX.add_state(touched)
+
+    response: dict[str, Any] = {
+        "ok": True,
+        "revision": revision,
+        "applied": results,
+        "rejected": rejected,
+        "missed": missed or [],
+        "resync": missed is None,
+    }
+    if state is not None:
+        state["revision"] = revision
+        response["state"] = state
+    return response
+
+
+def load_state_ops(since: int, user_ref: str | None = None) -> dict[str, Any]:
+    init_state_db()
+    with STATE_DB.reading() as conn:
+        user_id = resolve_user_id_unlocked(user_ref, default_if_missing=True, conn=conn)
         if user_id is None:
-            return normalized
-        with sqlite3.connect(STATE_DB_FILE) as conn:
-            conn.execute(
-                """
-                INSERT INTO user_state (user_id, value, updated_at)
-                VALUES (?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(user_id) DO UPDATE SET
-                    value = excluded.value,
-                    updated_at = CURRENT_TIMESTAMP
-                """,
-                (
-                    user_id,
-                    json.dumps(normalized, ensure_ascii=False, separators=(",", ":")),
-                ),
-            )
-            conn.commit()
-    return normalized
+            raise ValueError("Unknown user.")
+        revision = _state_revision_unlocked(conn, user_id)
+        missed = _ops_since_unlocked(conn, user_id, since, revision)
+        response: dict[str, Any] = {"revision": revision, "missed": missed or [], "resync": missed is None}
+        if missed is None:
+            response["state"] = {**_read_state_unlocked(conn, user_id), "revision": revision}
+        return response
 
 
 def walk_text_fields(node: Any, parent_key: str = ""):
@@ -644,12 +1803,57 @@ def pick_best_text(
     return best_text
 
 
-def extract_direct_items(payload: dict[str, Any]) -> list[dict[str, Any]]:
-    candidates: list[list[Any]] = []
-
-    try:
-        search_map = payload.get("searchResultMap", {})
-        list_map = search_map.get("searchResultListMap", {})
+def pick_ranked_text(
+    fields: list[tuple[str, str]],
+    ranking: list[tuple[int, int]],
+    pattern: re.Pattern[str] | None = None,
+) -> str:
+    # Same choice as pick_best_text, walking fields by precomputed key score: length
+    # penalties only lower a score, so nothing ranked below the current best can win.
+    best_text = ""
+    best_score = -1
+    best_index = -1
+    for key_score, index in ranking:
+        if key_score < best_score:
+            break
+        value = fields[index][1]
+        if not value:
+            continue
+        if pattern is not None and not pattern.search(value):
+            continue
+        base = key_score
+        if len(value) < 2:
+            base -= 2
+        if len(value) > 120:
+            base -= 1
+        if base > best_score or (base == best_score and index < best_index):
+            best_score = base
+            best_index = index
+            best_text = value
+    return best_text
+
+
+def generic_field_rules(language: str) -> list[tuple[str, list[str], re.Pattern[str] | None]]:
+    word_pattern = RE_ENGLISH if language == "en" else RE_JAPANESE
+    if language == "en":
+        furigana_rule = ("furigana", ["phonetic", "symbol", "pronounce", "ipa", "sound", "read"], None)
+    else:
+        furigana_rule = ("furigana", ["kana", "reading", "furigana", "phonetic", "pronounce", "symbol"], RE_KANA)
+    return [
+        ("word", ["entry", "headword", "source", "word", "title", "expentry", "handle"], word_pattern),
+        furigana_rule,
+        ("meaning", ["mean", "trans", "definition", "target", "korean", "desc"], RE_KOREAN),
+        ("meaning", ["mean", "trans", "definition", "target", "desc"], None),
+        ("example", ["example", "sentence", "sample", "exam", "usage"], word_pattern),
+    ]
+
+
+def extract_direct_items(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    candidates: list[list[Any]] = []
+
+    try:
+        search_map = payload.get("searchResultMap", {})
+        list_map = search_map.get("searchResultListMap", {})
         for maybe_list in list_map.values():
             if isinstance(maybe_list, dict):
                 items = maybe_list.get("items")
@@ -705,7 +1909,7 @@ def _normalize_media_url(value: str) -> str:
 
 
 def extract_audio_url(item: dict[str, Any]) -> str:
-    hints = ("audio", "sound", "voice", "tts", "pronounce", "pronunciation", "mp3")
+    hints = AUDIO_KEY_HINTS
     best = ""
 
     def consider(value: Any, key_hint: str = ""):
@@ -719,7 +1923,7 @@ def extract_audio_url(item: dict[str, Any]) -> str:
         text_l = text.lower()
         likely_audio = (
             any(h in key_l for h in hints)
-            or any(h in text_l for h in (".mp3", ".m4a", ".wav", ".ogg", "audio", "sound", "tts"))
+            or any(h in text_l for h in AUDIO_TEXT_HINTS)
         )
         if likely_audio:
             best = text
@@ -743,7 +1947,16 @@ def extract_audio_url(item: dict[str, Any]) -> str:
     return best
 
 
-def normalize_entry(item: dict[str, Any], language: str = "ja") -> dict[str, Any] | None:
+def item_audio_url(item: dict[str, Any], scan: PayloadScan | None) -> str:
+    audio_url = scan.audio_url(item) if scan is not None else None
+    if audio_url is None:
+        audio_url = extract_audio_url(item)
+    return audio_url
+
+
+def normalize_entry(
+    item: dict[str, Any], language: str = "ja", scan: PayloadScan | None = None
+) -> dict[str, Any] | None:
     referer_root = NAVER_REFERER_BY_LANG.get(language, NAVER_REFERER_BY_LANG["ja"]).rstrip("/")
 
     # Primary parser for api3 search entries.
@@ -803,7 +2016,7 @@ def normalize_entry(item: dict[str, Any], language: str = "ja") -> dict[str, Any
                     break
 
         source_url = ""
-        audio_url = extract_audio_url(item)
+        audio_url = item_audio_url(item, scan)
         destination_link = str(item.get("destinationLink") or "").strip()
         if destination_link.startswith("#/"):
             source_url = f"{referer_root}/{destination_link}"
@@ -834,46 +2047,28 @@ def normalize_entry(item: dict[str, Any], language: str = "ja") -> dict[str, Any
                 "meaningAlternates": meaning_alternates[:6],
             }
 
-    # Fallback for unexpected payload shapes.
-    fields = list(walk_text_fields(item))
-
-    word_pattern = RE_ENGLISH if language == "en" else RE_JAPANESE
-    example_pattern = RE_ENGLISH if language == "en" else RE_JAPANESE
-
-    word = pick_best_text(
-        fields,
-        hints=["entry", "headword", "source", "word", "title", "expentry", "handle"],
-        pattern=word_pattern,
-    )
-    if language == "en":
-        furigana = pick_best_text(
-            fields,
-            hints=["phonetic", "symbol", "pronounce", "ipa", "sound", "read"],
-            pattern=None,
-        )
-    else:
-        furigana = pick_best_text(
-            fields,
-            hints=["kana", "reading", "furigana", "phonetic", "pronounce", "symbol"],
-            pattern=RE_KANA,
-        )
-    meaning = pick_best_text(
-        fields,
-        hints=["mean", "trans", "definition", "target", "korean", "desc"],
-        pattern=RE_KOREAN,
-    )
-    if not meaning:
-        meaning = pick_best_text(
-            fields,
-            hints=["mean", "trans", "definition", "target", "desc"],
-            pattern=None,
-        )
+    # Fallback for unexpected payload shapes. Rows of a known payload shape reuse the key
+    # scoring of earlier rows with the same fields.
+    fields = scan.fields(item) if scan is not None else None
+    if fields is None:
+        fields = list(walk_text_fields(item))
+
+    rules = generic_field_rules(language)
+    plan = scan.shape_plan if scan is not None else None
+    rankings = plan.rankings(tuple(key for key, _ in fields), rules) if plan is not None else None
+    picked: dict[str, str] = {}
+    for index, (role, hints, pattern) in enumerate(rules):
+        if picked.get(role):
+            continue
+        if rankings is not None:
+            picked[role] = pick_ranked_text(fields, rankings[index], pattern)
+        else:
+            picked[role] = pick_best_text(fields, hints=hints, pattern=pattern)
 
-    example = pick_best_text(
-        fields,
-        hints=["example", "sentence", "sample", "exam", "usage"],
-        pattern=example_pattern,
-    )
+    word = picked["word"]
+    furigana = picked["furigana"]
+    meaning = picked["meaning"]
+    example = picked["example"]
 
     if not word:
         return None
@@ -888,7 +2083,7 @@ def normalize_entry(item: dict[str, Any], language: str = "ja") -> dict[str, Any
 
     entry_id = str(item.get("entryId") or item.get("entry_id") or "").strip()
     source_url = ""
-    audio_url = extract_audio_url(item)
+    audio_url = item_audio_url(item, scan)
     if entry_id:
         if language == "en":
             source_url = f"https://en.dict.naver.com/#/entry/enko/{urllib.parse.quote(entry_id)}"
@@ -908,41 +2103,1051 @@ def normalize_entry(item: dict[str, Any], language: str = "ja") -> dict[str, Any
     }
 
 
-def fetch_naver_payload(query: str, language: str = "ja") -> dict[str, Any]:
-    params = {
+def decode_content_encoding(body: bytes, encoding: str | None) -> bytes:
+    encoding = (encoding or "").strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        # Servers disagree on whether "deflate" means zlib-wrapped or raw.
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+class DecodingReader:
+    # Incremental counterpart of decode_content_encoding for streamed bodies.
+    def __init__(self, response: http.client.HTTPResponse, encoding: str | None):
+        self.response = response
+        self.encoding = (encoding or "").strip().lower()
+        self._decompressor = None
+        if self.encoding in ("gzip", "x-gzip"):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def read(self, size: int) -> bytes:
+        while True:
+            decompressor = self._decompressor
+            if decompressor is not None and decompressor.unconsumed_tail:
+                data = decompressor.decompress(decompressor.unconsumed_tail, size)
+                if data:
+                    return data
+                continue
+            raw = self.response.read(size)
+            if decompressor is None and self.encoding == "deflate" and raw:
+                # Servers disagree on whether "deflate" means zlib-wrapped or raw; sniff
+                # the two-byte zlib header.
+                if len(raw) < 2:
+                    raw += self.response.read(1)
+                zlib_wrapped = len(raw) >= 2 and raw[0] & 0x0F == 8 and (raw[0] << 8 | raw[1]) % 31 == 0
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS if zlib_wrapped else -zlib.MAX_WBITS)
+                self._decompressor = decompressor
+            if decompressor is None:
+                return raw
+            if not raw:
+                return decompressor.flush()
+            # Cap the output so a highly compressed body is still pulled in small pieces.
+            data = decompressor.decompress(raw, size)
+            if data:
+                return data
+
+
+class UpstreamClient:
+    def __init__(self, ssl_context: ssl.SSLContext, pool_size: int, idle_timeout: float):
+        self.ssl_context = ssl_context
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        # (scheme, host, port) -> idle connections as (released_at, connection)
+        self._pools: dict[tuple[str, str, int], list[tuple[float, http.client.HTTPConnection]]] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.stale_retries = 0
+
+    def _acquire(
+        self, key: tuple[str, str, int], timeout: float
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        stale: list[http.client.HTTPConnection] = []
+        conn: http.client.HTTPConnection | None = None
+        with self._lock:
+            pool = self._pools.get(key) or []
+            while pool:
+                released_at, candidate = pool.pop()
+                if now - released_at <= self.idle_timeout:
+                    conn = candidate
+                    break
+                stale.append(candidate)
+            if conn is not None:
+                self.connections_reused += 1
+            else:
+                self.connections_opened += 1
+        for old in stale:
+            old.close()
+
+        if conn is not None:
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self.ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn, False
+
+    def _release(self, key: tuple[str, str, int], conn: http.client.HTTPConnection):
+        with self._lock:
+            pool = self._pools.setdefault(key, [])
+            if len(pool) < self.pool_size:
+                pool.append((time.monotonic(), conn))
+                return
+        conn.close()
+
+    def get(
+        self,
+        url: str,
+        headers: dict[str, str],
+        timeout: float = UPSTREAM_TIMEOUT_SECONDS,
+        max_redirects: int = 3,
+    ) -> tuple[int, bytes]:
+        request_headers = dict(headers)
+        request_headers.setdefault("Accept-Encoding", "gzip, deflate")
+        request_headers.setdefault("Connection", "keep-alive")
+
+        for _ in range(max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            scheme = parts.scheme or "https"
+            port = parts.port or (443 if scheme == "https" else 80)
+            key = (scheme, parts.hostname or "", port)
+            path = parts.path or "/"
+            if parts.query:
+                path = f"{path}?{parts.query}"
+
+            status, location, body = self._request(key, path, request_headers, timeout)
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            return status, body
+
+        raise RuntimeError(f"Too many redirects for {url}")
+
+    def _open(
+        self,
+        key: tuple[str, str, int],
+        path: str,
+        headers: dict[str, str],
+        timeout: float,
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        for attempt in range(2):
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request("GET", path, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # The server may have dropped an idle keep-alive socket; retry once fresh.
+                if reused and attempt == 0:
+                    self.stale_retries += 1
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+        raise RuntimeError("Upstream connection failed")
+
+    def _finish(
+        self,
+        key: tuple[str, str, int],
+        conn: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+    ):
+        # Only a fully drained response leaves the socket reusable.
+        if response.will_close or not response.isclosed():
+            conn.close()
+        else:
+            self._release(key, conn)
+
+    def _request(
+        self,
+        key: tuple[str, str, int],
+        path: str,
+        headers: dict[str, str],
+        timeout: float,
+    ) -> tuple[int, str, bytes]:
+        conn, response = self._open(key, path, headers, timeout)
+        try:
+            body = response.read()
+        except Exception:
+            conn.close()
+            raise
+        self._finish(key, conn, response)
+        body = decode_content_encoding(body, response.getheader("Content-Encoding"))
+        return response.status, response.getheader("Location") or "", body
+
+    def get_stream(
+        self,
+        url: str,
+        headers: dict[str, str],
+        consume,
+        timeout: float = UPSTREAM_TIMEOUT_SECONDS,
+        max_redirects: int = 3,
+    ) -> tuple[int, Any]:
+        # Like get(), but hands a decoded read(n) callable to `consume` for a 200 response
+        # instead of buffering the body. If `consume` stops early the connection is dropped.
+        request_headers = dict(headers)
+        request_headers.setdefault("Accept-Encoding", "gzip, deflate")
+        request_headers.setdefault("Connection", "keep-alive")
+
+        for _ in range(max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            scheme = parts.scheme or "https"
+            port = parts.port or (443 if scheme == "https" else 80)
+            key = (scheme, parts.hostname or "", port)
+            path = parts.path or "/"
+            if parts.query:
+                path = f"{path}?{parts.query}"
+
+            conn, response = self._open(key, path, request_headers, timeout)
+            try:
+                if response.status != 200:
+                    response.read()
+                    self._finish(key, conn, response)
+                    location = response.getheader("Location") or ""
+                    if response.status in (301, 302, 303, 307, 308) and location:
+                        url = urllib.parse.urljoin(url, location)
+                        continue
+                    return response.status, None
+                reader = DecodingReader(response, response.getheader("Content-Encoding"))
+                result = consume(reader.read)
+            except Exception:
+                conn.close()
+                raise
+            self._finish(key, conn, response)
+            return response.status, result
+
+        raise RuntimeError(f"Too many redirects for {url}")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            idle = sum(len(pool) for pool in self._pools.values())
+        return {
+            "connectionsOpened": self.connections_opened,
+            "connectionsReused": self.connections_reused,
+            "staleRetries": self.stale_retries,
+            "idleConnections": idle,
+            "poolSize": self.pool_size,
+            "idleTimeout": self.idle_timeout,
+        }
+
+
+UPSTREAM_CLIENT = UpstreamClient(
+    SSL_CONTEXT,
+    pool_size=UPSTREAM_POOL_SIZE,
+    idle_timeout=UPSTREAM_IDLE_TIMEOUT_SECONDS,
+)
+
+
+class EndpointHealth:
+    def __init__(self, url: str):
+        self.url = url
+        self.latencies: deque[float] = deque(maxlen=128)
+        self.outcomes: deque[bool] = deque(maxlen=64)
+        self.consecutive_failures = 0
+        self.circuit_open = False
+        self.opened_at = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def percentile(self, pct: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok in self.outcomes if not ok) / len(self.outcomes)
+
+
+class EndpointManager:
+    def __init__(
+        self,
+        endpoints_by_lang: dict[str, list[str]],
+        failure_threshold: int,
+        probe_interval: float,
+    ):
+        self.endpoints_by_lang = endpoints_by_lang
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self._health: dict[str, EndpointHealth] = {}
+        for endpoints in endpoints_by_lang.values():
+            for url in endpoints:
+                self._health[url] = EndpointHealth(url)
+        self._lock = threading.Lock()
+        self._probe_thread: threading.Thread | None = None
+        self.hedges = 0
+
+    def _get(self, url: str) -> EndpointHealth:
+        health = self._health.get(url)
+        if health is None:
+            health = self._health.setdefault(url, EndpointHealth(url))
+        return health
+
+    def ranked(self, language: str) -> list[str]:
+        endpoints = self.endpoints_by_lang.get(language) or self.endpoints_by_lang["ja"]
+        with self._lock:
+            healthy = [url for url in endpoints if not self._get(url).circuit_open]
+            if not healthy:
+                # Every mirror is tripped; trying them in order beats failing outright.
+                return list(endpoints)
+
+            def score(url: str) -> float:
+                health = self._get(url)
+                p50 = health.percentile(50)
+                # Unsampled mirrors score 0 so each one gets measured early on.
+                if p50 is None:
+                    return 0.0
+                return p50 * (1 + 4 * health.error_rate())
+
+            return sorted(healthy, key=score)
+
+    def all_tripped(self, language: str) -> bool:
+        endpoints = self.endpoints_by_lang.get(language) or self.endpoints_by_lang["ja"]
+        with self._lock:
+            return all(self._get(url).circuit_open for url in endpoints)
+
+    def hedge_delay(self, url: str) -> float:
+        with self._lock:
+            health = self._get(url)
+            p95 = health.percentile(95) if len(health.latencies) >= 8 else None
+        if p95 is None:
+            return UPSTREAM_HEDGE_DEFAULT_DELAY_SECONDS
+        return min(UPSTREAM_TIMEOUT_SECONDS, max(UPSTREAM_HEDGE_MIN_DELAY_SECONDS, p95))
+
+    def record(self, url: str, elapsed: float, ok: bool):
+        start_probe = False
+        with self._lock:
+            health = self._get(url)
+            health.requests += 1
+            health.outcomes.append(ok)
+            if ok:
+                health.latencies.append(elapsed)
+                health.consecutive_failures = 0
+                health.circuit_open = False
+                return
+            health.failures += 1
+            health.consecutive_failures += 1
+            if not health.circuit_open and health.consecutive_failures >= self.failure_threshold:
+                health.circuit_open = True
+                health.opened_at = time.time()
+                start_probe = self._probe_thread is None or not self._probe_thread.is_alive()
+                if start_probe:
+                    self._probe_thread = threading.Thread(
+                        target=self._probe_loop, name="naver-endpoint-probe", daemon=True
+                    )
+        if start_probe and self._probe_thread is not None:
+            self._probe_thread.start()
+
+    def _probe_loop(self):
+        while True:
+            time.sleep(self.probe_interval)
+            with self._lock:
+                tripped = [url for url, health in self._health.items() if health.circuit_open]
+                if not tripped:
+                    self._probe_thread = None
+                    return
+            for url in tripped:
+                started = time.perf_counter()
+                try:
+                    ok = probe_naver_endpoint(url)
+                except Exception:
+                    ok = False
+                if ok:
+                    self.record(url, time.perf_counter() - started, ok=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            endpoints = {
+                url: {
+                    "requests": health.requests,
+                    "failures": health.failures,
+                    "errorRate": round(health.error_rate(), 4),
+                    "p50Ms": round((health.percentile(50) or 0) * 1000, 1),
+                    "p95Ms": round((health.percentile(95) or 0) * 1000, 1),
+                    "circuitOpen": health.circuit_open,
+                }
+                for url, health in self._health.items()
+            }
+        return {"hedges": self.hedges, "endpoints": endpoints}
+
+
+ENDPOINT_MANAGER = EndpointManager(
+    NAVER_ENDPOINTS_BY_LANG,
+    failure_threshold=UPSTREAM_CIRCUIT_FAILURES,
+    probe_interval=UPSTREAM_PROBE_INTERVAL_SECONDS,
+)
+UPSTREAM_EXECUTOR = ThreadPoolExecutor(
+    max_workers=UPSTREAM_WORKERS, thread_name_prefix="naver-upstream"
+)
+# Separate pool: retry workers call fetch_naver_payload, which itself waits on
+# UPSTREAM_EXECUTOR, so sharing one pool could deadlock under load.
+RETRY_EXECUTOR = ThreadPoolExecutor(
+    max_workers=SEARCH_RETRY_WORKERS, thread_name_prefix="naver-retry"
+)
+
+
+class PayloadArchive:
+    def __init__(self, db_file: Path, max_bytes: int, enabled: bool = True):
+        self.db_file = db_file
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._stored_bytes = 0
+        # Compression and the insert happen off the request thread.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="payload-archive")
+        self.stored = 0
+        self.deduplicated = 0
+        self.evicted = 0
+        self.errors = 0
+
+    def _connect_unlocked(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS payloads (
+                digest TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                raw_size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_payloads_last_seen ON payloads(last_seen)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS payload_fetches (
+                lang TEXT NOT NULL,
+                query_key TEXT NOT NULL,
+                query TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (lang, query_key)
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_payload_fetches_digest ON payload_fetches(digest)"
+        )
+        conn.commit()
+        self._stored_bytes = int(
+            conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM payloads").fetchone()[0]
+        )
+        self._conn = conn
+        return conn
+
+    def store(self, query: str, language: str, body: bytes):
+        if self.enabled:
+            self._executor.submit(
+                self._store,
+                query,
+                language,
+                hashlib.sha256(body).hexdigest(),
+                len(body),
+                lambda: zlib.compress(body, 6),
+                time.time(),
+            )
+
+    def store_compressed(self, query: str, language: str, body: "ArchivedBody"):
+        if self.enabled:
+            digest, compressed = body.finish()
+            self._executor.submit(
+                self._store, query, language, digest, body.raw_size, lambda: compressed, time.time()
+            )
+
+    def _store(self, query: str, language: str, digest: str, raw_size: int, compress, fetched_at: float):
+        try:
+            with self._lock:
+                conn = self._connect_unlocked()
+                updated = conn.execute(
+                    "UPDATE payloads SET last_seen = ? WHERE digest = ?",
+                    (fetched_at, digest),
+                ).rowcount
+                if updated:
+                    self.deduplicated += 1
+                else:
+                    compressed = compress()
+                    conn.execute(
+                        """
+                        INSERT INTO payloads (digest, body, raw_size, stored_size, first_seen, last_seen)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        (digest, compressed, raw_size, len(compressed), fetched_at, fetched_at),
+                    )
+                    self._stored_bytes += len(compressed)
+                    self.stored += 1
+                conn.execute(
+                    """
+                    INSERT INTO payload_fetches (lang, query_key, query, digest, fetched_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(lang, query_key) DO UPDATE SET
+                        query = excluded.query,
+                        digest = excluded.digest,
+                        fetched_at = excluded.fetched_at
+                    """,
+                    (language, clean_text(query).casefold(), query, digest, fetched_at),
+                )
+                if self._stored_bytes > self.max_bytes:
+                    self._evict_unlocked(conn)
+                conn.commit()
+        except Exception:
+            self.errors += 1
+
+    def _evict_unlocked(self, conn: sqlite3.Connection):
+        target = int(self.max_bytes * 0.9)
+        doomed: list[tuple[str]] = []
+        for digest, stored_size in conn.execute(
+            "SELECT digest, stored_size FROM payloads ORDER BY last_seen ASC"
+        ):
+            if self._stored_bytes <= target:
+                break
+            doomed.append((digest,))
+            self._stored_bytes -= int(stored_size)
+        conn.executemany("DELETE FROM payload_fetches WHERE digest = ?", doomed)
+        conn.executemany("DELETE FROM payloads WHERE digest = ?", doomed)
+        self.evicted += len(doomed)
+
+    def load(self, query: str, language: str = "ja") -> dict[str, Any]:
+        with self._lock:
+            conn = self._connect_unlocked()
+            row = conn.execute(
+                """
+                SELECT p.body FROM payload_fetches f
+                JOIN payloads p ON p.digest = f.digest
+                WHERE f.lang = ? AND f.query_key = ?
+                """,
+                (language, clean_text(query).casefold()),
+            ).fetchone()
+        if row is None:
+            raise LookupError(f"No archived payload for {language}:{query}")
+        return json.loads(zlib.decompress(row[0]).decode("utf-8", errors="replace"))
+
+    def iter_fetches(self, batch_size: int):
+        with self._lock:
+            conn = self._connect_unlocked()
+            rows = conn.execute(
+                "SELECT lang, query FROM payload_fetches ORDER BY fetched_at ASC"
+            ).fetchall()
+        for start in range(0, len(rows), batch_size):
+            yield rows[start : start + batch_size]
+
+    def flush(self):
+        self._executor.submit(lambda: None).result()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "evicted": self.evicted,
+            "storedBytes": self._stored_bytes,
+            "maxBytes": self.max_bytes,
+            "errors": self.errors,
+        }
+
+
+class ArchivedBody:
+    # Hashes and compresses a body chunk by chunk as it is read, so archiving a streamed
+    # response never needs the raw body in memory. Same digest and zlib format as store().
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._zlib = zlib.compressobj(6)
+        self._parts: list[bytes] = []
+        self.raw_size = 0
+
+    def write(self, data: bytes):
+        self._hash.update(data)
+        self.raw_size += len(data)
+        part = self._zlib.compress(data)
+        if part:
+            self._parts.append(part)
+
+    def finish(self) -> tuple[str, bytes]:
+        self._parts.append(self._zlib.flush())
+        return self._hash.hexdigest(), b"".join(self._parts)
+
+
+PAYLOAD_ARCHIVE = PayloadArchive(
+    PAYLOAD_ARCHIVE_DB_FILE,
+    max_bytes=PAYLOAD_ARCHIVE_MAX_BYTES,
+    enabled=PAYLOAD_ARCHIVE_ENABLED,
+)
+
+
+def build_naver_params(query: str) -> dict[str, str]:
+    return {
         "query": query,
         "range": "word",
         "page": "1",
         "shouldSearchExample": "true",
     }
+
+
+def language_for_endpoint(endpoint: str) -> str:
+    for language, endpoints in NAVER_ENDPOINTS_BY_LANG.items():
+        if endpoint in endpoints:
+            return language
+    return "ja"
+
+
+def probe_naver_endpoint(endpoint: str) -> bool:
+    language = language_for_endpoint(endpoint)
+    probe_query = "test" if language == "en" else "猫"
+    url = f"{endpoint}?{urllib.parse.urlencode(build_naver_params(probe_query))}"
+    status, body = UPSTREAM_CLIENT.get(
+        url, build_naver_headers(language), timeout=UPSTREAM_TIMEOUT_SECONDS
+    )
+    if status != 200:
+        return False
+    return isinstance(json.loads(body.decode("utf-8", errors="replace")), dict)
+
+
+JSON_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+class JsonTextStream:
+    # Pulls text from read(n) on demand so JSON values can be decoded one at a time;
+    # text before the cursor is dropped on every refill.
+    decoder = json.JSONDecoder()
+
+    def __init__(self, read, chunk_size: int = UPSTREAM_STREAM_CHUNK_BYTES, sink: ArchivedBody | None = None):
+        self._read = read
+        self._text = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+        self.sink = sink
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        # Read at least as much again as is pending, so a large value is re-decoded a
+        # logarithmic number of times rather than once per chunk.
+        data = self._read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if data:
+            self.bytes_read += len(data)
+            if self.sink is not None:
+                self.sink.write(data)
+            text = self._text.decode(data)
+        else:
+            self.eof = True
+            text = self._text.decode(b"", final=True)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            buffer = self.buffer
+            while self.pos < len(buffer) and buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(buffer):
+                return buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if not char or char not in expected:
+            raise ValueError(f"Expected {expected!r} after {self.bytes_read} bytes, got {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # raw_decode stops a number at the first character it can't use, so "1." or "1e"
+            # at the end of a chunk decodes as 1. Only trust a number once something that
+            # can't belong to it follows.
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and (end >= len(self.buffer) or self.buffer[end] in JSON_NUMBER_CHARS)
+                and self._fill()
+            ):
+                continue
+            self.pos = end
+            return value
+
+
+STREAM_PARSE_STATS = {"payloads": 0, "truncated": 0, "itemsSkipped": 0, "bytesRead": 0}
+STREAM_PARSE_LOCK = threading.Lock()
+
+
+def parse_payload_stream(
+    read, language: str, archive: bool = False
+) -> tuple[dict[str, Any], ArchivedBody | None]:
+    # Decodes searchResultMap -> searchResultListMap -> section -> items lazily and runs
+    # each item through the row filter as it arrives. Once MAX_NORMALIZED_ROWS rows were
+    # accepted, later items are decoded and dropped without being normalized or kept, but
+    # the rest of the body is still read: section query/revert fields and suggestInfo come
+    # after the items and feed correctedQuery and suggestions. Everything else is decoded
+    # whole.
+    stream = JsonTextStream(read, sink=ArchivedBody() if archive else None)
+    seen: set[tuple[str, str, str, str]] = set()
+    accepted = 0
+    skipped = 0
+
+    def parse_object(child) -> Any:
+        if stream.peek() != "{":
+            return stream.value()
+        stream.pos += 1
+        node: dict[str, Any] = {}
+        if stream.peek() == "}":
+            stream.pos += 1
+            return node
+        while True:
+            key = stream.value()
+            stream.take(":")
+            parser = child(key)
+            node[key] = parser() if parser else stream.value()
+            if stream.take(",}") == "}":
+                return node
+
+    def parse_items() -> Any:
+        nonlocal accepted, skipped
+        if stream.peek() != "[":
+            return stream.value()
+        stream.pos += 1
+        items: list[Any] = []
+        if stream.peek() == "]":
+            stream.pos += 1
+            return items
+        while True:
+            if accepted >= MAX_NORMALIZED_ROWS:
+                # The C decoder is faster at stepping over an item than any scan in Python.
+                stream.value()
+                skipped += 1
+            else:
+                item = stream.value()
+                items.append(item)
+                if isinstance(item, dict) and accept_normalized_row(
+                    normalize_entry(item, language), language, seen
+                ):
+                    accepted += 1
+            if stream.take(",]") == "]":
+                return items
+
+    def parse_section() -> Any:
+        if stream.peek() == "[":
+            return parse_items()
+        return parse_object(lambda key: parse_items if key == "items" else None)
+
+    def parse_result_map() -> Any:
+        return parse_object(
+            lambda key: (lambda: parse_object(lambda _: parse_section))
+            if key == "searchResultListMap"
+            else None
+        )
+
+    payload = parse_object(lambda key: parse_result_map if key == "searchResultMap" else None)
+    if stream.peek():
+        raise ValueError("Extra data after JSON payload")
+    if not isinstance(payload, dict):
+        raise ValueError("Upstream payload is not a JSON object")
+
+    # Upstream workers parse concurrently.
+    with STREAM_PARSE_LOCK:
+        STREAM_PARSE_STATS["payloads"] += 1
+        STREAM_PARSE_STATS["bytesRead"] += stream.bytes_read
+        if skipped:
+            STREAM_PARSE_STATS["truncated"] += 1
+            STREAM_PARSE_STATS["itemsSkipped"] += skipped
+    # The whole body was read, so it can be archived even when items were skipped.
+    return payload, stream.sink
+
+
+def record_upstream_fetch(endpoint: str, elapsed: float, ok: bool, size: int | None = None):
+    ENDPOINT_MANAGER.record(endpoint, elapsed, ok=ok)
+    labels = (("endpoint", endpoint),)
+    METRICS.observe("hub_upstream_request_seconds", elapsed, labels)
+    if not ok:
+        METRICS.inc("hub_upstream_errors_total", labels)
+    elif size is not None:
+        METRICS.observe("hub_upstream_payload_bytes", size, labels)
+
+
+def fetch_endpoint_payload(
+    endpoint: str, params: dict[str, str], headers: dict[str, str]
+) -> dict[str, Any]:
+    url = f"{endpoint}?{urllib.parse.urlencode(params)}"
+    language = language_for_endpoint(endpoint)
+    started = time.perf_counter()
+    try:
+        if UPSTREAM_STREAM_PARSE:
+            status, parsed = UPSTREAM_CLIENT.get_stream(
+                url,
+                headers,
+                lambda read: parse_payload_stream(read, language, archive=PAYLOAD_ARCHIVE.enabled),
+                timeout=UPSTREAM_TIMEOUT_SECONDS,
+            )
+            if status != 200:
+                raise RuntimeError(f"status={status}")
+            payload, archived = parsed
+            size = archived.raw_size if archived is not None else None
+        else:
+            status, body = UPSTREAM_CLIENT.get(url, headers, timeout=UPSTREAM_TIMEOUT_SECONDS)
+            if status != 200:
+                raise RuntimeError(f"status={status}")
+            payload = json.loads(body.decode("utf-8", errors="replace"))
+            archived, size = None, len(body)
+    except Exception:
+        record_upstream_fetch(endpoint, time.perf_counter() - started, ok=False)
+        raise
+    record_upstream_fetch(endpoint, time.perf_counter() - started, ok=True, size=size)
+    if archived is not None:
+        PAYLOAD_ARCHIVE.store_compressed(params["query"], language, archived)
+    elif not UPSTREAM_STREAM_PARSE:
+        PAYLOAD_ARCHIVE.store(params["query"], language, body)
+    return payload
+
+
+def fetch_naver_payload(query: str, language: str = "ja") -> dict[str, Any]:
+    params = build_naver_params(query)
     errors: list[str] = []
-    endpoints = NAVER_ENDPOINTS_BY_LANG.get(language) or NAVER_ENDPOINTS_BY_LANG["ja"]
+    endpoints = ENDPOINT_MANAGER.ranked(language)
     headers = build_naver_headers(language)
-
-    for endpoint in endpoints:
-        try:
-            url = f"{endpoint}?{urllib.parse.urlencode(params)}"
-            request = urllib.request.Request(url=url, headers=headers, method="GET")
-            with urllib.request.urlopen(request, timeout=8, context=SSL_CONTEXT) as response:
-                status = response.getcode()
-                if status != 200:
-                    errors.append(f"{endpoint} status={status}")
-                    continue
-                body = response.read().decode("utf-8", errors="replace")
-                return json.loads(body)
-        except Exception as exc:
-            errors.append(f"{endpoint} error={exc}")
+    pending: dict[Future, str] = {}
+    last_launched = ""
+
+    def launch():
+        nonlocal last_launched
+        endpoint = endpoints.pop(0)
+        last_launched = endpoint
+        pending[UPSTREAM_EXECUTOR.submit(fetch_endpoint_payload, endpoint, params, headers)] = endpoint
+
+    # Start on the best mirror; if it is slower than its own p95, hedge with the next
+    # one and take whichever answers first. Failures fail over immediately.
+    launch()
+    while pending:
+        can_hedge = bool(endpoints) and len(pending) < 2
+        delay = ENDPOINT_MANAGER.hedge_delay(last_launched) if can_hedge else None
+        done, _ = wait(list(pending), timeout=delay, return_when=FIRST_COMPLETED)
+        if not done:
+            ENDPOINT_MANAGER.hedges += 1
+            launch()
+            continue
+        for future in done:
+            endpoint = pending.pop(future)
+            try:
+                return future.result()
+            except Exception as exc:
+                errors.append(f"{endpoint} error={exc}")
+        if endpoints and len(pending) < 2:
+            launch()
 
     raise RuntimeError(" | ".join(errors) if errors else "No endpoint available")
 
 
-def search_naver(query: str, language: str | None = None) -> dict[str, Any]:
+ENGLISH_ACCOUNTING_HINTS = (
+    "감손",
+    "손상차손",
+    "감액손실",
+    "평가손",
+    "회계",
+    "손실",
+    "loss",
+    "impairment loss",
+)
+
+
+def fetch_english_enrichment_rows(query_token: str, fetch=None) -> list[dict[str, Any]]:
+    try:
+        payload_hint = (fetch or fetch_naver_payload)(f"{query_token} loss", "en")
+    except PayloadPending:
+        raise
+    except Exception:
+        METRICS.inc("hub_enrichment_fetches_total", (("outcome", "error"),))
+        raise
+    METRICS.inc("hub_enrichment_fetches_total", (("outcome", "ok"),))
+    rows_hint, _ = normalize_items_from_payload(payload_hint, "en", set())
+    return rows_hint
+
+
+def merge_english_enrichment(
+    normalized: list[dict[str, Any]], query_token: str, rows_hint: list[dict[str, Any]]
+) -> bool:
+    query_key = keyify(query_token)
+    existing = {
+        (row.get("word"), row.get("furigana"), row.get("meaning"), row.get("example"))
+        for row in normalized
+    }
+    meaning_keys: set[str] = set()
+    for row in normalized:
+        row_word_key = keyify(str(row.get("word") or ""))
+        if query_key and row_word_key and not (
+            row_word_key == query_key or query_key in row_word_key
+        ):
+            continue
+        meaning_key = keyify(str(row.get("meaning") or ""))
+        if meaning_key:
+            meaning_keys.add(meaning_key)
+
+    best_row: dict[str, Any] | None = None
+    best_score = -1
+    for row in rows_hint:
+        if (row.get("word"), row.get("furigana"), row.get("meaning"), row.get("example")) in existing:
+            continue
+        row_word = clean_text(str(row.get("word") or ""))
+        row_word_key = keyify(row_word)
+        if query_key and row_word_key and not (
+            row_word_key == query_key or query_key in row_word_key
+        ):
+            continue
+        meaning = clean_text(str(row.get("meaning") or ""))
+        meaning_key = keyify(meaning)
+        if not meaning_key or meaning_key in meaning_keys:
+            continue
+        score = 0
+        if row_word_key == query_key:
+            score += 20
+        if "loss" in row_word.lower():
+            score += 45
+        if any(h in meaning.lower() for h in ENGLISH_ACCOUNTING_HINTS):
+            score += 35
+        if score > best_score:
+            best_score = score
+            best_row = row
+
+    if best_row and best_score >= 40:
+        normalized.append(dict(best_row))
+        return True
+    return False
+
+
+class PayloadPending(Exception):
+    pass
+
+
+class EnrichmentCache:
+    def __init__(self, fetch, max_entries: int, workers: int):
+        self._fetch = fetch
+        self.max_entries = max_entries
+        self._rows: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="naver-enrichment"
+        )
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+
+    def get(self, word: str) -> list[dict[str, Any]] | None:
+        key = word.casefold()
+        with self._lock:
+            rows = self._rows.get(key)
+            if rows is not None:
+                self._rows.move_to_end(key)
+            return rows
+
+    def _store(self, key: str, rows: list[dict[str, Any]]):
+        with self._lock:
+            self._rows[key] = rows
+            self._rows.move_to_end(key)
+            while len(self._rows) > self.max_entries:
+                self._rows.popitem(last=False)
+
+    def fetch_now(self, word: str, fetch=None) -> list[dict[str, Any]]:
+        try:
+            rows = self._fetch(word, fetch)
+        except PayloadPending:
+            raise
+        except Exception:
+            self.failed += 1
+            return []
+        self.completed += 1
+        self._store(word.casefold(), rows)
+        return rows
+
+    def schedule(self, word: str):
+        key = word.casefold()
+        with self._lock:
+            if key in self._pending or key in self._rows:
+                return
+            self._pending.add(key)
+            self.scheduled += 1
+        self._executor.submit(self._run, word, key)
+
+    def _run(self, word: str, key: str):
+        try:
+            rows = self._fetch(word)
+        except Exception:
+            # Leave the word uncached so a later search can try again.
+            self.failed += 1
+            return
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+        self.completed += 1
+        self._store(key, rows)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            cached = len(self._rows)
+            pending = len(self._pending)
+        return {
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "failed": self.failed,
+            "pending": pending,
+            "cachedWords": cached,
+        }
+
+
+ENGLISH_ENRICHMENT = EnrichmentCache(
+    fetch_english_enrichment_rows,
+    max_entries=ENRICHMENT_CACHE_ENTRIES,
+    workers=ENRICHMENT_WORKERS,
+)
+
+
+def search_naver(
+    query: str, language: str | None = None, enrich: bool = False, fetch=None, replay: bool | None = None
+) -> dict[str, Any]:
+    # `fetch` replaces the upstream call, e.g. to replay archived payloads offline. A
+    # replay also fetches the English enrichment probe inline instead of in the background.
+    replay = fetch is not None if replay is None else replay
+    fetch = fetch or fetch_naver_payload
     lang = language if language in ("ja", "en") else detect_query_language(query)
-    payload = fetch_naver_payload(query, lang)
-    corrected_query = extract_corrected_query(payload, query)
-    suggestion_queries = collect_query_candidates(payload, query)
+    payload = fetch(query, lang)
+    scan = PayloadScan(payload)
+    corrected_query = extract_corrected_query(payload, query, scan)
+    suggestion_queries = collect_query_candidates(payload, query, scan)
     seen: set[tuple[str, str, str, str]] = set()
-    normalized, raw_count = normalize_items_from_payload(payload, lang, seen)
+    normalized, raw_count = normalize_items_from_payload(payload, lang, seen, scan)
     resolved_query = query
 
     # Fallback: retry with top query suggestions from Naver when first pass yields nothing.
@@ -953,31 +3158,50 @@ def search_naver(query: str, language: str | None = None) -> dict[str, Any]:
         retry_candidates.extend(suggestion_queries)
 
         checked: set[str] = set()
+        ordered_candidates: list[str] = []
         for candidate in retry_candidates:
             key = candidate.casefold()
             if not candidate or key in checked:
                 continue
             checked.add(key)
-            payload_retry = fetch_naver_payload(candidate, lang)
-            rows, _ = normalize_items_from_payload(payload_retry, lang, seen)
-            if rows:
-                normalized.extend(rows)
-                resolved_query = candidate
-                # refresh suggestions using successful payload so UI can show best corrected term
-                if not corrected_query:
-                    corrected_query = extract_corrected_query(payload_retry, query)
-                if not suggestion_queries:
-                    suggestion_queries = collect_query_candidates(payload_retry, query)
-                break
+            ordered_candidates.append(candidate)
+
+        # Fetch every candidate concurrently but judge them in priority order, so the
+        # winner is the same one the sequential walk would have picked. Like that walk, a
+        # failed fetch ends the search with its error, even if a later candidate had rows:
+        # an upstream outage must not masquerade as "no results" (and get cached as such).
+        futures = [
+            RETRY_EXECUTOR.submit(fetch, candidate, lang)
+            for candidate in ordered_candidates
+        ]
+        try:
+            for candidate, future in zip(ordered_candidates, futures):
+                try:
+                    payload_retry = future.result()
+                except PayloadPending:
+                    # Let the other candidates ask for their payloads too, so the async
+                    # path fetches them all before its next pass.
+                    wait(futures)
+                    raise
+                retry_scan = PayloadScan(payload_retry)
+                rows, _ = normalize_items_from_payload(payload_retry, lang, seen, retry_scan)
+                if rows:
+                    normalized.extend(rows)
+                    resolved_query = candidate
+                    # refresh suggestions using successful payload so UI can show best corrected term
+                    if not corrected_query:
+                        corrected_query = extract_corrected_query(payload_retry, query, retry_scan)
+                    if not suggestion_queries:
+                        suggestion_queries = collect_query_candidates(payload_retry, query, retry_scan)
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+            METRICS.inc("hub_search_retry_fetches_total", value=sum(1 for future in futures if not future.cancelled()))
+        METRICS.inc("hub_search_retries_total", (("outcome", "hit" if normalized else "miss"),))
 
     # Audio enrichment: when an entry has no direct audio URL, borrow the closest
     # available pronunciation URL from the same result set.
-    def keyify(text: str) -> str:
-        value = clean_text(text or "")
-        value = re.sub(r"[・·･\u30fb]", "", value)
-        value = re.sub(r"\s+", "", value)
-        return value.casefold()
-
     audio_rows = [row for row in normalized if clean_text(str(row.get("audioUrl") or ""))]
     if audio_rows:
         query_key = keyify(query)
@@ -1006,84 +3230,1032 @@ def search_naver(query: str, language: str | None = None) -> dict[str, Any]:
             if best_url and best_score >= 65:
                 row["audioUrl"] = best_url
 
-    # English meaning enrichment: for single-word queries, probe a domain hint query
-    # (e.g., "impairment loss") and surface one more distinct meaning when possible.
-    if lang == "en":
+    # English meaning enrichment: for single-word queries, a domain hint query
+    # (e.g., "impairment loss") may surface one more distinct meaning. The probe is
+    # fetched in the background and merged into later responses unless the caller
+    # asks for it inline with enrich=True. It only adds to a meaning the search found, so a
+    # search without rows is not enriched and never reports enrichmentPending.
+    enrichment_pending = False
+    if lang == "en" and normalized:
         query_token = clean_text(query or "")
         if query_token and " " not in query_token:
-            query_key = keyify(query_token)
-            accounting_hints = (
-                "감손",
-                "손상차손",
-                "감액손실",
-                "평가손",
-                "회계",
-                "손실",
-                "loss",
-                "impairment loss",
+            if replay:
+                try:
+                    rows_hint = fetch_english_enrichment_rows(query_token, fetch)
+                except Exception:
+                    rows_hint = []
+            else:
+                rows_hint = ENGLISH_ENRICHMENT.get(query_token)
+            if rows_hint is None and enrich:
+                rows_hint = ENGLISH_ENRICHMENT.fetch_now(query_token, fetch)
+            if rows_hint is None:
+                ENGLISH_ENRICHMENT.schedule(query_token)
+                enrichment_pending = True
+            else:
+                merge_english_enrichment(normalized, query_token, rows_hint)
+
+    return {
+        "query": query,
+        "correctedQuery": corrected_query or (resolved_query if resolved_query != query else ""),
+        "suggestions": suggestion_queries,
+        "language": lang,
+        "source": "en.dict.naver.com" if lang == "en" else "ja.dict.naver.com",
+        "results": normalized,
+        "rawCount": raw_count,
+        "enrichmentPending": enrichment_pending,
+    }
+
+
+class SearchCache:
+    def __init__(
+        self,
+        db_file: Path,
+        ttl_seconds: int,
+        empty_ttl_seconds: int,
+        max_bytes: int,
+        memory_entries: int,
+    ):
+        self.db_file = db_file
+        self.ttl_seconds = ttl_seconds
+        self.empty_ttl_seconds = empty_ttl_seconds
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        # key -> (expires_at, serialized response)
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._disk_bytes = 0
+        self._puts_since_purge = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _connect_unlocked(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                cache_key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
             )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_cache_accessed ON search_cache(accessed_at)"
+        )
+        conn.commit()
+        self._disk_bytes = int(
+            conn.execute("SELECT COALESCE(SUM(size), 0) FROM search_cache").fetchone()[0]
+        )
+        self._conn = conn
+        return conn
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return json.loads(entry[1])
+                del self._memory[key]
 
-            def collect_meaning_keys(rows: list[dict[str, Any]]) -> set[str]:
-                keys: set[str] = set()
-                for row in rows:
-                    row_word_key = keyify(str(row.get("word") or ""))
-                    if query_key and row_word_key and not (
-                        row_word_key == query_key
-                        or query_key in row_word_key
-                    ):
-                        continue
-                    meaning_key = keyify(str(row.get("meaning") or ""))
-                    if meaning_key:
-                        keys.add(meaning_key)
-                return keys
+        try:
+            with self._db_lock:
+                conn = self._connect_unlocked()
+                row = conn.execute(
+                    "SELECT value, expires_at, size FROM search_cache WHERE cache_key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and row[1] <= now:
+                    conn.execute("DELETE FROM search_cache WHERE cache_key = ?", (key,))
+                    conn.commit()
+                    self._disk_bytes -= int(row[2])
+                    row = None
+                elif row is not None:
+                    conn.execute(
+                        "UPDATE search_cache SET accessed_at = ? WHERE cache_key = ?",
+                        (now, key),
+                    )
+                    conn.commit()
+        except Exception:
+            self.errors += 1
+            row = None
 
-            meaning_keys = collect_meaning_keys(normalized)
-            best_row: dict[str, Any] | None = None
-            best_score = -1
+        if row is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._remember(key, float(row[1]), row[0])
+        return json.loads(row[0])
+
+    def put(self, key: str, payload: dict[str, Any]):
+        value = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        size = len(value.encode("utf-8"))
+        ttl = self.ttl_seconds if payload.get("results") else self.empty_ttl_seconds
+        now = time.time()
+        expires_at = now + ttl
+        self._remember(key, expires_at, value)
+        if size > self.max_bytes:
+            return
+
+        try:
+            with self._db_lock:
+                conn = self._connect_unlocked()
+                old = conn.execute(
+                    "SELECT size FROM search_cache WHERE cache_key = ?",
+                    (key,),
+                ).fetchone()
+                conn.execute(
+                    """
+                    INSERT INTO search_cache (cache_key, value, size, expires_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(cache_key) DO UPDATE SET
+                        value = excluded.value,
+                        size = excluded.size,
+                        expires_at = excluded.expires_at,
+                        accessed_at = excluded.accessed_at
+                    """,
+                    (key, value, size, expires_at, now),
+                )
+                self._disk_bytes += size - (int(old[0]) if old else 0)
+                self.stores += 1
+                self._puts_since_purge += 1
+                if self._puts_since_purge >= 256:
+                    self._purge_expired_unlocked(conn, now)
+                if self._disk_bytes > self.max_bytes:
+                    self._evict_unlocked(conn)
+                conn.commit()
+        except Exception:
+            self.errors += 1
+
+    def put_many(self, entries: list[tuple[str, dict[str, Any]]]):
+        now = time.time()
+        records = []
+        for key, payload in entries:
+            value = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+            ttl = self.ttl_seconds if payload.get("results") else self.empty_ttl_seconds
+            records.append((key, value, len(value.encode("utf-8")), now + ttl, now))
+        if not records:
+            return
+        try:
+            with self._db_lock:
+                conn = self._connect_unlocked()
+                conn.executemany(
+                    """
+                    INSERT INTO search_cache (cache_key, value, size, expires_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(cache_key) DO UPDATE SET
+                        value = excluded.value,
+                        size = excluded.size,
+                        expires_at = excluded.expires_at,
+                        accessed_at = excluded.accessed_at
+                    """,
+                    records,
+                )
+                self._disk_bytes = int(
+                    conn.execute("SELECT COALESCE(SUM(size), 0) FROM search_cache").fetchone()[0]
+                )
+                self.stores += len(records)
+                if self._disk_bytes > self.max_bytes:
+                    self._evict_unlocked(conn)
+                conn.commit()
+        except Exception:
+            self.errors += 1
+        with self._lock:
+            for key, *_ in records:
+                self._memory.pop(key, None)
+
+    def _purge_expired_unlocked(self, conn: sqlite3.Connection, now: float):
+        self._puts_since_purge = 0
+        freed = conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM search_cache WHERE expires_at <= ?",
+            (now,),
+        ).fetchone()
+        if not freed[1]:
+            return
+        conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+        self._disk_bytes -= int(freed[0])
+        self.evictions += int(freed[1])
+
+    def _evict_unlocked(self, conn: sqlite3.Connection):
+        # Trim to 90% of the cap so a full cache doesn't evict on every insert.
+        target = int(self.max_bytes * 0.9)
+        rows = conn.execute(
+            "SELECT cache_key, size FROM search_cache ORDER BY accessed_at ASC"
+        )
+        doomed: list[tuple[str]] = []
+        for cache_key, size in rows:
+            if self._disk_bytes <= target:
+                break
+            doomed.append((cache_key,))
+            self._disk_bytes -= int(size)
+        conn.executemany("DELETE FROM search_cache WHERE cache_key = ?", doomed)
+        self.evictions += len(doomed)
+        with self._lock:
+            for (cache_key,) in doomed:
+                self._memory.pop(cache_key, None)
+
+    def iter_payloads(self) -> list[dict[str, Any]]:
+        now = time.time()
+        try:
+            with self._db_lock:
+                conn = self._connect_unlocked()
+                rows = conn.execute(
+                    "SELECT value FROM search_cache WHERE expires_at > ?",
+                    (now,),
+                ).fetchall()
+        except Exception:
+            self.errors += 1
+            return []
+        payloads: list[dict[str, Any]] = []
+        for row in rows:
             try:
-                payload_hint = fetch_naver_payload(f"{query_token} loss", lang)
-                rows_hint, _ = normalize_items_from_payload(payload_hint, lang, seen)
+                payloads.append(json.loads(row[0]))
             except Exception:
-                rows_hint = []
+                continue
+        return payloads
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memoryHits": self.memory_hits,
+            "diskHits": self.disk_hits,
+            "misses": self.misses,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "memoryEntries": len(self._memory),
+            "diskBytes": self._disk_bytes,
+            "maxBytes": self.max_bytes,
+        }
+
+
+SEARCH_CACHE = SearchCache(
+    SEARCH_CACHE_DB_FILE,
+    ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+    empty_ttl_seconds=SEARCH_CACHE_EMPTY_TTL_SECONDS,
+    max_bytes=SEARCH_CACHE_MAX_BYTES,
+    memory_entries=SEARCH_CACHE_MEMORY_ENTRIES,
+)
+
+
+class DictionaryIndex:
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self.fts_enabled = False
+        self.rows_indexed = 0
+        self.local_hits = 0
+        self.local_misses = 0
+        self.errors = 0
+
+    def _connect_unlocked(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dictionary_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                lang TEXT NOT NULL,
+                word TEXT NOT NULL,
+                furigana TEXT NOT NULL DEFAULT '',
+                meaning TEXT NOT NULL DEFAULT '',
+                word_key TEXT NOT NULL,
+                furigana_key TEXT NOT NULL,
+                row_json TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 1,
+                updated_at REAL NOT NULL,
+                UNIQUE(lang, word, furigana, meaning)
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dictionary_word_key ON dictionary_entries(lang, word_key)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dictionary_furigana_key "
+            "ON dictionary_entries(lang, furigana_key)"
+        )
+        # Meaning search (e.g. Korean queries) uses FTS5 when this SQLite build has it.
+        try:
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS dictionary_fts USING fts5(
+                    word, furigana, meaning,
+                    content='dictionary_entries', content_rowid='id', tokenize='trigram'
+                )
+                """
+            )
+            conn.executescript(
+                """
+                CREATE TRIGGER IF NOT EXISTS dictionary_entries_ai AFTER INSERT ON dictionary_entries BEGIN
+                    INSERT INTO dictionary_fts(rowid, word, furigana, meaning)
+                    VALUES (new.id, new.word, new.furigana, new.meaning);
+                END;
+                CREATE TRIGGER IF NOT EXISTS dictionary_entries_ad AFTER DELETE ON dictionary_entries BEGIN
+                    INSERT INTO dictionary_fts(dictionary_fts, rowid, word, furigana, meaning)
+                    VALUES ('delete', old.id, old.word, old.furigana, old.meaning);
+                END;
+                """
+            )
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            self.fts_enabled = False
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def add_rows(self, language: str, rows: list[dict[str, Any]]):
+        now = time.time()
+        records = []
+        for row in rows:
+            word = str(row.get("word") or "")
+            if not word:
+                continue
+            furigana = str(row.get("furigana") or "")
+            records.append(
+                (
+                    language,
+                    word,
+                    furigana,
+                    str(row.get("meaning") or ""),
+                    keyify(word),
+                    keyify(furigana),
+                    json.dumps(row, ensure_ascii=False, separators=(",", ":")),
+                    now,
+                )
+            )
+        if not records:
+            return
+        try:
+            with self._lock:
+                conn = self._connect_unlocked()
+                conn.executemany(
+                    """
+                    INSERT INTO dictionary_entries (
+                        lang, word, furigana, meaning, word_key, furigana_key, row_json, updated_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(lang, word, furigana, meaning) DO UPDATE SET
+                        row_json = excluded.row_json,
+                        hits = hits + 1,
+                        updated_at = excluded.updated_at
+                    """,
+                    records,
+                )
+                conn.commit()
+            self.rows_indexed += len(records)
+        except Exception:
+            self.errors += 1
+
+    def lookup(self, query: str, language: str, limit: int = 10) -> list[dict[str, Any]]:
+        key = keyify(query)
+        if not key:
+            return []
+        # U+10FFFF sorts after every valid continuation, so [key, key+max) is a prefix range.
+        upper = key + "\U0010ffff"
+        try:
+            with self._lock:
+                conn = self._connect_unlocked()
+                rows = conn.execute(
+                    """
+                    SELECT row_json FROM dictionary_entries
+                    WHERE lang = ? AND (
+                        (word_key >= ? AND word_key < ?)
+                        OR (furigana_key >= ? AND furigana_key < ?)
+                    )
+                    ORDER BY (word_key = ? OR furigana_key = ?) DESC, hits DESC, length(word) ASC
+                    LIMIT ?
+                    """,
+                    (language, key, upper, key, upper, key, key, limit),
+                ).fetchall()
+                if not rows and self.fts_enabled and len(key) >= 3:
+                    rows = conn.execute(
+                        """
+                        SELECT e.row_json FROM dictionary_fts f
+                        JOIN dictionary_entries e ON e.id = f.rowid
+                        WHERE dictionary_fts MATCH ? AND e.lang = ?
+                        ORDER BY e.hits DESC
+                        LIMIT ?
+                        """,
+                        ('"' + clean_text(query).replace('"', '""') + '"', language, limit),
+                    ).fetchall()
+        except Exception:
+            self.errors += 1
+            rows = []
+        if rows:
+            self.local_hits += 1
+        else:
+            self.local_misses += 1
+        return [json.loads(row[0]) for row in rows]
 
-            for row in rows_hint:
-                row_word = clean_text(str(row.get("word") or ""))
-                row_word_key = keyify(row_word)
-                if query_key and row_word_key and not (
-                    row_word_key == query_key or query_key in row_word_key
-                ):
-                    continue
-                meaning = clean_text(str(row.get("meaning") or ""))
-                meaning_key = keyify(meaning)
-                if not meaning_key or meaning_key in meaning_keys:
-                    continue
-                score = 0
-                if row_word_key == query_key:
-                    score += 20
-                if "loss" in row_word.lower():
-                    score += 45
-                if any(h in meaning.lower() for h in accounting_hints):
-                    score += 35
-                if score > best_score:
-                    best_score = score
-                    best_row = row
+    def stats(self) -> dict[str, Any]:
+        entries = 0
+        try:
+            with self._lock:
+                conn = self._connect_unlocked()
+                entries = int(conn.execute("SELECT COUNT(*) FROM dictionary_entries").fetchone()[0])
+        except Exception:
+            self.errors += 1
+        return {
+            "entries": entries,
+            "rowsIndexed": self.rows_indexed,
+            "localHits": self.local_hits,
+            "localMisses": self.local_misses,
+            "ftsEnabled": self.fts_enabled,
+            "errors": self.errors,
+        }
+
+
+DICTIONARY_INDEX = DictionaryIndex(DICTIONARY_DB_FILE)
 
-            if best_row and best_score >= 40:
-                normalized.append(best_row)
-                meaning_keys.add(keyify(str(best_row.get("meaning") or "")))
 
+def search_local(query: str, lang: str) -> dict[str, Any]:
+    rows = DICTIONARY_INDEX.lookup(query, lang)
     return {
         "query": query,
-        "correctedQuery": corrected_query or (resolved_query if resolved_query != query else ""),
-        "suggestions": suggestion_queries,
+        "correctedQuery": "",
+        "suggestions": [],
         "language": lang,
-        "source": "en.dict.naver.com" if lang == "en" else "ja.dict.naver.com",
-        "results": normalized,
-        "rawCount": raw_count,
+        "source": "local-index",
+        "results": rows,
+        "rawCount": len(rows),
+        "enrichmentPending": False,
+        "offline": True,
     }
 
 
+class SuggestIndex:
+    def __init__(self, prefix_depth: int = 3, top_k: int = 20):
+        self.prefix_depth = prefix_depth
+        self.top_k = top_k
+        # Sorted (search key, headword id) pairs; long prefixes are one bisect plus a scan.
+        self._pairs: list[tuple[str, str]] = []
+        # Short prefixes match too many headwords to scan, so keep their best top_k ids
+        # up to date instead. Counts only ever grow, which keeps these lists exact.
+        self._top: dict[str, list[str]] = {}
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._keys: dict[str, list[str]] = {}
+        self._seen_history: set[str] = set()
+        self._lock = threading.Lock()
+        self.built = False
+
+    def _rank(self, entry_id: str) -> tuple[int, int]:
+        return self._entries[entry_id]["count"], -len(entry_id)
+
+    def _promote_unlocked(self, entry_id: str, keys: list[str]):
+        for key in keys:
+            for length in range(1, min(self.prefix_depth, len(key)) + 1):
+                top = self._top.setdefault(key[:length], [])
+                if entry_id not in top:
+                    if len(top) >= self.top_k:
+                        if self._rank(entry_id) <= self._rank(top[-1]):
+                            continue
+                        top.pop()
+                    top.append(entry_id)
+                top.sort(key=self._rank, reverse=True)
+
+    def _add_unlocked(self, word: str, reading: str = "", weight: int = 0):
+        word = clean_text(word or "")
+        if not word or len(word) > 80:
+            return
+        entry_id = keyify(word)
+        if not entry_id:
+            return
+        entry = self._entries.get(entry_id)
+        new_keys: list[str] = []
+        if entry is None:
+            entry = {"word": word, "reading": "", "count": 0}
+            self._entries[entry_id] = entry
+            self._keys[entry_id] = [entry_id]
+            bisect.insort(self._pairs, (entry_id, entry_id))
+            new_keys.append(entry_id)
+        reading = clean_text(reading or "")
+        # Only kana readings are useful search keys; English "furigana" is IPA.
+        if reading and not entry["reading"] and RE_KANA.search(reading):
+            entry["reading"] = reading
+            reading_key = keyify(reading)
+            if reading_key and reading_key != entry_id:
+                self._keys[entry_id].append(reading_key)
+                bisect.insort(self._pairs, (reading_key, entry_id))
+                new_keys.append(reading_key)
+        entry["count"] += weight
+        if weight:
+            self._promote_unlocked(entry_id, self._keys[entry_id])
+        elif new_keys:
+            self._promote_unlocked(entry_id, new_keys)
+
+    def add_state(self, state: dict[str, Any]):
+        with self._lock:
+            for row in state.get("lists", []):
+                if not isinstance(row, dict):
+                    continue
+                for word in row.get("words", []):
+                    if isinstance(word, dict):
+                        self._add_unlocked(str(word.get("word") or ""), str(word.get("furigana") or ""))
+            for entry in state.get("history", []):
+                if not isinstance(entry, dict):
+                    continue
+                entry_id = str(entry.get("id") or "")
+                weight = 0 if entry_id in self._seen_history else 1
+                self._seen_history.add(entry_id)
+                self._add_unlocked(str(entry.get("query") or ""), weight=weight)
+
+    def record_lookup(self, query: str, results: list[dict[str, Any]]):
+        query_key = keyify(query)
+        with self._lock:
+            matched = False
+            for row in results:
+                word = str(row.get("word") or "")
+                reading = str(row.get("furigana") or "")
+                hit = bool(query_key) and query_key in (keyify(word), keyify(reading))
+                matched = matched or hit
+                self._add_unlocked(word, reading, weight=1 if hit else 0)
+            if not matched:
+                self._add_unlocked(query, weight=1)
+
+    def build(self):
+        states = iter_saved_states()
+        payloads = SEARCH_CACHE.iter_payloads()
+        for state in states:
+            self.add_state(state)
+        for payload in payloads:
+            self.record_lookup(str(payload.get("query") or ""), payload.get("results") or [])
+        self.built = True
+
+    def suggest(self, prefix: str, limit: int = 8) -> list[dict[str, Any]]:
+        key = keyify(prefix)
+        if not key:
+            return []
+        with self._lock:
+            if len(key) <= self.prefix_depth:
+                matched = set(self._top.get(key, []))
+                if key in self._entries:
+                    matched.add(key)
+            else:
+                index = bisect.bisect_left(self._pairs, (key,))
+                matched = set()
+                while index < len(self._pairs):
+                    pair_key, entry_id = self._pairs[index]
+                    if not pair_key.startswith(key):
+                        break
+                    matched.add(entry_id)
+                    index += 1
+            ranked = heapq.nlargest(
+                limit,
+                matched,
+                key=lambda entry_id: (self._entries[entry_id]["count"], entry_id == key, -len(entry_id)),
+            )
+            return [dict(self._entries[entry_id]) for entry_id in ranked]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "built": self.built,
+                "headwords": len(self._entries),
+                "keys": len(self._pairs),
+                "topPrefixes": len(self._top),
+            }
+
+
+SUGGEST_INDEX = SuggestIndex()
+
+
+class _FlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _FlightCall] = {}
+        self.leaders = 0
+        self.collapsed = 0
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _FlightCall()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self.collapsed += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            "leaders": self.leaders,
+            "collapsed": self.collapsed,
+            "inFlight": in_flight,
+        }
+
+
+SEARCH_FLIGHTS = SingleFlight()
+
+
+def search_cache_key(query: str, language: str) -> str:
+    return f"{language}:{clean_text(query or '').casefold()}"
+
+
+def complete_pending_enrichment(key: str, cached: dict[str, Any], enrich: bool, fetch=None) -> dict[str, Any]:
+    query_token = clean_text(str(cached.get("query") or ""))
+    # Entries cached before empty searches stopped asking for enrichment.
+    rows_hint = ENGLISH_ENRICHMENT.get(query_token) if cached["results"] else []
+    if rows_hint is None:
+        if not enrich:
+            ENGLISH_ENRICHMENT.schedule(query_token)
+            return cached
+        rows_hint = ENGLISH_ENRICHMENT.fetch_now(query_token, fetch)
+    merge_english_enrichment(cached["results"], query_token, rows_hint)
+    cached["enrichmentPending"] = False
+    SEARCH_CACHE.put(key, cached)
+    return cached
+
+
+def resolve_search_language(query: str, language: str | None) -> str:
+    return language if language in ("ja", "en") else detect_query_language(query)
+
+
+def lookup_cached_search(query: str, lang: str, enrich: bool = False, fetch=None) -> dict[str, Any] | None:
+    key = search_cache_key(query, lang)
+    cached = SEARCH_CACHE.get(key)
+    if cached is None:
+        return None
+    if cached.get("enrichmentPending"):
+        cached = complete_pending_enrichment(key, cached, enrich, fetch)
+    # Cache keys are case-folded, so echo back the query as this caller typed it, on a copy
+    # so the cached dict is never shared with another caller's query.
+    return dict(cached, query=query)
+
+
+def lookup_search(
+    query: str, language: str | None = None, enrich: bool = False, offline: bool = False
+) -> dict[str, Any]:
+    lang = resolve_search_language(query, language)
+    if offline or OFFLINE_MODE:
+        result = search_local(query, lang)
+    else:
+        result = lookup_cached_search(query, lang, enrich)
+        if result is None:
+            result = fetch_and_cache_search(query, lang, enrich)
+    SUGGEST_INDEX.record_lookup(query, result.get("results") or [])
+    return result
+
+
+def fetch_and_cache_search(query: str, lang: str, enrich: bool = False) -> dict[str, Any]:
+    key = search_cache_key(query, lang)
+
+    def fetch() -> dict[str, Any]:
+        fresh = search_naver(query, lang, enrich=enrich)
+        SEARCH_CACHE.put(key, fresh)
+        DICTIONARY_INDEX.add_rows(lang, fresh["results"])
+        return fresh
+
+    # Every mirror is tripped: answer from the local index rather than waiting on them.
+    if ENDPOINT_MANAGER.all_tripped(lang):
+        local = search_local(query, lang)
+        if local["results"]:
+            return local
+
+    # Concurrent callers for the same key share one upstream pipeline; followers
+    # get a shallow copy so the echoed query matches what they sent.
+    try:
+        result = SEARCH_FLIGHTS.do(key, fetch)
+    except Exception:
+        # Naver unreachable or rate-limiting us; fall back to what we've indexed.
+        local = search_local(query, lang)
+        if local["results"]:
+            return local
+        raise
+    if enrich and result.get("enrichmentPending"):
+        # The flight is keyed without enrich, so a follower may get a leader's unenriched
+        # result. Finish it for this caller on its own copy of the rows.
+        result = complete_pending_enrichment(key, dict(result, results=list(result["results"])), True)
+    if result.get("query") != query:
+        result = dict(result, query=query)
+    return result
+
+
+BATCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=SEARCH_BATCH_CONCURRENCY, thread_name_prefix="search-batch"
+)
+
+
+def parse_batch_queries(raw_queries: list[Any], default_language: str | None) -> list[tuple[str, str]]:
+    parsed: list[tuple[str, str]] = []
+    for raw in raw_queries:
+        if isinstance(raw, dict):
+            query = clean_text(str(raw.get("query") or raw.get("word") or "")).strip()
+            language = clean_text(str(raw.get("lang") or "")).lower() or default_language
+        else:
+            query = clean_text(str(raw or "")).strip()
+            language = default_language
+        lang = resolve_search_language(query, language) if query else ""
+        parsed.append((query, lang))
+    return parsed
+
+
+def parse_search_params(parsed: urllib.parse.ParseResult) -> tuple[str, str | None, bool, bool]:
+    params = urllib.parse.parse_qs(parsed.query)
+    query = clean_text((params.get("query", [""])[0] or "").strip())
+    language_param = clean_text((params.get("lang", [""])[0] or "").strip()).lower()
+    language = language_param if language_param in ("ja", "en") else None
+    enrich_param = (params.get("enrich", [""])[0] or "").strip().lower()
+    enrich = enrich_param in ("1", "true", "yes")
+    offline_param = (params.get("offline", [""])[0] or "").strip().lower()
+    offline = offline_param in ("1", "true", "yes")
+    return query, language, enrich, offline
+
+
+HTTP_COMPRESSION_STATS = {"responses": 0, "compressed": 0, "bytesIn": 0, "bytesOut": 0}
+
+
+def negotiate_content_encoding(accept_encoding: str | None) -> str | None:
+    offered: dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            offered[name.strip().lower()] = quality
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if offered.get(encoding, offered.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress_response_body(body: bytes, accept_encoding: str | None) -> tuple[bytes, str | None]:
+    HTTP_COMPRESSION_STATS["responses"] += 1
+    if len(body) < HTTP_COMPRESS_MIN_BYTES:
+        return body, None
+    encoding = negotiate_content_encoding(accept_encoding)
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=HTTP_BROTLI_QUALITY)
+    elif encoding == "gzip":
+        compressed = gzip.compress(body, compresslevel=HTTP_GZIP_LEVEL, mtime=0)
+    else:
+        return body, None
+    if len(compressed) >= len(body):
+        return body, None
+    HTTP_COMPRESSION_STATS["compressed"] += 1
+    HTTP_COMPRESSION_STATS["bytesIn"] += len(body)
+    HTTP_COMPRESSION_STATS["bytesOut"] += len(compressed)
+    return compressed, encoding
+
+
+class RequestBodyReader:
+    # Counts what a route reads of the request body: on a kept-alive connection any
+    # unread remainder would be parsed as the next request, so that forces a close.
+    def __init__(self, raw, length: int):
+        self.raw = raw
+        self.length = length
+        self.consumed = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.consumed += len(data)
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        data = self.raw.readline(size)
+        self.consumed += len(data)
+        return data
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.length - self.consumed)
+
+
+RE_STATIC_REFERENCE = re.compile(r'((?:src|href)=")(\./|/)?([\w.-]+)(")')
+STATIC_COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+class StaticAssets:
+    # STATIC_DIR held in memory with precompressed variants. Every file except index.html
+    # is also served under a content-hashed name (app.3f2a9c1d.js) that index.html is
+    # rewritten to reference, so those can be cached forever while index.html revalidates.
+    def __init__(self, root: Path):
+        self.root = root
+        self._assets: dict[str, dict[str, Any]] | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.not_modified = 0
+
+    def _build(self, name: str, body: bytes) -> dict[str, Any]:
+        digest = hashlib.sha256(body).hexdigest()
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        variants = {None: body}
+        if content_type.startswith(STATIC_COMPRESSIBLE_TYPES) and len(body) >= HTTP_COMPRESS_MIN_BYTES:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                variants["gzip"] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    variants["br"] = compressed
+        return {"type": content_type, "digest": digest, "variants": variants}
+
+    def load(self) -> dict[str, dict[str, Any]]:
+        files: dict[str, bytes] = {}
+        for path in sorted(self.root.rglob("*")):
+            if path.is_file():
+                files[path.relative_to(self.root).as_posix()] = path.read_bytes()
+        assets: dict[str, dict[str, Any]] = {}
+        hashed_names: dict[str, str] = {}
+        for name, body in files.items():
+            if name == "index.html":
+                continue
+            asset = self._build(name, body)
+            stem, dot, suffix = name.rpartition(".")
+            hashed = f"{stem}.{asset['digest'][:10]}.{suffix}" if dot else f"{name}.{asset['digest'][:10]}"
+            hashed_names[name] = hashed
+            assets[name] = asset
+            assets[hashed] = dict(asset, immutable=True)
+        if "index.html" in files:
+
+            def rewrite(match: re.Match[str]) -> str:
+                hashed = hashed_names.get(match.group(3))
+                if hashed is None:
+                    return match.group(0)
+                return f"{match.group(1)}{match.group(2) or ''}{hashed}{match.group(4)}"
+
+            index = RE_STATIC_REFERENCE.sub(rewrite, files["index.html"].decode("utf-8")).encode("utf-8")
+            assets["index.html"] = self._build("index.html", index)
+        self._assets = assets
+        return assets
+
+    def get(self, path: str) -> dict[str, Any] | None:
+        assets = self._assets
+        if assets is None:
+            with self._lock:
+                assets = self._assets if self._assets is not None else self.load()
+        name = urllib.parse.unquote(path).lstrip("/") or "index.html"
+        return assets.get(name)
+
+    def stats(self) -> dict[str, int]:
+        assets = self._assets or {}
+        files = [asset for asset in assets.values() if not asset.get("immutable")]
+        return {
+            "files": len(files),
+            "bytes": sum(len(variant) for asset in files for variant in asset["variants"].values()),
+            "hits": self.hits,
+            "notModified": self.not_modified,
+        }
+
+
+STATIC_ASSETS = StaticAssets(STATIC_DIR)
+
+
+def static_etag(asset: dict[str, Any], encoding: str | None) -> str:
+    # Strong validators have to differ per representation, so the encoding is part of it.
+    return f'"{asset["digest"][:32]}{"-" + encoding if encoding else ""}"'
+
+
+def etag_matches(if_none_match: str | None, etags: list[str]) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses weak comparison, so W/ prefixes don't matter on either side.
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or any(tag.removeprefix("W/") in candidates for tag in etags)
+
+
+API_RESPONSE_HEADERS = (
+    ("Access-Control-Allow-Origin", "*"),
+    ("Access-Control-Allow-Methods", "GET, POST, DELETE, OPTIONS"),
+    ("Access-Control-Allow-Headers", "Content-Type, Authorization"),
+)
+
+
+def metrics_route(path: str) -> str:
+    if path in METRICS_ROUTES:
+        return path
+    if path.startswith("/api/users/"):
+        return "/api/users/:id"
+    if path.startswith("/api/"):
+        return "/api/other"
+    return "static"
+
+
+def record_http_request(path: str, method: str, status: int, elapsed: float, size: int):
+    route = metrics_route(path)
+    METRICS.inc("hub_http_requests_total", (("route", route), ("method", method), ("status", str(status))))
+    METRICS.observe("hub_http_request_seconds", elapsed, (("route", route),))
+    METRICS.observe("hub_http_response_bytes", size, (("route", route),))
+
+
 class JapaneseHubHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; with Nagle on, the body of a kept-alive
+    # response waits for the client's delayed ACK of the headers.
+    disable_nagle_algorithm = True
+    chunked = False
+    cache_control = "no-store"
+    timeout = HTTP_KEEPALIVE_TIMEOUT_SECONDS
+    request_started: float | None = None
+
+    def parse_request(self) -> bool:
+        self.cache_control = "no-store"
+        self.request_started = time.perf_counter()
+        self.response_status = 0
+        self.response_bytes = 0
+        if not super().parse_request():
+            return False
+        try:
+            length = max(0, int(self.headers.get("Content-Length") or 0))
+        except ValueError:
+            length = 0
+            self.close_connection = True
+        self.rfile = RequestBodyReader(self.rfile, length)
+        return True
+
+    def handle_one_request(self):
+        self.request_started = None
+        super().handle_one_request()
+        body = self.rfile
+        if isinstance(body, RequestBodyReader):
+            self.rfile = body.raw
+            if body.remaining:
+                self.close_connection = True
+        if self.request_started is not None and self.response_status:
+            record_http_request(
+                urllib.parse.urlsplit(getattr(self, "path", "")).path,
+                self.command or "",
+                self.response_status,
+                time.perf_counter() - self.request_started,
+                self.response_bytes,
+            )
+
+    def send_response(self, code, message=None):
+        self.response_status = int(code)
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == "content-length":
+            self.response_bytes = int(value)
+        super().send_header(keyword, value)
+
     def translate_path(self, path: str) -> str:
         path = path.split("?", 1)[0].split("#", 1)[0]
         if path in ("/", ""):
@@ -1108,10 +4280,72 @@ class JapaneseHubHandler(SimpleHTTPRequestHandler):
         if parsed.path == "/api/state":
             self.handle_api_state_get()
             return
+        if parsed.path == "/api/state/ops":
+            self.handle_api_state_ops_get(parsed)
+            return
+        if parsed.path == "/api/suggest":
+            self.handle_api_suggest(parsed)
+            return
+        if parsed.path == "/api/stats":
+            self.handle_api_stats()
+            return
+        if parsed.path == "/metrics" and METRICS.enabled:
+            self.handle_metrics()
+            return
+        if self.send_static(parsed.path):
+            return
         return super().do_GET()
 
+    def do_HEAD(self):
+        parsed = urllib.parse.urlparse(self.path)
+        if self.send_static(parsed.path, head_only=True):
+            return
+        return super().do_HEAD()
+
+    def send_not_modified(self, etag: str, matching: list[str] | None = None) -> bool:
+        if not etag_matches(self.headers.get("If-None-Match"), matching or [etag]):
+            return False
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return True
+
+    def send_static(self, path: str, head_only: bool = False) -> bool:
+        asset = STATIC_ASSETS.get(path)
+        if asset is None:
+            return False
+        STATIC_ASSETS.hits += 1
+        variants = asset["variants"]
+        encoding = negotiate_content_encoding(self.headers.get("Accept-Encoding"))
+        if encoding not in variants:
+            encoding = None
+        if asset.get("immutable"):
+            self.cache_control = f"public, max-age={STATIC_MAX_AGE_SECONDS}, immutable"
+        else:
+            self.cache_control = "no-cache"
+        etag = static_etag(asset, encoding)
+        if self.send_not_modified(etag, [static_etag(asset, name) for name in variants]):
+            STATIC_ASSETS.not_modified += 1
+            return True
+        body = variants[encoding]
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", asset["type"])
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+        return True
+
     def do_POST(self):
         parsed = urllib.parse.urlparse(self.path)
+        if parsed.path == "/api/search/batch":
+            self.handle_api_search_batch()
+            return
         if parsed.path == "/api/users":
             self.handle_api_users_post()
             return
@@ -1121,6 +4355,9 @@ class JapaneseHubHandler(SimpleHTTPRequestHandler):
         if parsed.path == "/api/state":
             self.handle_api_state_post(parsed)
             return
+        if parsed.path == "/api/state/ops":
+            self.handle_api_state_ops_post(parsed)
+            return
         self.send_error(HTTPStatus.NOT_FOUND)
 
     def do_DELETE(self):
@@ -1139,31 +4376,33 @@ class JapaneseHubHandler(SimpleHTTPRequestHandler):
         self.send_error(HTTPStatus.NOT_FOUND)
 
     def end_headers(self):
-        self.send_header("Cache-Control", "no-store")
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, DELETE, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
+        self.send_header("Cache-Control", self.cache_control)
+        for name, value in API_RESPONSE_HEADERS:
+            self.send_header(name, value)
         super().end_headers()
 
-    def send_json(self, payload: dict[str, Any], status: int = HTTPStatus.OK):
+    def send_json(self, payload: dict[str, Any], status: int = HTTPStatus.OK, etag: str | None = None):
         body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        body, encoding = compress_response_body(body, self.headers.get("Accept-Encoding"))
         self.send_response(status)
         self.send_header("Content-Type", "application/json; charset=utf-8")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Vary", "Accept-Encoding")
+        if etag:
+            self.send_header("ETag", etag)
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         self.wfile.write(body)
 
     def handle_api_search(self, parsed: urllib.parse.ParseResult):
-        params = urllib.parse.parse_qs(parsed.query)
-        query = clean_text((params.get("query", [""])[0] or "").strip())
-        language_param = clean_text((params.get("lang", [""])[0] or "").strip()).lower()
-        language = language_param if language_param in ("ja", "en") else None
+        query, language, enrich, offline = parse_search_params(parsed)
         if len(query) < 1:
             self.send_json({"error": "Please enter a word."}, status=HTTPStatus.BAD_REQUEST)
             return
 
         try:
-            payload = search_naver(query, language)
+            payload = lookup_search(query, language, enrich=enrich, offline=offline)
             self.send_json(payload)
         except Exception as exc:
             self.send_json(
@@ -1174,9 +4413,167 @@ class JapaneseHubHandler(SimpleHTTPRequestHandler):
                 status=HTTPStatus.BAD_GATEWAY,
             )
 
+    def write_ndjson_line(self, payload: dict[str, Any]):
+        line = json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+        if self.chunked:
+            line = b"%x\r\n%s\r\n" % (len(line), line)
+        self.wfile.write(line)
+        self.wfile.flush()
+
+    def handle_api_search_batch(self):
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            if length < 1 or length > 1_000_000:
+                self.send_json({"error": "Invalid request size."}, status=HTTPStatus.BAD_REQUEST)
+                return
+            body = self.rfile.read(length).decode("utf-8", errors="replace")
+            payload = json.loads(body)
+        except Exception as exc:
+            self.send_json({"error": "Invalid request body.", "details": str(exc)}, status=400)
+            return
+
+        raw_queries = payload.get("queries") if isinstance(payload, dict) else None
+        if not isinstance(raw_queries, list):
+            self.send_json({"error": "Expected a list of queries."}, status=HTTPStatus.BAD_REQUEST)
+            return
+        if len(raw_queries) > SEARCH_BATCH_MAX_QUERIES:
+            self.send_json(
+                {"error": f"At most {SEARCH_BATCH_MAX_QUERIES} queries per batch."},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+            return
+        language_param = clean_text(str(payload.get("lang") or "")).lower()
+        default_language = language_param if language_param in ("ja", "en") else None
+        queries = parse_batch_queries(raw_queries, default_language)
+
+        # Identical (query, lang) pairs are looked up once and fanned back out by index.
+        indexes_by_key: OrderedDict[str, list[int]] = OrderedDict()
+        for index, (query, lang) in enumerate(queries):
+            if query:
+                indexes_by_key.setdefault(search_cache_key(query, lang), []).append(index)
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        # Lines go out as they resolve, so the length isn't known up front: chunk them on
+        # HTTP/1.1 and keep the connection; HTTP/1.0 clients read until close.
+        self.chunked = self.request_version != "HTTP/1.0"
+        if self.chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.close_connection = True
+        self.end_headers()
+
+        counts = {"cached": 0, "fetched": 0, "failed": 0}
+        futures: dict[Future, str] = {}
+        try:
+            for index, (query, _) in enumerate(queries):
+                if not query:
+                    counts["failed"] += 1
+                    self.write_ndjson_line({"index": index, "error": "Please enter a word."})
+
+            for key, indexes in indexes_by_key.items():
+                query, lang = queries[indexes[0]]
+                cached = lookup_cached_search(query, lang)
+                if cached is None:
+                    futures[BATCH_EXECUTOR.submit(fetch_and_cache_search, query, lang)] = key
+                    continue
+                counts["cached"] += len(indexes)
+                for index in indexes:
+                    self.write_ndjson_line({"index": index, "query": queries[index][0], "result": cached})
+
+            for future in as_completed(futures):
+                indexes = indexes_by_key[futures[future]]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    counts["failed"] += len(indexes)
+                    for index in indexes:
+                        self.write_ndjson_line(
+                            {
+                                "index": index,
+                                "query": queries[index][0],
+                                "error": "Could not fetch from Naver dictionary.",
+                                "details": str(exc),
+                            }
+                        )
+                    continue
+                counts["fetched"] += len(indexes)
+                for index in indexes:
+                    self.write_ndjson_line(
+                        {"index": index, "query": queries[index][0], "result": result}
+                    )
+
+            self.write_ndjson_line({"done": True, "total": len(queries), **counts})
+            if self.chunked:
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away; don't start upstream work nobody will read.
+            for future in futures:
+                future.cancel()
+            self.close_connection = True
+
+    def handle_api_suggest(self, parsed: urllib.parse.ParseResult):
+        params = urllib.parse.parse_qs(parsed.query)
+        prefix = clean_text((params.get("prefix", [""])[0] or "").strip())
+        try:
+            limit = max(1, min(20, int(params.get("limit", ["8"])[0] or "8")))
+        except ValueError:
+            limit = 8
+        self.send_json({"prefix": prefix, "suggestions": SUGGEST_INDEX.suggest(prefix, limit)})
+
+    def handle_metrics(self):
+        body = METRICS.render().encode("utf-8")
+        body, encoding = compress_response_body(body, self.headers.get("Accept-Encoding"))
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_api_stats(self):
+        self.send_json(
+            {
+                "searchCache": SEARCH_CACHE.stats(),
+                "searchFlights": SEARCH_FLIGHTS.stats(),
+                "upstream": UPSTREAM_CLIENT.stats(),
+                "endpoints": ENDPOINT_MANAGER.stats(),
+                "englishEnrichment": ENGLISH_ENRICHMENT.stats(),
+                "dictionaryIndex": DICTIONARY_INDEX.stats(),
+                "suggestIndex": SUGGEST_INDEX.stats(),
+                "payloadArchive": PAYLOAD_ARCHIVE.stats(),
+                "streamParse": {"enabled": UPSTREAM_STREAM_PARSE, **dict(STREAM_PARSE_STATS)},
+                "payloadShapes": PAYLOAD_SHAPES.stats(),
+                "textMemo": memo_stats(),
+                "stateStore": dict(STATE_STORE_STATS),
+                "stateDb": STATE_DB.stats(),
+                "stateLocks": STATE_USER_LOCKS.stats(),
+                "staticAssets": STATIC_ASSETS.stats(),
+                "httpCompression": {"brotli": brotli is not None, **HTTP_COMPRESSION_STATS},
+                "asyncServer": {**ASYNC_SERVER_STATS, "upstream": ASYNC_UPSTREAM.stats()},
+                "stateOps": dict(STATE_OPS_STATS),
+                "stateEtags": dict(STATE_ETAG_STATS),
+            }
+        )
+
     def handle_api_users_get(self):
         users = list_users()
-        self.send_json({"users": users})
+        etag = users_etag(users)
+        if self.revalidate_api(etag):
+            return
+        self.send_json({"users": users}, etag=etag)
+
+    def revalidate_api(self, etag: str | None) -> bool:
+        # Stored but revalidated on every use, so unchanged reloads come back as a bare 304.
+        self.cache_control = "no-cache"
+        if etag and self.send_not_modified(etag):
+            STATE_ETAG_STATS["notModified"] += 1
+            return True
+        STATE_ETAG_STATS["sent"] += 1
+        return False
 
     def handle_api_users_post(self, delete_only: bool = False):
         try:
@@ -1231,17 +4628,31 @@ class JapaneseHubHandler(SimpleHTTPRequestHandler):
         parsed = urllib.parse.urlparse(self.path)
         params = urllib.parse.parse_qs(parsed.query)
         user_ref = clean_text((params.get("user", [""])[0] or "").strip())
-        self.send_json(load_saved_state(user_ref or None))
+        list_id = clean_text((params.get("list", [""])[0] or "").strip())
+        version = load_state_version(user_ref or None)
+        if self.revalidate_api(state_etag(version, list_id) if version else None):
+            return
+        if list_id:
+            word_list = load_saved_list(list_id, user_ref or None)
+            if word_list is None:
+                self.send_json({"error": "Unknown list."}, status=HTTPStatus.NOT_FOUND)
+                return
+            self.send_json({"list": word_list}, etag=state_etag(version, list_id) if version else None)
+            return
+        state = load_saved_state(user_ref or None)
+        if version is not None and "revision" in state:
+            # Tag what was actually read; a write between the two reads only moves it forward.
+            version = (version[0], version[1], state["revision"])
+        self.send_json(state, etag=state_etag(version) if version else None)
 
     def handle_api_state_post(self, parsed: urllib.parse.ParseResult):
         params = urllib.parse.parse_qs(parsed.query)
         user_ref = clean_text((params.get("user", [""])[0] or "").strip())
         if user_ref:
-            with STATE_LOCK:
-                _init_state_db_unlocked()
-                if resolve_user_id_unlocked(user_ref, default_if_missing=False) is None:
-                    self.send_json({"error": "Unknown user."}, status=HTTPStatus.NOT_FOUND)
-                    return
+            init_state_db()
+            if resolve_user_id_unlocked(user_ref, default_if_missing=False) is None:
+                self.send_json({"error": "Unknown user."}, status=HTTPStatus.NOT_FOUND)
+                return
         try:
             length = int(self.headers.get("Content-Length", "0"))
             if length < 1 or length > 5_000_000:
@@ -1250,15 +4661,595 @@ class JapaneseHubHandler(SimpleHTTPRequestHandler):
             body = self.rfile.read(length).decode("utf-8", errors="replace")
             payload = json.loads(body)
             normalized = save_state(payload, user_ref or None)
-            self.send_json({"ok": True, "lists": len(normalized["lists"])})
+            self.send_json({"ok": True, "lists": len(normalized["lists"]), "revision": normalized.get("revision")})
         except Exception as exc:
             self.send_json({"error": "Could not save state.", "details": str(exc)}, status=400)
 
+    def handle_api_state_ops_get(self, parsed: urllib.parse.ParseResult):
+        params = urllib.parse.parse_qs(parsed.query)
+        user_ref = clean_text((params.get("user", [""])[0] or "").strip())
+        try:
+            since = int((params.get("since", ["0"])[0] or "0").strip())
+        except ValueError:
+            self.send_json({"error": "Invalid revision."}, status=HTTPStatus.BAD_REQUEST)
+            return
+        try:
+            self.send_json(load_state_ops(since, user_ref or None))
+        except ValueError as exc:
+            self.send_json({"error": str(exc)}, status=HTTPStatus.NOT_FOUND)
+
+    def handle_api_state_ops_post(self, parsed: urllib.parse.ParseResult):
+        params = urllib.parse.parse_qs(parsed.query)
+        user_ref = clean_text((params.get("user", [""])[0] or "").strip())
+        if user_ref:
+            init_state_db()
+            if resolve_user_id_unlocked(user_ref, default_if_missing=False) is None:
+                self.send_json({"error": "Unknown user."}, status=HTTPStatus.NOT_FOUND)
+                return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            if length < 1 or length > 5_000_000:
+                self.send_json({"error": "Invalid request size."}, status=HTTPStatus.BAD_REQUEST)
+                return
+            payload = json.loads(self.rfile.read(length).decode("utf-8", errors="replace"))
+            self.send_json(apply_state_ops(payload, user_ref or None))
+        except Exception as exc:
+            self.send_json({"error": "Could not apply ops.", "details": str(exc)}, status=400)
+
+
+def renormalize_archived_batch(records: list[tuple[str, str]]) -> list[tuple[str, str, dict[str, Any] | None]]:
+    rebuilt: list[tuple[str, str, dict[str, Any] | None]] = []
+    for language, query in records:
+        try:
+            response = search_naver(query, language, fetch=PAYLOAD_ARCHIVE.load)
+        except Exception:
+            response = None
+        rebuilt.append((language, query, response))
+    return rebuilt
+
+
+def renormalize_archive(workers: int, batch_size: int):
+    # Replays every archived query through search_naver with the archive standing in for
+    # Naver, then refreshes the search cache and dictionary index from the results.
+    started = time.perf_counter()
+    done = 0
+    failed = 0
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=workers) as pool:
+        batches = PAYLOAD_ARCHIVE.iter_fetches(batch_size)
+        for rebuilt in pool.imap_unordered(renormalize_archived_batch, batches):
+            cache_entries: list[tuple[str, dict[str, Any]]] = []
+            rows_by_language: dict[str, list[dict[str, Any]]] = {}
+            for language, query, response in rebuilt:
+                if response is None:
+                    failed += 1
+                    continue
+                cache_entries.append((search_cache_key(query, language), response))
+                rows_by_language.setdefault(language, []).extend(response["results"])
+            SEARCH_CACHE.put_many(cache_entries)
+            for language, rows in rows_by_language.items():
+                DICTIONARY_INDEX.add_rows(language, rows)
+            done += len(rebuilt)
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed else 0.0
+    print(f"Re-normalized {done} archived queries in {elapsed:.1f}s ({rate:.0f}/s), {failed} failed")
+
+
+class AsyncUpstreamClient:
+    # asyncio twin of UpstreamClient for SERVER_MODE=asyncio: same pooling and redirect
+    # rules, but a slow mirror costs a suspended coroutine instead of a blocked thread.
+    def __init__(self, ssl_context: ssl.SSLContext, pool_size: int, idle_timeout: float):
+        self.ssl_context = ssl_context
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self._pools: dict[tuple[str, str, int], list[tuple[float, asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.stale_retries = 0
+
+    async def _acquire(
+        self, key: tuple[str, str, int]
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        now = time.monotonic()
+        pool = self._pools.get(key) or []
+        while pool:
+            released_at, reader, writer = pool.pop()
+            if now - released_at <= self.idle_timeout and not reader.at_eof():
+                self.connections_reused += 1
+                return reader, writer, True
+            writer.close()
+        self.connections_opened += 1
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host,
+            port,
+            ssl=self.ssl_context if scheme == "https" else None,
+            server_hostname=host if scheme == "https" else None,
+            limit=1 << 20,
+        )
+        return reader, writer, False
+
+    def _release(self, key: tuple[str, str, int], reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        pool = self._pools.setdefault(key, [])
+        if len(pool) < self.pool_size:
+            pool.append((time.monotonic(), reader, writer))
+            return
+        writer.close()
+
+    async def _read_response(self, reader: asyncio.StreamReader) -> tuple[int, dict[str, str], bytes, bool]:
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("iso-8859-1").split("\r\n")
+        status_line = lines[0].split(None, 2)
+        status = int(status_line[1])
+        headers: dict[str, str] = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        will_close = status_line[0] == "HTTP/1.0" or headers.get("connection", "").lower() == "close"
+        if status in (204, 304) or 100 <= status < 200:
+            return status, headers, b"", will_close
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0].strip(), 16)
+                if size == 0:
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            return status, headers, b"".join(chunks), will_close
+        if "content-length" in headers:
+            return status, headers, await reader.readexactly(int(headers["content-length"])), will_close
+        return status, headers, await reader.read(), True
+
+    async def _request(
+        self, key: tuple[str, str, int], path: str, headers: dict[str, str]
+    ) -> tuple[int, str, bytes]:
+        host = key[1] if key[2] in (80, 443) else f"{key[1]}:{key[2]}"
+        lines = [f"GET {path} HTTP/1.1", f"Host: {host}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1", errors="replace")
+        for attempt in range(2):
+            reader, writer, reused = await self._acquire(key)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, response_headers, body, will_close = await self._read_response(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+                # The server may have dropped an idle keep-alive socket; retry once fresh.
+                if reused and attempt == 0:
+                    self.stale_retries += 1
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            if will_close:
+                writer.close()
+            else:
+                self._release(key, reader, writer)
+            body = decode_content_encoding(body, response_headers.get("content-encoding"))
+            return status, response_headers.get("location", ""), body
+        raise RuntimeError("Upstream connection failed")
+
+    async def get(
+        self,
+        url: str,
+        headers: dict[str, str],
+        timeout: float = UPSTREAM_TIMEOUT_SECONDS,
+        max_redirects: int = 3,
+    ) -> tuple[int, bytes]:
+        request_headers = dict(headers)
+        request_headers.setdefault("Accept-Encoding", "gzip, deflate")
+        request_headers.setdefault("Connection", "keep-alive")
+
+        for _ in range(max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            scheme = parts.scheme or "https"
+            port = parts.port or (443 if scheme == "https" else 80)
+            key = (scheme, parts.hostname or "", port)
+            path = parts.path or "/"
+            if parts.query:
+                path = f"{path}?{parts.query}"
+
+            status, location, body = await asyncio.wait_for(self._request(key, path, request_headers), timeout)
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            return status, body
+
+        raise RuntimeError(f"Too many redirects for {url}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "connectionsOpened": self.connections_opened,
+            "connectionsReused": self.connections_reused,
+            "staleRetries": self.stale_retries,
+            "idleConnections": sum(len(pool) for pool in self._pools.values()),
+        }
+
+
+ASYNC_UPSTREAM = AsyncUpstreamClient(
+    SSL_CONTEXT,
+    pool_size=UPSTREAM_POOL_SIZE,
+    idle_timeout=UPSTREAM_IDLE_TIMEOUT_SECONDS,
+)
+# SQLite-backed work (state, users, search cache, local index) and everything else that
+# still runs synchronously get separate bounded pools, so a burst of one can't starve
+# the other and the thread count stays fixed however many connections are open.
+ASYNC_DB_EXECUTOR = ThreadPoolExecutor(max_workers=ASYNC_DB_WORKERS, thread_name_prefix="async-db")
+ASYNC_ROUTE_EXECUTOR = ThreadPoolExecutor(max_workers=ASYNC_ROUTE_WORKERS, thread_name_prefix="async-route")
+# A batch holds its thread until every word has streamed out, so it gets its own pool.
+ASYNC_BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=ASYNC_BATCH_WORKERS, thread_name_prefix="async-batch")
+ASYNC_SEARCH_FLIGHTS: dict[str, asyncio.Future] = {}
+ASYNC_SERVER_STATS = {"connections": 0, "requests": 0, "rejected": 0, "inFlight": 0, "peakInFlight": 0, "searchPasses": 0}
+
+
+def _ignore_task_result(task: asyncio.Future):
+    if not task.cancelled():
+        task.exception()
+
+
+async def fetch_endpoint_payload_async(
+    endpoint: str, params: dict[str, str], headers: dict[str, str]
+) -> dict[str, Any]:
+    url = f"{endpoint}?{urllib.parse.urlencode(params)}"
+    language = language_for_endpoint(endpoint)
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        status, body = await ASYNC_UPSTREAM.get(url, headers, timeout=UPSTREAM_TIMEOUT_SECONDS)
+        if status != 200:
+            raise RuntimeError(f"status={status}")
+        payload = await loop.run_in_executor(
+            ASYNC_ROUTE_EXECUTOR, json.loads, body.decode("utf-8", errors="replace")
+        )
+    except Exception:
+        record_upstream_fetch(endpoint, time.perf_counter() - started, ok=False)
+        raise
+    record_upstream_fetch(endpoint, time.perf_counter() - started, ok=True, size=len(body))
+    PAYLOAD_ARCHIVE.store(params["query"], language, body)
+    return payload
+
+
+async def fetch_naver_payload_async(query: str, language: str = "ja") -> dict[str, Any]:
+    # Same mirror ranking, hedging and failover as fetch_naver_payload.
+    params = build_naver_params(query)
+    errors: list[str] = []
+    endpoints = ENDPOINT_MANAGER.ranked(language)
+    headers = build_naver_headers(language)
+    pending: dict[asyncio.Future, str] = {}
+    last_launched = ""
+
+    def launch():
+        nonlocal last_launched
+        endpoint = endpoints.pop(0)
+        last_launched = endpoint
+        task = asyncio.ensure_future(fetch_endpoint_payload_async(endpoint, params, headers))
+        task.add_done_callback(_ignore_task_result)
+        pending[task] = endpoint
+
+    launch()
+    while pending:
+        can_hedge = bool(endpoints) and len(pending) < 2
+        delay = ENDPOINT_MANAGER.hedge_delay(last_launched) if can_hedge else None
+        done, _ = await asyncio.wait(list(pending), timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            ENDPOINT_MANAGER.hedges += 1
+            launch()
+            continue
+        for task in done:
+            endpoint = pending.pop(task)
+            try:
+                return task.result()
+            except Exception as exc:
+                errors.append(f"{endpoint} error={exc}")
+        if endpoints and len(pending) < 2:
+            launch()
+
+    raise RuntimeError(" | ".join(errors) if errors else "No endpoint available")
+
+
+async def run_with_async_payloads(work, executor: ThreadPoolExecutor | None = None) -> Any:
+    # work(fetch) is deterministic given its payloads, so run it against what has been
+    # fetched so far; every payload it asks for and doesn't have yet is fetched here
+    # without holding a thread, then the pass is repeated. Usually one or two passes.
+    loop = asyncio.get_running_loop()
+    payloads: dict[tuple[str, str], Any] = {}
+    while True:
+        missing: list[tuple[str, str]] = []
+
+        def fetch(candidate: str, language: str) -> dict[str, Any]:
+            value = payloads.get((candidate, language))
+            if value is None:
+                missing.append((candidate, language))
+                raise PayloadPending(candidate)
+            if isinstance(value, Exception):
+                raise value
+            return value
+
+        ASYNC_SERVER_STATS["searchPasses"] += 1
+        try:
+            return await loop.run_in_executor(executor or ASYNC_ROUTE_EXECUTOR, work, fetch)
+        except Exception:
+            if not missing:
+                raise
+        wanted = list(dict.fromkeys(missing))
+        fetched = await asyncio.gather(
+            *(fetch_naver_payload_async(candidate, language) for candidate, language in wanted),
+            return_exceptions=True,
+        )
+        payloads.update(zip(wanted, fetched))
+
+
+async def search_naver_async(query: str, lang: str, enrich: bool = False) -> dict[str, Any]:
+    return await run_with_async_payloads(
+        lambda fetch: search_naver(query, lang, enrich=enrich, fetch=fetch, replay=False)
+    )
+
+
+async def _fetch_and_store_search_async(key: str, query: str, lang: str, enrich: bool) -> dict[str, Any]:
+    fresh = await search_naver_async(query, lang, enrich)
+
+    def store():
+        SEARCH_CACHE.put(key, fresh)
+        DICTIONARY_INDEX.add_rows(lang, fresh["results"])
+
+    await asyncio.get_running_loop().run_in_executor(ASYNC_DB_EXECUTOR, store)
+    return fresh
+
+
+async def fetch_and_cache_search_async(query: str, lang: str, enrich: bool = False) -> dict[str, Any]:
+    key = search_cache_key(query, lang)
+    loop = asyncio.get_running_loop()
+    if ENDPOINT_MANAGER.all_tripped(lang):
+        local = await loop.run_in_executor(ASYNC_DB_EXECUTOR, search_local, query, lang)
+        if local["results"]:
+            return local
+
+    flight = ASYNC_SEARCH_FLIGHTS.get(key)
+    if flight is None:
+        flight = asyncio.ensure_future(_fetch_and_store_search_async(key, query, lang, enrich))
+        flight.add_done_callback(_ignore_task_result)
+        flight.add_done_callback(lambda _: ASYNC_SEARCH_FLIGHTS.pop(key, None))
+        ASYNC_SEARCH_FLIGHTS[key] = flight
+        SEARCH_FLIGHTS.leaders += 1
+    else:
+        SEARCH_FLIGHTS.collapsed += 1
+    try:
+        result = await asyncio.shield(flight)
+    except Exception:
+        local = await loop.run_in_executor(ASYNC_DB_EXECUTOR, search_local, query, lang)
+        if local["results"]:
+            return local
+        raise
+    if enrich and result.get("enrichmentPending"):
+        pending = dict(result, results=list(result["results"]))
+        result = await run_with_async_payloads(
+            lambda fetch: complete_pending_enrichment(key, pending, True, fetch), ASYNC_DB_EXECUTOR
+        )
+    if result.get("query") != query:
+        result = dict(result, query=query)
+    return result
+
+
+async def lookup_search_async(
+    query: str, language: str | None = None, enrich: bool = False, offline: bool = False
+) -> dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    lang = resolve_search_language(query, language)
+    if offline or OFFLINE_MODE:
+        result = await loop.run_in_executor(ASYNC_DB_EXECUTOR, search_local, query, lang)
+    else:
+        if enrich:
+            # A pending enrichment probe is fetched on the loop like any other payload.
+            result = await run_with_async_payloads(
+                lambda fetch: lookup_cached_search(query, lang, True, fetch), ASYNC_DB_EXECUTOR
+            )
+        else:
+            result = await loop.run_in_executor(ASYNC_DB_EXECUTOR, lookup_cached_search, query, lang)
+        if result is None:
+            result = await fetch_and_cache_search_async(query, lang, enrich)
+    SUGGEST_INDEX.record_lookup(query, result.get("results") or [])
+    return result
+
+
+class LoopWriter:
+    # wfile for handlers running on an executor thread: hands each write to the event
+    # loop, which owns the transport.
+    def __init__(self, loop: asyncio.AbstractEventLoop, writer: asyncio.StreamWriter):
+        self.loop = loop
+        self.writer = writer
+        self.written = 0
+
+    def write(self, data: bytes) -> int:
+        self.loop.call_soon_threadsafe(self.writer.write, bytes(data))
+        self.written += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+class AsyncBridgeHandler(JapaneseHubHandler):
+    # Runs one request that was already read off the socket through the normal route
+    # table, so the asyncio server and the threaded one share every non-search route.
+    def __init__(self, raw_request: bytes, client_address: tuple[str, int], wfile: LoopWriter):
+        self.rfile = io.BytesIO(raw_request)
+        self.wfile = wfile
+        self.client_address = client_address
+        self.directory = str(STATIC_DIR)
+        self.close_connection = True
+        self.handle_one_request()
+        self.keep_alive = not self.close_connection
+
+
+def async_json_response(
+    payload: dict[str, Any],
+    status: int = HTTPStatus.OK,
+    accept_encoding: str | None = None,
+    keep_alive: bool = False,
+) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    body, encoding = compress_response_body(body, accept_encoding)
+    lines = [
+        f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(body)}",
+        "Vary: Accept-Encoding",
+        "Connection: keep-alive" if keep_alive else "Connection: close",
+        "Cache-Control: no-store",
+    ]
+    if encoding:
+        lines.append(f"Content-Encoding: {encoding}")
+    lines.extend(f"{name}: {value}" for name, value in API_RESPONSE_HEADERS)
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def async_search_response(
+    parsed: urllib.parse.ParseResult, accept_encoding: str | None, keep_alive: bool
+) -> bytes:
+    query, language, enrich, offline = parse_search_params(parsed)
+    if len(query) < 1:
+        return async_json_response({"error": "Please enter a word."}, HTTPStatus.BAD_REQUEST, accept_encoding, keep_alive)
+    try:
+        payload = await lookup_search_async(query, language, enrich=enrich, offline=offline)
+    except Exception as exc:
+        return async_json_response(
+            {"error": "Could not fetch from Naver dictionary.", "details": str(exc)},
+            HTTPStatus.BAD_GATEWAY,
+            accept_encoding,
+            keep_alive,
+        )
+    return async_json_response(payload, HTTPStatus.OK, accept_encoding, keep_alive)
+
+
+async def handle_async_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    ASYNC_SERVER_STATS["connections"] += 1
+    loop = asyncio.get_running_loop()
+    peer = writer.get_extra_info("peername") or ("", 0)
+    timeout = ASYNC_REQUEST_TIMEOUT_SECONDS
+    responded = True
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                return
+            timeout = HTTP_KEEPALIVE_TIMEOUT_SECONDS
+            request_line, _, header_block = head.partition(b"\r\n")
+            parts = request_line.decode("iso-8859-1").split()
+            length = 0
+            headers: dict[str, str] = {}
+            for line in header_block.decode("iso-8859-1").split("\r\n"):
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if headers.get("content-length"):
+                length = int(headers["content-length"]) if headers["content-length"].isdigit() else -1
+            if len(parts) != 3 or length < 0 or length > 5_000_000 or "transfer-encoding" in headers:
+                writer.write(async_json_response({"error": "Invalid request."}, HTTPStatus.BAD_REQUEST))
+                return
+            body = await asyncio.wait_for(reader.readexactly(length), ASYNC_REQUEST_TIMEOUT_SECONDS) if length else b""
+            accept_encoding = headers.get("accept-encoding")
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection == "keep-alive" if parts[2] == "HTTP/1.0" else connection != "close"
+
+            ASYNC_SERVER_STATS["requests"] += 1
+            if ASYNC_SERVER_STATS["inFlight"] >= ASYNC_MAX_IN_FLIGHT:
+                ASYNC_SERVER_STATS["rejected"] += 1
+                writer.write(
+                    async_json_response({"error": "Server busy."}, HTTPStatus.SERVICE_UNAVAILABLE, accept_encoding)
+                )
+                return
+            ASYNC_SERVER_STATS["inFlight"] += 1
+            ASYNC_SERVER_STATS["peakInFlight"] = max(ASYNC_SERVER_STATS["peakInFlight"], ASYNC_SERVER_STATS["inFlight"])
+            responded = False
+            try:
+                method, target = parts[0], parts[1]
+                parsed = urllib.parse.urlparse(target)
+                if method == "GET" and parsed.path == "/api/search":
+                    started = time.perf_counter()
+                    response = await async_search_response(parsed, accept_encoding, keep_alive)
+                    writer.write(response)
+                    responded = True
+                    record_http_request(
+                        parsed.path,
+                        method,
+                        int(response[9:12]),
+                        time.perf_counter() - started,
+                        len(response.partition(b"\r\n\r\n")[2]),
+                    )
+                else:
+                    if parsed.path.startswith(("/api/state", "/api/users")):
+                        executor = ASYNC_DB_EXECUTOR
+                    elif parsed.path == "/api/search/batch":
+                        executor = ASYNC_BATCH_EXECUTOR
+                    else:
+                        executor = ASYNC_ROUTE_EXECUTOR
+                    out = LoopWriter(loop, writer)
+                    try:
+                        handler = await loop.run_in_executor(executor, AsyncBridgeHandler, head + body, peer[:2], out)
+                    finally:
+                        responded = out.written > 0
+                    keep_alive = keep_alive and handler.keep_alive
+            finally:
+                ASYNC_SERVER_STATS["inFlight"] -= 1
+            await writer.drain()
+            if not keep_alive:
+                return
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        pass
+    except Exception:
+        print(f"Async request from {peer[0]} failed:", file=sys.stderr)
+        traceback.print_exc()
+        if not responded:
+            writer.write(async_json_response({"error": "Internal server error."}, HTTPStatus.INTERNAL_SERVER_ERROR))
+    finally:
+        writer.close()
+
+
+async def serve_async(host: str, port: int):
+    server = await asyncio.start_server(
+        handle_async_connection, host, port, backlog=ASYNC_BACKLOG, limit=64 * 1024
+    )
+    print(f"Japanese Hub running at http://{host}:{port} (asyncio, {ASYNC_MAX_IN_FLIGHT} in flight max)")
+    async with server:
+        await server.serve_forever()
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Japanese Learning Hub server")
+    subcommands = parser.add_subparsers(dest="command")
+    renormalize = subcommands.add_parser(
+        "renormalize",
+        help="rebuild the search cache and dictionary index from archived payloads",
+    )
+    renormalize.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    renormalize.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    if args.command == "renormalize":
+        renormalize_archive(max(1, args.workers), max(1, args.batch_size))
+        return
+
     port = int(os.getenv("PORT", str(DEFAULT_PORT)))
     host = os.getenv("HOST", "127.0.0.1")
-    init_state_db()
+    applied = migrate_state_db()
+    if applied:
+        print(f"State DB migrated to schema v{STATE_SCHEMA_VERSION} (applied {applied})")
+    unreadable = unreadable_state_users()
+    if unreadable:
+        print(f"State DB: kept {len(unreadable)} unreadable saved state(s) in user_state, users {unreadable}")
+    threading.Thread(target=SUGGEST_INDEX.build, name="suggest-index-build", daemon=True).start()
+    STATIC_ASSETS.load()
+    if SERVER_MODE == "asyncio":
+        try:
+            asyncio.run(serve_async(host, port))
+        except KeyboardInterrupt:
+            pass
+        return
     httpd = ThreadingHTTPServer((host, port), JapaneseHubHandler)
     print(f"Japanese Hub running at http://{host}:{port}")
     try:
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""JSON API latency and bytes on the wire: connection per request vs keep-alive, with and without compression."""
+import argparse
+import http.client
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+from bench_state_store import BenchServer, SilentHandler, percentile, seed  # noqa: E402
+
+SCENARIOS = [
+    ("close/identity", False, None),
+    ("keep-alive/identity", True, None),
+    ("keep-alive/gzip", True, "gzip"),
+]
+if app.brotli is not None:
+    SCENARIOS.append(("keep-alive/br", True, "br"))
+
+
+def client(port: int, paths: list[str], requests: int, keep_alive: bool, encoding: str | None, out: dict):
+    headers = {"Accept-Encoding": encoding or "identity"}
+    conn = None
+    for index in range(requests):
+        path = paths[index % len(paths)]
+        if conn is None:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        started = time.perf_counter()
+        conn.request("GET", path, headers={**headers, "Connection": "keep-alive" if keep_alive else "close"})
+        response = conn.getresponse()
+        body = response.read()
+        elapsed = time.perf_counter() - started
+        if response.status != 200:
+            raise RuntimeError(f"GET {path}: {response.status}")
+        # Status line plus headers as sent; close enough to the real count for comparing runs.
+        head = len("HTTP/1.1 200 OK\r\n\r\n") + sum(len(name) + len(value) + 4 for name, value in response.getheaders())
+        kind = path.split("?", 1)[0]
+        out.setdefault(kind, []).append(elapsed)
+        out.setdefault(f"{kind} bytes", []).append(head + len(body))
+        if not keep_alive or response.will_close:
+            conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+
+
+def run(name: str, keep_alive: bool, encoding: str | None, port: int, paths: list[str], args) -> None:
+    out: dict[str, list[float]] = {}
+    threads = [
+        threading.Thread(target=client, args=(port, paths, args.requests, keep_alive, encoding, out))
+        for _ in range(args.clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    total = args.clients * args.requests
+    print(f"{name:20s} {total / elapsed:8.1f} req/s")
+    for kind in ("/api/state", "/api/users"):
+        sizes = out.get(f"{kind} bytes") or [0]
+        print(
+            f"    {kind:12s} {sum(sizes) / len(sizes) / 1024:8.1f} KiB/resp"
+            f"  p50 {percentile(out.get(kind, []), 50) * 1000:6.2f}ms"
+            f"  p99 {percentile(out.get(kind, []), 99) * 1000:6.2f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--words", type=int, default=1000, help="words per user list")
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp(prefix="bench-http-"))
+    app.STATE_DB_FILE = data_dir / "hub_state.db"
+    app.LEGACY_STATE_FILE = data_dir / "hub_state.json"
+    app.STATE_DB.close()
+    app.init_state_db()
+    user_ids = seed(args.users, args.words)
+    paths = [f"/api/state?user={user_id}" for user_id in user_ids] + ["/api/users"]
+
+    httpd = BenchServer(("127.0.0.1", 0), SilentHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+    print(
+        f"{args.clients} clients x {args.requests} requests, {args.words} words/list,"
+        f" gzip level {app.HTTP_GZIP_LEVEL}, brotli quality {app.HTTP_BROTLI_QUALITY},"
+        f" threshold {app.HTTP_COMPRESS_MIN_BYTES} B"
+    )
+    try:
+        for name, keep_alive, encoding in SCENARIOS:
+            run(name, keep_alive, encoding, port, paths, args)
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Recording cost of the per-thread metrics shards vs one registry-wide lock, across thread counts."""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from metrics import SIZE_BUCKETS, MetricsRegistry  # noqa: E402
+
+
+class LockedRegistry(MetricsRegistry):
+    # The obvious alternative: one shared dict behind one lock.
+    def __init__(self):
+        super().__init__()
+        self._shared: dict = {}
+        self._shards.append((threading.main_thread(), self._shared))
+
+    def _shard(self) -> dict:
+        return self._shared
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1):
+        with self._lock:
+            super().inc(name, labels, value)
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        with self._lock:
+            super().observe(name, value, labels)
+
+
+def declare(registry: MetricsRegistry) -> MetricsRegistry:
+    registry.counter("requests_total", "requests")
+    registry.histogram("request_seconds", "latency")
+    registry.histogram("response_bytes", "size", SIZE_BUCKETS)
+    return registry
+
+
+def record(registry: MetricsRegistry, operations: int):
+    labels = (("route", "/api/search"),)
+    status = (("route", "/api/search"), ("method", "GET"), ("status", "200"))
+    for index in range(operations):
+        registry.inc("requests_total", status)
+        registry.observe("request_seconds", (index % 100) / 1000, labels)
+        registry.observe("response_bytes", index % 50000, labels)
+
+
+def measure(registry: MetricsRegistry, threads: int, operations: int) -> float:
+    workers = [threading.Thread(target=record, args=(registry, operations)) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    snapshot = registry.snapshot()
+    count = snapshot[("requests_total", (("route", "/api/search"), ("method", "GET"), ("status", "200")))]
+    assert count == threads * operations, count
+    return elapsed / (threads * operations * 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--operations", type=int, default=100000, help="requests recorded per thread")
+    parser.add_argument("--threads", default="1,4,16")
+    args = parser.parse_args()
+
+    print(f"{'threads':>7s} {'locked':>10s} {'sharded':>10s} {'speedup':>8s}")
+    for threads in [int(value) for value in args.threads.split(",") if value.strip()]:
+        locked = measure(declare(LockedRegistry()), threads, args.operations)
+        sharded = measure(declare(MetricsRegistry()), threads, args.operations)
+        print(f"{threads:7d} {locked * 1e9:8.0f}ns {sharded * 1e9:8.0f}ns {locked / sharded:7.2f}x")
+    registry = declare(MetricsRegistry())
+    record(registry, args.operations)
+    started = time.perf_counter()
+    registry.render()
+    print(f"render: {(time.perf_counter() - started) * 1e3:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""CPU time per payload for the search parser: one walk per helper vs a single PayloadScan."""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+
+def make_direct_payload(rng: random.Random, language: str, items: int, examples: int) -> dict:
+    rows = []
+    for index in range(items):
+        if language == "ja":
+            word, reading = f"猫{index}", f"ねこ{index}"
+            example = "<ruby>猫<rt>ねこ</rt></ruby>が&lt;b&gt;好き&lt;/b&gt;です。"
+        else:
+            word, reading = f"cat{index}", f"kæt{index}"
+            example = "The <b>cat</b> sat on the mat &amp; slept."
+        means = [
+            {
+                "value": f"<b>고양이</b> {index}-{n}",
+                "exampleOri": example,
+                "exampleTrans": f"고양이를 좋아합니다 {n}",
+                "languageGroupCode": "kr",
+            }
+            for n in range(examples)
+        ]
+        rows.append(
+            {
+                "entryId": f"{rng.getrandbits(48):x}",
+                "expEntry": reading if language == "ja" else word,
+                "expKanji": word if language == "ja" else "",
+                "handleEntry": reading,
+                "destinationLink": f"#/entry/jako/{index}",
+                "searchPhoneticSymbolList": [
+                    {"symbolValue": reading, "symbolType": "US", "symbolFile": ""},
+                ],
+                "meansCollector": [{"partOfSpeech": "noun", "means": means}],
+                "searchTraitInfo": {"rank": index, "tags": ["common", "jlpt"]},
+                "pronunciationList": [
+                    {"pronunciationKind": "tts", "femalePronunciationUrl": f"https://dict-dn.pstatic.net/{index}.mp3"}
+                ],
+            }
+        )
+    return {
+        "searchResultMap": {
+            "searchResultListMap": {
+                "WORD": {"query": rows[0]["expEntry"], "queryRevert": "", "items": rows, "total": items},
+                "EXAMPLE": {"query": rows[0]["expEntry"], "items": [{"exampleOri": "x"} for _ in range(examples)]},
+            }
+        },
+        "pagerInfo": {"page": 1, "suggestQuery": ""},
+    }
+
+
+def make_generic_payload(rng: random.Random, items: int, examples: int) -> dict:
+    rows = [
+        {
+            "headword": f"猫{index}",
+            "kana": f"ねこ{index}",
+            "senses": [
+                {"definition": f"고양이 {n}", "sample": "<ruby>猫<rt>ねこ</rt></ruby>がいる。", "id": rng.random()}
+                for n in range(examples)
+            ],
+            "media": {"soundUrl": f"//dict-dn.pstatic.net/{index}.mp3"},
+        }
+        for index in range(items)
+    ]
+    return {"data": {"result": {"blocks": [{"entries": rows}], "recommendQuery": "ねこ"}}}
+
+
+def first_rows(items: list, language: str, scan) -> list:
+    rows = []
+    for item in items:
+        row = app.normalize_entry(item, language, scan) if scan else app.normalize_entry(item, language)
+        if row:
+            rows.append(row)
+        if len(rows) >= 10:
+            break
+    return rows
+
+
+def multi_walk(payload: dict, query: str, language: str) -> tuple:
+    # The pre-PayloadScan pipeline: every helper walks the payload on its own.
+    corrected = app.extract_corrected_query(payload, query)
+    suggestions = app.collect_query_candidates(payload, query)
+    items = app.extract_direct_items(payload) or app.extract_generic_items(payload, language)
+    return corrected, suggestions, first_rows(items, language, None)
+
+
+def single_pass(payload: dict, query: str, language: str) -> tuple:
+    scan = app.PayloadScan(payload)
+    corrected = app.extract_corrected_query(payload, query, scan)
+    suggestions = app.collect_query_candidates(payload, query, scan)
+    items = scan.direct_items or scan.generic_items(language)
+    return corrected, suggestions, first_rows(items, language, scan)
+
+
+def measure(fn, payload: dict, query: str, language: str, rounds: int) -> float:
+    started = time.process_time()
+    for _ in range(rounds):
+        fn(payload, query, language)
+    return (time.process_time() - started) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--examples", type=int, default=12)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    cases = [
+        ("ja direct", make_direct_payload(rng, "ja", args.items, args.examples), "ねこ", "ja"),
+        ("en direct", make_direct_payload(rng, "en", args.items, args.examples), "cat", "en"),
+        ("generic", make_generic_payload(rng, args.items, args.examples), "ねこ", "ja"),
+    ]
+    print(f"{'payload':<10} {'multi-walk':>12} {'single-pass':>12} {'speedup':>8}")
+    for name, payload, query, language in cases:
+        before = measure(multi_walk, payload, query, language, args.rounds)
+        if not hasattr(app, "PayloadScan"):
+            print(f"{name:<10} {before * 1000:>10.3f}ms {'-':>12} {'-':>8}")
+            continue
+        if multi_walk(payload, query, language) != single_pass(payload, query, language):
+            raise SystemExit(f"{name}: single-pass output differs from multi-walk output")
+        after = measure(single_pass, payload, query, language, args.rounds)
+        print(f"{name:<10} {before * 1000:>10.3f}ms {after * 1000:>10.3f}ms {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
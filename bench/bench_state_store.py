@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""State API throughput under concurrent HTTP clients: per-call rollback-journal connections vs the WAL pool."""
+import argparse
+import http.client
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+CONFIGS = {
+    # Roughly the old behaviour: a fresh connection per use, default journal and sync.
+    "per-call/DELETE": dict(pool_size=0, journal_mode="DELETE", synchronous="FULL", cache_kib=2000),
+    "pooled/WAL": dict(
+        pool_size=app.STATE_DB_POOL_SIZE,
+        journal_mode="WAL",
+        synchronous=app.STATE_DB_SYNCHRONOUS,
+        cache_kib=app.STATE_DB_CACHE_KIB,
+    ),
+}
+
+
+class SilentHandler(app.JapaneseHubHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class BenchServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops SYNs under this many clients, and the 1 s retransmit
+    # would swamp the state-store numbers.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def seed(users: int, words: int) -> list[str]:
+    names = []
+    for index in range(users):
+        name = f"bench{index}"
+        user = app.create_user(name)
+        state = {
+            "lists": [
+                {
+                    "id": f"list{index}",
+                    "name": "Bench",
+                    "words": [{"word": f"語{n}", "furigana": f"ご{n}", "meaning": f"word {n}"} for n in range(words)],
+                }
+            ],
+            "history": [{"id": f"h{n}", "query": f"q{n}"} for n in range(50)],
+        }
+        app.save_state(state, user["id"])
+        names.append(user["id"])
+    return names
+
+
+def request(port: int, method: str, path: str, body: dict | None = None) -> dict:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload else {}
+        conn.request(method, path, body=payload, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path}: {response.status} {data[:200]!r}")
+        return json.loads(data)
+    finally:
+        conn.close()
+
+
+def client(port: int, user_ids: list[str], requests: int, write_ratio: float, seed_value: int, out: dict):
+    rng = random.Random(seed_value)
+    for _ in range(requests):
+        user_id = rng.choice(user_ids)
+        started = time.perf_counter()
+        if rng.random() < write_ratio:
+            base = request(port, "GET", f"/api/state/ops?user={user_id}&since=0")["revision"]
+            word = {"word": f"新{rng.randrange(10**6)}", "furigana": "しん", "meaning": "new"}
+            request(
+                port,
+                "POST",
+                f"/api/state/ops?user={user_id}",
+                {"baseRevision": base, "ops": [{"op": "addWord", "listId": f"list{user_ids.index(user_id)}", "index": 0, "word": word}]},
+            )
+            out["writes"].append(time.perf_counter() - started)
+        else:
+            request(port, "GET", f"/api/state?user={user_id}")
+            out["reads"].append(time.perf_counter() - started)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(name: str, config: dict, users: int, args) -> None:
+    data_dir = Path(tempfile.mkdtemp(prefix="bench-state-"))
+    app.STATE_DB_FILE = data_dir / "hub_state.db"
+    app.LEGACY_STATE_FILE = data_dir / "hub_state.json"
+    app.STATE_DB.close()
+    app.STATE_DB = app.StateDatabase(**config)
+    app.init_state_db()
+    user_ids = seed(users, args.words)
+
+    httpd = BenchServer(("127.0.0.1", 0), SilentHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+
+    out: dict[str, list[float]] = {"reads": [], "writes": []}
+    threads = [
+        threading.Thread(target=client, args=(port, user_ids, args.requests, args.write_ratio, n, out))
+        for n in range(args.clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    httpd.shutdown()
+    httpd.server_close()
+
+    total = len(out["reads"]) + len(out["writes"])
+    print(
+        f"{name:16s} {users:3d} profiles {total / elapsed:9.1f} req/s"
+        f"  read p50 {percentile(out['reads'], 50) * 1000:6.1f}ms p95 {percentile(out['reads'], 95) * 1000:6.1f}ms"
+        f"  write p50 {percentile(out['writes'], 50) * 1000:6.1f}ms p95 {percentile(out['writes'], 95) * 1000:6.1f}ms"
+        f"  {app.STATE_DB.stats()['opened']} connections opened"
+        f"  {app.STATE_USER_LOCKS.stats()['contended']} lock waits"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--users", default="1,8", help="comma-separated profile counts to sweep")
+    parser.add_argument("--words", type=int, default=300, help="words per user list")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.requests} requests, {args.write_ratio:.0%} writes")
+    for users in [int(value) for value in args.users.split(",") if value.strip()]:
+        for name, config in CONFIGS.items():
+            app.STATE_USER_LOCKS = app.StripedLocks(app.STATE_LOCK_STRIPES)
+            run(name, config, users, args)
+
+
+if __name__ == "__main__":
+    main()
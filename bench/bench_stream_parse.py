@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Full json.loads + normalize vs the streaming parse (which drops items past the row cap) on example-heavy payloads.
+
+First checks the streaming parse one byte per read against json.loads, so every chunk boundary is hit.
+"""
+import argparse
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+
+def make_body(case_name: str, example_copies: int) -> tuple[bytes, str]:
+    case = json.loads((CORPUS_DIR / f"{case_name}.json").read_text(encoding="utf-8"))
+    payload = case["payloads"][case["query"]]
+    sections = payload["searchResultMap"]["searchResultListMap"]
+    sections["EXAMPLE"]["items"] = sections["EXAMPLE"]["items"] * example_copies
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8"), case["lang"]
+
+
+def full_parse(body: bytes, language: str) -> list:
+    payload = json.loads(body.decode("utf-8", errors="replace"))
+    return app.normalize_items_from_payload(payload, language, set())[0]
+
+
+def stream_parse(body: bytes, language: str) -> list:
+    payload, _ = app.parse_payload_stream(io.BytesIO(body).read, language)
+    return app.normalize_items_from_payload(payload, language, set())[0]
+
+
+def stream_parse_archived(body: bytes, language: str) -> list:
+    payload, archived = app.parse_payload_stream(io.BytesIO(body).read, language, archive=True)
+    archived.finish()
+    return app.normalize_items_from_payload(payload, language, set())[0]
+
+
+def check_byte_at_a_time():
+    # Every chunk boundary shows up once: split numbers, escapes, multi-byte characters.
+    bodies = [(b'{"a": 1.5, "b": 2, "c": 1e5, "d": [-12.5e-3, 0, true, null]}', "ja")]
+    for path in sorted(CORPUS_DIR.glob("*.json")):
+        case = json.loads(path.read_text(encoding="utf-8"))
+        for payload in case["payloads"].values():
+            bodies.append((json.dumps(payload, ensure_ascii=False).encode("utf-8"), case["lang"]))
+    for body, language in bodies:
+        source = io.BytesIO(body)
+        payload, _ = app.parse_payload_stream(lambda _: source.read(1), language)
+        expected = json.loads(body.decode("utf-8"))
+        rows = app.normalize_items_from_payload(payload, language, set())[0]
+        assert rows == app.normalize_items_from_payload(expected, language, set())[0], body[:80]
+    print(f"byte-at-a-time parse matches json.loads on {len(bodies)} bodies")
+
+
+def measure(func, body: bytes, language: str, rounds: int) -> tuple[float, int]:
+    best = min(timed(func, body, language) for _ in range(rounds))
+    tracemalloc.start()
+    try:
+        func(body, language)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def timed(func, body: bytes, language: str) -> float:
+    start = time.perf_counter()
+    func(body, language)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--case", default="ja_taberu")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    check_byte_at_a_time()
+    for copies in (1, 50, 500):
+        body, language = make_body(args.case, copies)
+        assert full_parse(body, language) == stream_parse(body, language)
+        full_time, full_peak = measure(full_parse, body, language, args.rounds)
+        stream_time, stream_peak = measure(stream_parse, body, language, args.rounds)
+        archived_time, archived_peak = measure(stream_parse_archived, body, language, args.rounds)
+        print(
+            f"{len(body) / 1024:9.1f} KiB body  "
+            f"full {full_time * 1000:7.2f} ms {full_peak / 1024:8.1f} KiB peak  "
+            f"stream {stream_time * 1000:7.2f} ms {stream_peak / 1024:8.1f} KiB peak  "
+            f"+archive {archived_time * 1000:7.2f} ms {archived_peak / 1024:8.1f} KiB peak"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""textnorm kernels vs the previous inline implementations on typical JA/EN/KO strings."""
+import argparse
+import html
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import textnorm  # noqa: E402
+
+
+def legacy_clean_text(value: str) -> str:
+    text = html.unescape(value or "")
+    text = re.sub(r"<[^>]+>", "", text)
+    text = text.replace("\u200b", "")
+    return " ".join(text.split())
+
+
+def legacy_clean_ruby_text(value: str) -> str:
+    text = html.unescape(value or "")
+    text = re.sub(r"<rt[^>]*>.*?</rt>", "", text, flags=re.IGNORECASE | re.DOTALL)
+    text = re.sub(r"</?(ruby|rb|rp)[^>]*>", "", text, flags=re.IGNORECASE)
+    return legacy_clean_text(text)
+
+
+def legacy_sanitize_ruby_html(value: str) -> str:
+    text = html.unescape(value or "").replace("\u200b", "")
+
+    def repl(match: re.Match[str]) -> str:
+        slash = "/" if match.group(1) else ""
+        tag = (match.group(2) or "").lower()
+        if tag not in {"ruby", "rb", "rt", "rp", "br"}:
+            return ""
+        if tag == "br":
+            return "<br>"
+        return f"<{slash}{tag}>"
+
+    return re.sub(r"<\s*(/?)\s*([a-zA-Z0-9]+)(?:\s+[^>]*)?>", repl, text).strip()
+
+
+def legacy_keyify(text: str) -> str:
+    value = legacy_clean_text(text or "")
+    value = re.sub(r"[・·･\u30fb]", "", value)
+    value = re.sub(r"\s+", "", value)
+    return value.casefold()
+
+
+INPUTS = {
+    "ja": [
+        "食べる",
+        "たべる",
+        "<strong>猫</strong>舌",
+        "<ruby>猫<rt>ねこ</rt></ruby>を<ruby>飼<rt>か</rt></ruby>う",
+        "ご<ruby>飯<rt>はん</rt></ruby>を<ruby>食<rt>た</rt></ruby>べる &amp; <b>飲む</b>",
+        "アイス・クリーム",
+        "  猫\u200b背  ",
+    ],
+    "en": [
+        "impairment",
+        "run-up",
+        "The <b>cat</b> sat on the mat &amp; slept.",
+        "미국식 [ɪmˈpermənt]",
+        "Lack of sleep can <b>impair</b> judgment.",
+        "  spaced   out  words ",
+        "AT&amp;T",
+    ],
+    "ko": [
+        "고양이.",
+        "<b>샤미센</b>의 딴이름.",
+        "뜨거운 것을 잘 먹지 못함.",
+        "(신체적・정신적) 장애",
+        "손상차손 &lt;회계&gt;",
+        "새우등; 구부정한 등.",
+    ],
+}
+
+KERNELS = [
+    ("clean_text", legacy_clean_text, textnorm.clean_text),
+    ("clean_ruby_text", legacy_clean_ruby_text, textnorm.clean_ruby_text),
+    ("sanitize_ruby_html", legacy_sanitize_ruby_html, textnorm.sanitize_ruby_html),
+    ("keyify", legacy_keyify, textnorm.keyify),
+]
+
+
+MEMOS = (
+    textnorm._clean_markup,
+    textnorm._clean_ruby_markup,
+    textnorm._sanitize_ruby_markup,
+    textnorm._keyify,
+)
+
+
+def measure(func, values: list[str], rounds: int, cold: bool = False) -> float:
+    elapsed = 0.0
+    for _ in range(rounds):
+        if cold:
+            for memo in MEMOS:
+                memo.cache_clear()
+        started = time.perf_counter()
+        for value in values:
+            func(value)
+        elapsed += time.perf_counter() - started
+    return elapsed / (rounds * len(values))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'kernel':20s} {'lang':4s} {'legacy':>10s} {'cold memo':>10s} {'warm memo':>10s} {'speedup':>8s}")
+    for name, legacy, current in KERNELS:
+        for language, values in INPUTS.items():
+            for value in values:
+                assert legacy(value) == current(value), (name, value)
+            old = measure(legacy, values, args.rounds)
+            cold = measure(current, values, args.rounds, cold=True)
+            warm = measure(current, values, args.rounds)
+            print(
+                f"{name:20s} {language:4s} {old * 1e9:8.0f}ns {cold * 1e9:8.0f}ns"
+                f" {warm * 1e9:8.0f}ns {old / warm:7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
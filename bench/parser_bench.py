@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Replay the payload corpus through the parser and compare against bench/baseline.json.
+
+Output digests always gate. Throughput and peak memory only gate with --check-perf, and
+throughput is compared relative to a calibration loop timed in the same process, so a
+baseline recorded on a faster or slower machine still compares fairly.
+"""
+import argparse
+import hashlib
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+CORPUS_DIR = BENCH_DIR / "corpus"
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+
+# Live queries recorded by --record-captured, one per payload shape the synthetic seed
+# cases stand in for: plain ja/en hits, a misspelling that goes through the retry
+# fan-out, and an English word that gets the "loss" enrichment probe.
+CAPTURE_CASES = {
+    "captured_ja_neko": ("猫", "ja"),
+    "captured_ja_taberu": ("食べる", "ja"),
+    "captured_ja_misspelled": ("たべるう", "ja"),
+    "captured_en_run": ("run", "en"),
+    "captured_en_impairment": ("impairment", "en"),
+}
+
+
+def load_corpus(corpus_dir: Path) -> dict[str, dict]:
+    cases = {}
+    for path in sorted(corpus_dir.glob("*.json")):
+        cases[path.stem] = json.loads(path.read_text(encoding="utf-8"))
+    return cases
+
+
+def replay_fetch(case: dict):
+    payloads = case["payloads"]
+
+    def fetch(query: str, language: str) -> dict:
+        if query not in payloads:
+            raise LookupError(f"no recorded payload for {query!r}")
+        return payloads[query]
+
+    return fetch
+
+
+def record_case(corpus_dir: Path, name: str, query: str, language: str | None) -> Path:
+    payloads: dict[str, dict] = {}
+
+    def fetch(q: str, lang: str) -> dict:
+        payload = app.fetch_naver_payload(q, lang)
+        payloads[q] = payload
+        return payload
+
+    result = app.search_naver(query, language, enrich=True, fetch=fetch)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    path = corpus_dir / f"{name}.json"
+    case = {
+        "query": query,
+        "lang": result["language"],
+        "source": "captured",
+        "capturedAt": time.strftime("%Y-%m-%d"),
+        "payloads": payloads,
+    }
+    path.write_text(json.dumps(case, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    return path
+
+
+def collect_markup(node, out: list[str]) -> None:
+    if isinstance(node, dict):
+        for value in node.values():
+            collect_markup(value, out)
+    elif isinstance(node, list):
+        for value in node:
+            collect_markup(value, out)
+    elif isinstance(node, str) and "<" in node:
+        out.append(node)
+
+
+def build_stages(cases: dict[str, dict]) -> dict[str, tuple[str, list]]:
+    primaries = [(case["payloads"][case["query"]], case["lang"]) for case in cases.values()]
+    entries = []
+    markup: list[str] = []
+    for case in cases.values():
+        for payload in case["payloads"].values():
+            entries.extend((item, case["lang"]) for item in app.extract_direct_items(payload))
+            collect_markup(payload, markup)
+
+    def run_items(payload, language):
+        app.normalize_items_from_payload(payload, language, set())
+
+    def run_entry(item, language):
+        app.normalize_entry(item, language)
+
+    def run_search(case):
+        app.search_naver(case["query"], case["lang"], fetch=replay_fetch(case))
+
+    return {
+        "normalize_items_from_payload": ("payloads", [(run_items, args) for args in primaries]),
+        "normalize_entry": ("items", [(run_entry, args) for args in entries]),
+        "sanitize_ruby_html": ("strings", [(app.sanitize_ruby_html, (text,)) for text in markup]),
+        "search_naver": ("queries", [(run_search, (case,)) for case in cases.values()]),
+    }
+
+
+def calibration_work():
+    # Plain dict/str churn, roughly the mix the parser does, independent of app code.
+    counts: dict[str, int] = {}
+    for index in range(20000):
+        key = f"k{index % 500}"
+        counts[key] = counts.get(key, 0) + len(key.casefold())
+    return counts
+
+
+def calibrate(rounds: int) -> float:
+    calls = [(calibration_work, ())]
+    run_once(calls)
+    best = min(run_once(calls) for _ in range(rounds))
+    return round(1 / best, 1) if best > 0 else 0.0
+
+
+def run_once(calls: list) -> float:
+    start = time.perf_counter()
+    for func, args in calls:
+        func(*args)
+    return time.perf_counter() - start
+
+
+def measure(calls: list, rounds: int) -> dict[str, float]:
+    run_once(calls)
+    best = min(run_once(calls) for _ in range(rounds))
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        run_once(calls)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    count = max(1, len(calls))
+    return {
+        "perSecond": round(count / best, 1) if best > 0 else 0.0,
+        "peakBytesPerOp": round(max(0, peak - base) / count),
+    }
+
+
+def output_digests(cases: dict[str, dict]) -> dict[str, str]:
+    digests = {}
+    for name, case in cases.items():
+        result = app.search_naver(case["query"], case["lang"], fetch=replay_fetch(case))
+        encoded = json.dumps(result, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        digests[name] = hashlib.sha256(encoded).hexdigest()
+    return digests
+
+
+def compare(current: dict, baseline: dict, threshold: float, check_perf: bool) -> list[str]:
+    problems = []
+    base_outputs = baseline.get("outputs", {})
+    for name, digest in current["outputs"].items():
+        expected = base_outputs.get(name)
+        if expected is None:
+            problems.append(f"{name}: no baseline output (run with --update-baseline)")
+        elif expected != digest:
+            problems.append(f"{name}: parser output changed")
+
+    if not check_perf:
+        return problems
+    # Scale the baseline by how fast this machine ran the calibration loop against the
+    # machine that recorded it.
+    base_calibration = baseline.get("calibration") or 0.0
+    scale = current["calibration"] / base_calibration if base_calibration and current["calibration"] else 1.0
+    base_stages = baseline.get("stages", {})
+    for stage, stats in current["stages"].items():
+        base = base_stages.get(stage)
+        if not base:
+            continue
+        expected = base["perSecond"] * scale
+        if expected and stats["perSecond"] < expected * (1 - threshold):
+            problems.append(
+                f"{stage}: {stats['perSecond']:.1f}/s vs {expected:.1f}/s expected"
+                f" (baseline {base['perSecond']:.1f}/s x {scale:.2f} calibration)"
+            )
+        if base["peakBytesPerOp"] and stats["peakBytesPerOp"] > base["peakBytesPerOp"] * (1 + threshold):
+            problems.append(
+                f"{stage}: {stats['peakBytesPerOp']} peak B/op vs baseline {base['peakBytesPerOp']}"
+            )
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--check-perf", action="store_true", help="also gate on throughput and peak memory")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--record",
+        nargs=2,
+        metavar=("NAME", "QUERY"),
+        help="fetch QUERY live and store every payload it touches as corpus/NAME.json",
+    )
+    parser.add_argument("--lang", choices=("ja", "en"))
+    parser.add_argument(
+        "--record-captured",
+        action="store_true",
+        help="fetch every CAPTURE_CASES query live into the corpus (then run --update-baseline)",
+    )
+    args = parser.parse_args()
+
+    if args.record:
+        name, query = args.record
+        print(f"recorded {record_case(args.corpus, name, query, args.lang)}")
+        return 0
+    if args.record_captured:
+        for name, (query, language) in CAPTURE_CASES.items():
+            print(f"recorded {record_case(args.corpus, name, query, language)}")
+        return 0
+
+    cases = load_corpus(args.corpus)
+    if not cases:
+        print(f"no corpus payloads in {args.corpus}")
+        return 1
+
+    current = {"stages": {}, "outputs": output_digests(cases), "calibration": calibrate(max(1, args.rounds))}
+    synthetic = sum(1 for case in cases.values() if case.get("source", "synthetic") == "synthetic")
+    print(
+        f"{len(cases)} corpus cases ({synthetic} synthetic), best of {args.rounds} rounds,"
+        f" calibration {current['calibration']:.1f} loops/s"
+    )
+    if synthetic == len(cases):
+        print("WARNING no captured payloads in the corpus; run --record-captured where Naver is reachable")
+    for stage, (unit, calls) in build_stages(cases).items():
+        stats = measure(calls, max(1, args.rounds))
+        current["stages"][stage] = stats
+        print(
+            f"{stage:30s} {stats['perSecond']:10.1f} {unit}/s"
+            f" {stats['peakBytesPerOp'] / 1024:9.1f} KiB peak/op"
+        )
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --update-baseline")
+        return 1
+    problems = compare(
+        current, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold, args.check_perf
+    )
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if not problems:
+        print(f"within {args.threshold:.0%} of baseline" if args.check_perf else "outputs match baseline")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
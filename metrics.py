@@ -0,0 +1,129 @@
+import bisect
+import os
+import threading
+from typing import Any
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Each thread writes only to its own shard, so recording is a dict update with no lock.
+# A scrape copies every shard and adds them up; shards of finished threads are folded into
+# one retired total so a thread-per-connection server doesn't grow the list forever.
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._meta: dict[str, tuple[str, str, tuple[float, ...]]] = {}
+        self._local = threading.local()
+        self._shards: list[tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str):
+        self._meta[name] = ("counter", help_text, ())
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self._meta[name] = ("histogram", help_text, tuple(buckets))
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+                if len(self._shards) % 64 == 0:
+                    self._retire_unlocked()
+            self._local.shard = shard
+            return shard
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1):
+        if not self.enabled:
+            return
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        if not self.enabled:
+            return
+        shard = self._shard()
+        key = (name, labels)
+        counts = shard.get(key)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the running sum.
+            counts = shard[key] = [0] * (len(self._meta[name][2]) + 2)
+        counts[bisect.bisect_left(self._meta[name][2], value)] += 1
+        counts[-1] += value
+
+    @staticmethod
+    def _merge(total: dict, shard: dict):
+        for key, value in shard.items():
+            if isinstance(value, list):
+                merged = total.get(key)
+                if merged is None:
+                    total[key] = list(value)
+                else:
+                    for index, count in enumerate(value):
+                        merged[index] += count
+            else:
+                total[key] = total.get(key, 0) + value
+
+    def _retire_unlocked(self):
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._merge(self._retired, shard)
+        self._shards = live
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._retire_unlocked()
+            total: dict = {}
+            self._merge(total, self._retired)
+            shards = [dict(shard) for _, shard in self._shards]
+        for shard in shards:
+            self._merge(total, shard)
+        return total
+
+    def render(self) -> str:
+        by_name: dict[str, list[tuple[tuple, Any]]] = {}
+        for (name, labels), value in self.snapshot().items():
+            by_name.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, (kind, help_text, buckets) in sorted(self._meta.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(by_name.get(name, []), key=lambda item: item[0]):
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + (float("inf"),), value):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,105 @@
+import html
+import os
+import re
+from functools import lru_cache
+
+
+TEXT_MEMO_ENTRIES = int(os.getenv("TEXT_MEMO_ENTRIES", "32768"))
+
+RE_TAGS = re.compile(r"<[^>]+>")
+RE_HTML_TAG = re.compile(r"<\s*(/?)\s*([a-zA-Z0-9]+)(?:\s+[^>]*)?>")
+RE_RUBY_RT = re.compile(r"<rt[^>]*>.*?</rt>", re.IGNORECASE | re.DOTALL)
+RE_RUBY_TAGS = re.compile(r"</?(ruby|rb|rp)[^>]*>", re.IGNORECASE)
+RE_KEY_STRIP = re.compile(r"[・·･\u30fb\s]+")
+ALLOWED_EXAMPLE_TAGS = {"ruby", "rb", "rt", "rp", "br"}
+
+# Every kernel below only unescapes entities and strips tags, so input without "&" or
+# "<" skips both (and the memo); the rest is cached since payloads and saved lists
+# repeat the same markup-laden strings many times.
+
+
+def _plain(value: str) -> bool:
+    return "<" not in value and "&" not in value
+
+
+def _collapse(text: str) -> str:
+    if not text.isascii():
+        text = text.replace("\u200b", "")
+    return " ".join(text.split())
+
+
+def clean_text(value: str) -> str:
+    if not value:
+        return ""
+    if _plain(value):
+        return _collapse(value)
+    return _clean_markup(value)
+
+
+@lru_cache(maxsize=TEXT_MEMO_ENTRIES)
+def _clean_markup(value: str) -> str:
+    return _collapse(RE_TAGS.sub("", html.unescape(value)))
+
+
+def clean_ruby_text(value: str) -> str:
+    if not value:
+        return ""
+    if _plain(value):
+        return _collapse(value)
+    return _clean_ruby_markup(value)
+
+
+@lru_cache(maxsize=TEXT_MEMO_ENTRIES)
+def _clean_ruby_markup(value: str) -> str:
+    text = html.unescape(value)
+    text = RE_RUBY_RT.sub("", text)
+    text = RE_RUBY_TAGS.sub("", text)
+    return clean_text(text)
+
+
+def _ruby_tag(match: re.Match[str]) -> str:
+    slash = "/" if match.group(1) else ""
+    tag = (match.group(2) or "").lower()
+    if tag not in ALLOWED_EXAMPLE_TAGS:
+        return ""
+    if tag == "br":
+        return "<br>"
+    return f"<{slash}{tag}>"
+
+
+def sanitize_ruby_html(value: str) -> str:
+    if not value:
+        return ""
+    if _plain(value):
+        return value.replace("\u200b", "").strip()
+    return _sanitize_ruby_markup(value)
+
+
+@lru_cache(maxsize=TEXT_MEMO_ENTRIES)
+def _sanitize_ruby_markup(value: str) -> str:
+    text = html.unescape(value).replace("\u200b", "")
+    return RE_HTML_TAG.sub(_ruby_tag, text).strip()
+
+
+def keyify(text: str) -> str:
+    if not text:
+        return ""
+    return _keyify(text)
+
+
+@lru_cache(maxsize=TEXT_MEMO_ENTRIES)
+def _keyify(text: str) -> str:
+    return RE_KEY_STRIP.sub("", clean_text(text)).casefold()
+
+
+def memo_stats() -> dict[str, dict[str, int]]:
+    stats = {}
+    for name, func in (
+        ("cleanText", _clean_markup),
+        ("cleanRubyText", _clean_ruby_markup),
+        ("sanitizeRubyHtml", _sanitize_ruby_markup),
+        ("keyify", _keyify),
+    ):
+        info = func.cache_info()
+        stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+    return stats